@@ -1,21 +1,53 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import os
 import re
+import time
 import unicodedata
-import requests
-from io import StringIO
 from pandas.errors import EmptyDataError
 
+from atualizador_fundo import Atualizador
+from cache_planilhas import ler_dataframes
+from colunas_tipadas import CacheColunas, InferenciaTipos
+from conversao_numerica import para_numero
+from fontes_dados import url_fonte
+from interacoes_regras import minerar_interacoes
+from ingestao_incremental import ProcessadorIncremental, assinar_linhas, assinatura_subconjunto
+from mineracao_regras import (
+    LIMITE_DERIVA, arquivos_historico, colunas_necessarias, gravar_historico, minerar_arquivos,
+    minerar_estatisticas, ordenar_regras, validos_e_distintos,
+)
+from modelo_regras import ModeloRegras, carregar_modelo, gravar_modelo, motivo_reminerar
+from pontuacao_regras import PontuadorRegras
+from snapshots_colunares import tipar_frame
+from variaveis_derivadas import avaliar_lote, expandir_definicoes, materializar
+from walk_forward import acerto_por_nivel, avaliar_walk_forward
+
 st.set_page_config(page_title="Painel Bonito - Pipeline Completo", layout="wide")
 
-CSV_1 = "https://docs.google.com/spreadsheets/d/e/2PACX-1vSF5WBP5KeBr6cVbAK0yH2IJf_luqoK90gOz1fj_VlS_hoAb4E6v_awCWO-bTi28I-mWYWEeewnhmTh/pub?gid=0&single=true&output=csv"
-CSV_2 = "https://docs.google.com/spreadsheets/d/e/2PACX-1vSF5WBP5KeBr6cVbAK0yH2IJf_luqoK90gOz1fj_VlS_hoAb4E6v_awCWO-bTi28I-mWYWEeewnhmTh/pub?gid=1768207754&single=true&output=csv"
+CSV_1 = url_fonte("regras_aba1")
+CSV_2 = url_fonte("regras_aba2")
 
+INTERVALO_FONTES_S = 300
 MIN_LINHAS_FAIXA = 20
 Q_FAIXAS = 5
 TOP_VARIAVEIS_POR_ALVO = 20
+# Regras de interação (pares de faixas) no score: desligadas por padrão. O
+# lift do par soma em cima das regras simples que o compõem (a mesma
+# evidência conta duas vezes) e os cortes do semáforo foram ajustados só
+# com regras simples; GOL_TOP_INTERACOES_POR_ALVO=10 liga
+TOP_INTERACOES_POR_ALVO = int(os.environ.get("GOL_TOP_INTERACOES_POR_ALVO", 0))
+# forca (padrão), forca_inf, lift_inf ou taxa_inf: as três últimas usam o
+# limite inferior do intervalo e tiram do topo faixas pequenas com lift de sorte
+CHAVE_ORDEM_REGRAS = os.environ.get("GOL_CHAVE_ORDEM_REGRAS", "forca")
+# Avaliação fora da amostra, refeita a cada mineração completa (0 desliga)
+DOBRAS_WALK_FORWARD = int(os.environ.get("GOL_DOBRAS_WALK_FORWARD", 12))
 TOP_LIVE = 100
+# Com uma pasta de histórico (Arrow/Parquet de temporadas anteriores), a
+# mineração lê os arquivos em lotes em vez de usar só o FT da planilha
+PASTA_HISTORICO = os.environ.get("GOL_PASTA_HISTORICO")
+ALVOS_REGRAS = ["target_casa_vence", "target_visitante_vence", "target_casa_2mais", "target_visitante_2mais"]
 MAPEAMENTO_MANUAL = {}
 PALAVRAS_PROIBIDAS = [
     "result", "resultado", "score", "placar",
@@ -106,30 +138,42 @@ def normalizar_coluna(col):
 def to_float_series(s):
     if s is None:
         return s
-    s = s.astype(str)
-    s = s.str.replace("%", "", regex=False)
-    s = s.str.replace(r"(?<=\d)\.(?=\d{3}(\D|$))", "", regex=True)
-    s = s.str.replace(",", ".", regex=False)
-    s = s.str.replace(r"[^\d\.\-]", "", regex=True)
-    return pd.to_numeric(s, errors="coerce")
-
-
-def carregar_csv(url, nome="base"):
-    resp = requests.get(url, timeout=40)
-    resp.raise_for_status()
-    texto = resp.text.strip()
-    if not texto:
+    return para_numero(s)
+
+
+TAM_INICIO_CSV = 4096
+
+
+def parse_csv_aba(arquivo, nome="base"):
+    # arquivo: binário aberto pelo cache. Vazio/HTML é decidido só pelo
+    # primeiro bloco; o arquivo vai direto para um único read_csv (sem
+    # decodificar/copiar o texto inteiro), com as colunas-chave fixadas como
+    # texto. Um read_csv só: em blocos, cada bloco inferia o tipo das demais
+    # colunas por conta própria e o concat final guardava blocos + cópia.
+    inicio = arquivo.read(TAM_INICIO_CSV).lstrip().lower()
+    if not inicio:
         raise ValueError(f"{nome} retornou vazio.")
-    if "<html" in texto.lower() or "<!doctype html" in texto.lower():
+    if b"<html" in inicio or b"<!doctype html" in inicio:
         raise ValueError(f"{nome} retornou HTML em vez de CSV.")
     try:
-        df = pd.read_csv(StringIO(texto))
+        arquivo.seek(0)
+        cabecalho = pd.read_csv(arquivo, nrows=0, encoding_errors="replace").columns
+        if len(cabecalho) == 0:
+            raise ValueError(f"{nome} sem colunas.")
+        colunas = [normalizar_coluna(c) for c in cabecalho]
+        mapa = mapear_colunas_principais(pd.DataFrame(columns=colunas))
+        texto = {mapa[k] for k in ("league", "home_team", "away_team", "hour", "status", "result") if mapa[k]}
+        plano = {bruto: str for bruto, norm in zip(cabecalho, colunas) if norm in texto}
+        arquivo.seek(0)
+        df = pd.read_csv(arquivo, dtype=plano, encoding_errors="replace")
     except EmptyDataError:
         raise ValueError(f"{nome} sem colunas legíveis.")
-    if len(df.columns) == 0:
-        raise ValueError(f"{nome} sem colunas.")
-    df.columns = [normalizar_coluna(c) for c in df.columns]
-    return df
+    df.columns = colunas
+    return tipar_frame(
+        df, to_float_series,
+        categoricas=[mapa["league"], mapa["home_team"], mapa["away_team"]],
+        texto=[mapa["hour"], mapa["status"], mapa["result"]],
+    )
 
 
 def encontrar_coluna(df, candidatos):
@@ -173,7 +217,7 @@ def mapear_colunas_principais(df):
 
 def extrair_gols_do_resultado(df, col_resultado):
     if col_resultado is None or col_resultado not in df.columns:
-        return pd.Series([np.nan] * len(df)), pd.Series([np.nan] * len(df))
+        return pd.Series(np.nan, index=df.index), pd.Series(np.nan, index=df.index)
     txt = df[col_resultado].astype(str).str.extract(r"(\d+)\s*[-xX:]\s*(\d+)")
     gols_casa = pd.to_numeric(txt[0], errors="coerce")
     gols_fora = pd.to_numeric(txt[1], errors="coerce")
@@ -181,17 +225,18 @@ def extrair_gols_do_resultado(df, col_resultado):
 
 
 def criar_targets(df, mapa):
+    # Linha a linha: gols sem número na coluna própria vêm do placar em
+    # "result". Roda por lote no ProcessadorIncremental, então nada aqui pode
+    # depender das outras linhas do frame.
     gols_casa = None
     gols_fora = None
     if mapa.get("gols_casa") and mapa.get("gols_fora"):
         gols_casa = to_float_series(df[mapa["gols_casa"]])
         gols_fora = to_float_series(df[mapa["gols_fora"]])
-    if gols_casa is None or gols_fora is None or gols_casa.notna().sum() == 0 or gols_fora.notna().sum() == 0:
+    if gols_casa is None or gols_casa.isna().any() or gols_fora.isna().any():
         gc2, gf2 = extrair_gols_do_resultado(df, mapa.get("result"))
-        if gols_casa is None or gols_casa.notna().sum() == 0:
-            gols_casa = gc2
-        if gols_fora is None or gols_fora.notna().sum() == 0:
-            gols_fora = gf2
+        gols_casa = gc2 if gols_casa is None else gols_casa.fillna(gc2)
+        gols_fora = gf2 if gols_fora is None else gols_fora.fillna(gf2)
     df["gols_casa_final"] = gols_casa
     df["gols_fora_final"] = gols_fora
     df["saldo_gols_final"] = df["gols_casa_final"] - df["gols_fora_final"]
@@ -203,15 +248,10 @@ def criar_targets(df, mapa):
     return df
 
 
-def identificar_colunas_numericas(df):
-    numericas = []
-    for c in df.columns:
-        s = to_float_series(df[c])
-        taxa_validos = s.notna().mean()
-        unicos = s.nunique(dropna=True)
-        if taxa_validos >= 0.50 and unicos >= 4:
-            numericas.append(c)
-    return numericas
+def identificar_colunas_numericas(df, mascara=None, inferencia=None):
+    # numérica: >= 50% de valores válidos e >= 4 valores distintos (nas linhas da máscara)
+    inferencia = inferencia or InferenciaTipos(CacheColunas(to_float_series), min_validos=0.50, min_unicos=4)
+    return inferencia.colunas_numericas(df, mascara)
 
 
 def separar_colunas_casa_fora(colunas):
@@ -237,212 +277,225 @@ def coluna_proibida(nome_coluna):
     return any(p in nome for p in PALAVRAS_PROIBIDAS)
 
 
-def criar_variaveis_derivadas_validas(df, colunas_numericas):
+def definir_variaveis_derivadas(colunas_numericas):
     pares = separar_colunas_casa_fora(colunas_numericas)
-    criadas = []
+    definicoes = []
     for c1, c2 in pares:
         if coluna_proibida(c1) or coluna_proibida(c2):
             continue
-        s1 = to_float_series(df[c1])
-        s2 = to_float_series(df[c2])
-        nome_diff = f"diff__{c1}__vs__{c2}"
-        nome_soma = f"soma__{c1}__mais__{c2}"
-        nome_ratio = f"ratio__{c1}__div__{c2}"
-        df[nome_diff] = s1 - s2
-        df[nome_soma] = s1 + s2
-        df[nome_ratio] = np.where((s2.notna()) & (s2 != 0), s1 / s2, np.nan)
-        criadas.extend([nome_diff, nome_soma, nome_ratio])
-    return df, criadas, pares
-
-
-def montar_variaveis_validas(df_hist, colunas_numericas, vars_criadas):
+        definicoes.append((c1, c2, f"diff__{c1}__vs__{c2}", f"soma__{c1}__mais__{c2}", f"ratio__{c1}__div__{c2}"))
+    return definicoes, pares
+
+
+def montar_variaveis_validas(df_hist, colunas_numericas, derivadas):
     candidatas = []
     for c in colunas_numericas:
         if not coluna_proibida(c):
             candidatas.append(c)
-    for c in vars_criadas:
+    for c in derivadas:
         if not coluna_proibida(c):
             candidatas.append(c)
     candidatas = list(dict.fromkeys(candidatas))
+    # Derivadas não existem no frame: validadas em lote, sem virar coluna
+    lazy = [c for c in candidatas if c not in df_hist.columns and c in derivadas]
+    validos, distintos = validos_e_distintos(avaliar_lote(df_hist, [derivadas[c] for c in lazy]))
+    derivada_ok = {c: v >= MIN_LINHAS_FAIXA * 2 and d >= 4 for c, v, d in zip(lazy, validos, distintos)}
     variaveis_validas = []
     for c in candidatas:
-        if c in df_hist.columns:
+        if c in derivada_ok:
+            if derivada_ok[c]:
+                variaveis_validas.append(c)
+        elif c in df_hist.columns:
             s = pd.to_numeric(df_hist[c], errors="coerce")
             if s.notna().sum() >= MIN_LINHAS_FAIXA * 2 and s.nunique(dropna=True) >= 4:
                 variaveis_validas.append(c)
     return variaveis_validas
 
 
-def analisar_faixas_binario(df, var, alvo_binario, min_linhas=20, q_faixas=5):
-    aux = df[[var, alvo_binario]].copy()
-    aux[var] = pd.to_numeric(aux[var], errors="coerce")
-    aux[alvo_binario] = pd.to_numeric(aux[alvo_binario], errors="coerce")
-    aux = aux.dropna()
-    if len(aux) < min_linhas * 2:
-        return pd.DataFrame()
-    try:
-        n_q = min(q_faixas, aux[var].nunique())
-        if n_q < 2:
-            return pd.DataFrame()
-        aux["faixa"] = pd.qcut(aux[var], q=n_q, duplicates="drop")
-    except Exception:
-        return pd.DataFrame()
-    baseline = aux[alvo_binario].mean()
-    resumo = (
-        aux.groupby("faixa", observed=False)
-        .agg(jogos=(alvo_binario, "size"), taxa_acerto=(alvo_binario, "mean"))
-        .reset_index()
-    )
-    resumo = resumo[resumo["jogos"] >= min_linhas].copy()
-    if resumo.empty:
-        return pd.DataFrame()
-    resumo["var"] = var
-    resumo["baseline"] = baseline
-    resumo["lift"] = resumo["taxa_acerto"] - baseline
-    resumo["forca"] = resumo["lift"] * np.log1p(resumo["jogos"])
-    return resumo.sort_values(["forca", "taxa_acerto", "jogos"], ascending=[False, False, False])
-
-
-def analisar_alvo(df_hist, variaveis_validas, alvo_binario):
-    todos = []
-    for v in variaveis_validas:
-        r = analisar_faixas_binario(df_hist, v, alvo_binario, MIN_LINHAS_FAIXA, Q_FAIXAS)
-        if not r.empty:
-            todos.append(r)
-    if not todos:
-        return pd.DataFrame()
-    return pd.concat(todos, ignore_index=True).sort_values(["forca", "taxa_acerto", "jogos"], ascending=[False, False, False])
-
-
-def criar_score_por_regras(df, regras, nome_score):
-    df = df.copy()
-    df[nome_score] = 0.0
-    df[f"{nome_score}__regras"] = 0
-    for _, row in regras.iterrows():
-        var = row["var"]
-        faixa = row["faixa"]
-        lift = row["lift"]
-        if var not in df.columns:
-            continue
-        try:
-            left = faixa.left
-            right = faixa.right
-            mask = pd.to_numeric(df[var], errors="coerce").between(left, right, inclusive="right")
-            df.loc[mask, nome_score] += lift
-            df.loc[mask, f"{nome_score}__regras"] += 1
-        except Exception:
-            continue
-    return df
+def classificar_nivel(s):
+    a = s.abs()
+    return pd.Series(np.select(
+        [s.isna(), a < 0.03, a < 0.08, a < 0.15],
+        ["Sem sinal", "Fraco", "Moderado", "Forte"],
+        "Muito forte",
+    ), index=s.index)
 
 
-def classificar_nivel(x):
-    if pd.isna(x):
-        return "Sem sinal"
-    a = abs(x)
-    if a < 0.03:
-        return "Fraco"
-    elif a < 0.08:
-        return "Moderado"
-    elif a < 0.15:
-        return "Forte"
-    return "Muito forte"
+SEMAFORO_PRIORIDADE = {
+    "🟢 Entrada forte casa": 1, "🟢 Entrada forte visitante": 1,
+    "🟡 Entrada moderada casa": 2, "🟡 Entrada moderada visitante": 2,
+    "🟠 Observar casa": 3, "🟠 Observar visitante": 3, "🔴 Evitar": 4,
+}
+SEMAFORO_MERCADO = {
+    "🟢 Entrada forte casa": "Casa vencer / Casa -1.5 / observar goleada",
+    "🟡 Entrada moderada casa": "Casa vencer / Casa DNB / Casa -0.5",
+    "🟠 Observar casa": "Observar domínio da casa no live",
+    "🟢 Entrada forte visitante": "Visitante vencer / Visitante -1.5 / observar goleada",
+    "🟡 Entrada moderada visitante": "Visitante vencer / Visitante DNB / Visitante -0.5",
+    "🟠 Observar visitante": "Observar domínio do visitante no live",
+}
+LEITURA_MERCADO = {
+    "Casa com chance de vencer por 2+": "Casa vencer / Casa -1.5",
+    "Casa com tendência de vencer": "Casa vencer / Casa DNB",
+    "Visitante com chance de vencer por 2+": "Visitante vencer / Visitante -1.5",
+    "Visitante com tendência de vencer": "Visitante vencer / Visitante DNB",
+}
+
+
+# Alvos que contam como acerto (vencedor, 2+) para cada nível do semáforo
+ACERTO_POR_SEMAFORO = {
+    "🟢 Entrada forte casa": ("target_casa_vence", "target_casa_2mais"),
+    "🟡 Entrada moderada casa": ("target_casa_vence", "target_casa_2mais"),
+    "🟠 Observar casa": ("target_casa_vence", "target_casa_2mais"),
+    "🟢 Entrada forte visitante": ("target_visitante_vence", "target_visitante_2mais"),
+    "🟡 Entrada moderada visitante": ("target_visitante_vence", "target_visitante_2mais"),
+    "🟠 Observar visitante": ("target_visitante_vence", "target_visitante_2mais"),
+}
 
 
 def criar_semaforo_oportunidades(df):
-    df = df.copy()
-    def definir_semaforo(row):
-        vc, vm = row["vantagem_casa"], row["vantagem_2mais_casa"]
-        if vc >= 0.12 and vm >= 0.08:
-            return "🟢 Entrada forte casa"
-        elif vc >= 0.08 and vm >= 0.03:
-            return "🟡 Entrada moderada casa"
-        elif vc >= 0.03:
-            return "🟠 Observar casa"
-        elif vc <= -0.12 and vm <= -0.08:
-            return "🟢 Entrada forte visitante"
-        elif vc <= -0.08 and vm <= -0.03:
-            return "🟡 Entrada moderada visitante"
-        elif vc <= -0.03:
-            return "🟠 Observar visitante"
-        return "🔴 Evitar"
-    def prioridade(txt):
-        mapa = {
-            "🟢 Entrada forte casa": 1, "🟢 Entrada forte visitante": 1,
-            "🟡 Entrada moderada casa": 2, "🟡 Entrada moderada visitante": 2,
-            "🟠 Observar casa": 3, "🟠 Observar visitante": 3, "🔴 Evitar": 4,
-        }
-        return mapa.get(txt, 99)
-    def mercado_operacional(txt):
-        if txt == "🟢 Entrada forte casa":
-            return "Casa vencer / Casa -1.5 / observar goleada"
-        elif txt == "🟡 Entrada moderada casa":
-            return "Casa vencer / Casa DNB / Casa -0.5"
-        elif txt == "🟠 Observar casa":
-            return "Observar domínio da casa no live"
-        elif txt == "🟢 Entrada forte visitante":
-            return "Visitante vencer / Visitante -1.5 / observar goleada"
-        elif txt == "🟡 Entrada moderada visitante":
-            return "Visitante vencer / Visitante DNB / Visitante -0.5"
-        elif txt == "🟠 Observar visitante":
-            return "Observar domínio do visitante no live"
-        return "Evitar entrada em margem"
-    df["semaforo_oportunidade"] = df.apply(definir_semaforo, axis=1)
-    df["prioridade_operacional"] = df["semaforo_oportunidade"].apply(prioridade)
-    df["mercado_operacional"] = df["semaforo_oportunidade"].apply(mercado_operacional)
-    return df
+    vc, vm = df["vantagem_casa"], df["vantagem_2mais_casa"]
+    semaforo = pd.Series(np.select(
+        [
+            (vc >= 0.12) & (vm >= 0.08), (vc >= 0.08) & (vm >= 0.03), vc >= 0.03,
+            (vc <= -0.12) & (vm <= -0.08), (vc <= -0.08) & (vm <= -0.03), vc <= -0.03,
+        ],
+        [
+            "🟢 Entrada forte casa", "🟡 Entrada moderada casa", "🟠 Observar casa",
+            "🟢 Entrada forte visitante", "🟡 Entrada moderada visitante", "🟠 Observar visitante",
+        ],
+        "🔴 Evitar",
+    ), index=df.index)
+    return df.assign(
+        semaforo_oportunidade=semaforo,
+        prioridade_operacional=semaforo.map(SEMAFORO_PRIORIDADE).fillna(99).astype(np.int64),
+        mercado_operacional=semaforo.map(SEMAFORO_MERCADO).fillna("Evitar entrada em margem"),
+    )
 
 
 def montar_painel_oportunidades(df):
-    df = df.copy()
-    df["vantagem_casa"] = df["score_casa_vence"] - df["score_visitante_vence"]
-    df["vantagem_2mais_casa"] = df["score_casa_2mais"] - df["score_visitante_2mais"]
-    def direcao(row):
-        if row["vantagem_casa"] > 0.03:
-            return "Casa"
-        elif row["vantagem_casa"] < -0.03:
-            return "Visitante"
-        return "Equilibrado"
-    df["direcao_prevista"] = df.apply(direcao, axis=1)
-    df["nivel_forca_vencedor"] = df["vantagem_casa"].apply(classificar_nivel)
-    df["nivel_forca_margem"] = df["vantagem_2mais_casa"].apply(classificar_nivel)
-    def texto_margem(row):
-        vc, vm = row["vantagem_casa"], row["vantagem_2mais_casa"]
-        if vc > 0.03 and vm > 0.05:
-            return "Casa com chance de vencer por 2+"
-        elif vc > 0.03:
-            return "Casa com tendência de vencer"
-        elif vc < -0.03 and vm < -0.05:
-            return "Visitante com chance de vencer por 2+"
-        elif vc < -0.03:
-            return "Visitante com tendência de vencer"
-        return "Jogo equilibrado"
-    df["leitura_final"] = df.apply(texto_margem, axis=1)
-    def mercado(row):
-        txt = row["leitura_final"]
-        if txt == "Casa com chance de vencer por 2+":
-            return "Casa vencer / Casa -1.5"
-        elif txt == "Casa com tendência de vencer":
-            return "Casa vencer / Casa DNB"
-        elif txt == "Visitante com chance de vencer por 2+":
-            return "Visitante vencer / Visitante -1.5"
-        elif txt == "Visitante com tendência de vencer":
-            return "Visitante vencer / Visitante DNB"
-        return "Evitar margem / jogo equilibrado"
-    df["mercado_sugerido"] = df.apply(mercado, axis=1)
-    df["score_geral_oportunidade"] = df["vantagem_casa"].abs() * 0.60 + df["vantagem_2mais_casa"].abs() * 0.40
-    df = criar_semaforo_oportunidades(df)
+    vc = df["score_casa_vence"] - df["score_visitante_vence"]
+    vm = df["score_casa_2mais"] - df["score_visitante_2mais"]
+    leitura = pd.Series(np.select(
+        [(vc > 0.03) & (vm > 0.05), vc > 0.03, (vc < -0.03) & (vm < -0.05), vc < -0.03],
+        [
+            "Casa com chance de vencer por 2+", "Casa com tendência de vencer",
+            "Visitante com chance de vencer por 2+", "Visitante com tendência de vencer",
+        ],
+        "Jogo equilibrado",
+    ), index=df.index)
+    df = df.assign(
+        vantagem_casa=vc,
+        vantagem_2mais_casa=vm,
+        direcao_prevista=pd.Series(np.select([vc > 0.03, vc < -0.03], ["Casa", "Visitante"], "Equilibrado"), index=df.index),
+        nivel_forca_vencedor=classificar_nivel(vc),
+        nivel_forca_margem=classificar_nivel(vm),
+        leitura_final=leitura,
+        mercado_sugerido=leitura.map(LEITURA_MERCADO).fillna("Evitar margem / jogo equilibrado"),
+        score_geral_oportunidade=vc.abs() * 0.60 + vm.abs() * 0.40,
+    )
+    return criar_semaforo_oportunidades(df)
+
+
+# Ingestão única das duas abas: os dois pipelines recebem os mesmos frames
+# e só leem deles (nada de escrever colunas em df1/df2).
+def baixar_abas():
+    frames, diag_fontes = ler_dataframes({
+        "ABA_1": (CSV_1, parse_csv_aba),
+        "ABA_2": (CSV_2, parse_csv_aba),
+    })
+    df1 = frames["ABA_1"]
+    if isinstance(df1, Exception):
+        raise df1
+    df2 = frames["ABA_2"]
+    aba2_ok = not isinstance(df2, Exception)
+    if not aba2_ok:
+        df2 = pd.DataFrame()
+    return df1, df2, aba2_ok, diag_fontes
+
+
+# Etapas linha-a-linha do pipeline: só recebem as linhas novas/alteradas
+# quando rodam pelo ProcessadorIncremental.
+def preparar_targets(df, mapa_base):
+    df = criar_targets(df, mapa_base)
+    status_col = mapa_base.get("status")
+    if status_col and status_col in df.columns:
+        df[status_col] = df[status_col].astype(str).str.upper().str.strip()
     return df
 
 
-@st.cache_data(ttl=1800, show_spinner=False)
-def rodar_pipeline_completo():
-    df1 = carregar_csv(CSV_1, "ABA_1")
-    try:
-        df2 = carregar_csv(CSV_2, "ABA_2")
-        aba2_ok = True
-    except Exception:
-        df2 = pd.DataFrame()
-        aba2_ok = False
+def preparar_features(df, colunas_numericas):
+    for c in colunas_numericas:
+        df[c] = to_float_series(df[c])
+    return df
+
+
+def juntar_regras(simples, interacoes):
+    # O modelo guarda as regras por forca; outra chave só reordena
+    if CHAVE_ORDEM_REGRAS != "forca":
+        simples = simples if simples.empty else ordenar_regras(simples, CHAVE_ORDEM_REGRAS)
+        interacoes = interacoes if interacoes.empty else ordenar_regras(interacoes, CHAVE_ORDEM_REGRAS)
+    top = simples.head(TOP_VARIAVEIS_POR_ALVO).copy()
+    if interacoes.empty or top.empty:
+        return top
+    return pd.concat([top, interacoes.head(TOP_INTERACOES_POR_ALVO)], ignore_index=True)
+
+
+def montar_tops(regras, interacoes):
+    # Regras simples primeiro e as de interação (par de faixas) depois
+    return {f"score_{a.removeprefix('target_')}": juntar_regras(regras[a], interacoes[a]) for a in ALVOS_REGRAS}
+
+
+def pontuar_linhas(df, tops, derivadas):
+    # Só as derivadas usadas por alguma regra escolhida viram coluna
+    usadas = [
+        v for regras in tops.values() if not regras.empty
+        for c in ("var", "var2") if c in regras.columns for v in regras[c].dropna()
+    ]
+    df = df.assign(**materializar(df, usadas, derivadas))
+    return PontuadorRegras(tops).pontuar(df)
+
+
+class EstadoIncremental:
+    def __init__(self):
+        self.targets = ProcessadorIncremental("targets")
+        self.features = ProcessadorIncremental("features")
+        self.scores = ProcessadorIncremental("scores")
+        self.colunas = CacheColunas(to_float_series)
+        self.tipos = InferenciaTipos(self.colunas, min_validos=0.50, min_unicos=4)
+        self.modelo = None  # ModeloRegras em uso (carregado do disco na primeira rodada)
+        self.walk_forward = None
+
+
+def rodar_walk_forward(df_hist, variaveis, derivadas):
+    # Mesmas regras/pontuação/semáforo do painel, com regras de antes de cada janela
+    def avaliar(janela, regras, interacoes):
+        tops = montar_tops(regras, interacoes)
+        pontuado = pontuar_linhas(janela, tops, derivadas)
+        return montar_painel_oportunidades(pontuado[[*tops, *ALVOS_REGRAS]])[["semaforo_oportunidade", *ALVOS_REGRAS]]
+
+    inicio = time.perf_counter()
+    avaliadas = avaliar_walk_forward(
+        df_hist, variaveis, ALVOS_REGRAS, avaliar, DOBRAS_WALK_FORWARD, min_linhas=MIN_LINHAS_FAIXA, q_faixas=Q_FAIXAS,
+        derivadas=derivadas, com_intervalos=CHAVE_ORDEM_REGRAS != "forca", max_interacoes=TOP_INTERACOES_POR_ALVO,
+    )
+    if avaliadas.empty:
+        return {"dobras": 0, "tabela": pd.DataFrame()}
+    tabela = acerto_por_nivel(avaliadas, "semaforo_oportunidade", ACERTO_POR_SEMAFORO, ["acerto_vencedor", "acerto_2mais"])
+    tabela = tabela.assign(
+        prioridade_operacional=tabela["semaforo_oportunidade"].map(SEMAFORO_PRIORIDADE).fillna(99).astype(np.int64)
+    ).sort_values(["prioridade_operacional", "semaforo_oportunidade"]).reset_index(drop=True)
+    return {
+        "dobras": int(avaliadas["dobra"].max()),
+        "jogos_avaliados": len(avaliadas),
+        "tempo_s": round(time.perf_counter() - inicio, 2),
+        "tabela": tabela,
+    }
+
+
+def calcular_pipeline_completo(abas, estado=None):
+    df1, df2, aba2_ok, diag_fontes = abas
+    estado = estado or EstadoIncremental()
 
     mapa1 = mapear_colunas_principais(df1)
     if aba2_ok and not df2.empty:
@@ -452,9 +505,8 @@ def rodar_pipeline_completo():
             c1, c2 = mapa1.get(k), mapa2.get(k)
             if c1 and c2:
                 chaves_merge.append((c1, c2))
-        df2_aj = df2.copy()
         rename_2 = {c2: c1 for c1, c2 in chaves_merge if c1 != c2}
-        df2_aj = df2_aj.rename(columns=rename_2)
+        df2_aj = df2.rename(columns=rename_2)
         chaves_finais = [c1 for c1, _ in chaves_merge if c1 in df1.columns and c1 in df2_aj.columns]
         if len(chaves_finais) >= 2:
             cols_extras_2 = [c for c in df2_aj.columns if c not in chaves_finais]
@@ -462,117 +514,137 @@ def rodar_pipeline_completo():
         else:
             df_base = pd.concat([df1.reset_index(drop=True), df2.reset_index(drop=True)], axis=1)
     else:
-        df_base = df1.copy()
+        df_base = df1
     df_base = df_base.loc[:, ~df_base.columns.duplicated()].copy()
 
     mapa_base = mapear_colunas_principais(df_base)
-    df_base = criar_targets(df_base, mapa_base)
     status_col = mapa_base.get("status")
-    if status_col and status_col in df_base.columns:
-        df_base[status_col] = df_base[status_col].astype(str).str.upper().str.strip()
-
-    df_hist = df_base.copy()
-    if status_col and status_col in df_hist.columns:
-        df_hist = df_hist[df_hist[status_col] == "FT"].copy()
-    df_hist = df_hist[df_hist["saldo_gols_final"].notna()].copy()
+    chaves_jogo = [mapa_base.get(k) for k in ["league", "hour", "home_team", "away_team"] if mapa_base.get(k)]
+    assinatura = assinar_linhas(df_base, chaves_jogo)
+    df_base, resumo_delta = estado.targets.processar(
+        df_base, assinatura, lambda d: preparar_targets(d, mapa_base), contexto=tuple(sorted(mapa_base.items()))
+    )
 
+    mask_hist = df_base["saldo_gols_final"].notna()
     if status_col and status_col in df_base.columns:
-        df_ns = df_base[df_base[status_col] == "NS"].copy()
+        mask_hist &= df_base[status_col] == "FT"
+        mask_ns = df_base[status_col] == "NS"
     else:
-        df_ns = pd.DataFrame()
-
-    colunas_numericas = identificar_colunas_numericas(df_hist)
-    for c in colunas_numericas:
-        df_hist[c] = to_float_series(df_hist[c])
-        df_base[c] = to_float_series(df_base[c])
-        if not df_ns.empty and c in df_ns.columns:
-            df_ns[c] = to_float_series(df_ns[c])
-
-    df_hist, vars_criadas_hist, pares_encontrados = criar_variaveis_derivadas_validas(df_hist, colunas_numericas)
-    df_base, vars_criadas_base, _ = criar_variaveis_derivadas_validas(df_base, colunas_numericas)
-    if not df_ns.empty:
-        df_ns, vars_criadas_ns, _ = criar_variaveis_derivadas_validas(df_ns, colunas_numericas)
-    variaveis_validas = montar_variaveis_validas(df_hist, colunas_numericas, vars_criadas_hist)
-
-    res_casa_vence = analisar_alvo(df_hist, variaveis_validas, "target_casa_vence")
-    res_visitante_vence = analisar_alvo(df_hist, variaveis_validas, "target_visitante_vence")
-    res_casa_2mais = analisar_alvo(df_hist, variaveis_validas, "target_casa_2mais")
-    res_visitante_2mais = analisar_alvo(df_hist, variaveis_validas, "target_visitante_2mais")
-
-    if res_casa_vence.empty or res_visitante_vence.empty:
-        raise ValueError("Não houve regras suficientes. Revise nomes de colunas e variáveis válidas.")
-
-    top_casa_vence = res_casa_vence.head(TOP_VARIAVEIS_POR_ALVO).copy()
-    top_visitante_vence = res_visitante_vence.head(TOP_VARIAVEIS_POR_ALVO).copy()
-    top_casa_2mais = res_casa_2mais.head(TOP_VARIAVEIS_POR_ALVO).copy()
-    top_visitante_2mais = res_visitante_2mais.head(TOP_VARIAVEIS_POR_ALVO).copy()
-
-    for base_nome, base_df in [("hist", df_hist), ("base", df_base), ("ns", df_ns)]:
-        if base_df.empty:
-            continue
-        base_df = criar_score_por_regras(base_df, top_casa_vence, "score_casa_vence")
-        base_df = criar_score_por_regras(base_df, top_visitante_vence, "score_visitante_vence")
-        base_df = criar_score_por_regras(base_df, top_casa_2mais, "score_casa_2mais")
-        base_df = criar_score_por_regras(base_df, top_visitante_2mais, "score_visitante_2mais")
-        if base_nome == "hist":
-            df_hist = base_df
-        elif base_nome == "base":
-            df_base = base_df
+        mask_ns = None
+
+    # Cada coluna de texto é convertida uma vez por conteúdo; detecção de tipo
+    # (por amostra) e features leem as colunas já convertidas
+    colunas_numericas = identificar_colunas_numericas(df_base, mask_hist, estado.tipos)
+    df_base = df_base.assign(**estado.colunas.tipar(df_base, colunas_numericas))
+    df_base, _ = estado.features.processar(
+        df_base, assinatura, lambda d: preparar_features(d, colunas_numericas), contexto=tuple(colunas_numericas)
+    )
+    definicoes, pares_encontrados = definir_variaveis_derivadas(colunas_numericas)
+    derivadas = expandir_definicoes(definicoes)
+
+    # Mineração é global sobre o FT e fica num modelo persistido: FT novos são
+    # somados nas estatísticas do modelo e só as linhas mudadas são pontuadas
+    assinatura_hist = assinatura_subconjunto(assinatura, mask_hist, colunas_numericas)
+    hashes_ft = assinatura[1][np.asarray(mask_hist, dtype=bool)]
+    if estado.modelo is None:
+        estado.modelo = carregar_modelo()
+    motivo_mineracao, novas_ft = motivo_reminerar(
+        estado.modelo, ALVOS_REGRAS, set(df_base.columns) | set(derivadas), hashes_ft, assinatura_hist,
+    )
+    if motivo_mineracao:
+        df_hist = df_base[mask_hist]
+        variaveis_validas = montar_variaveis_validas(df_hist, colunas_numericas, derivadas)
+        if PASTA_HISTORICO:
+            # O FT atual entra na pasta como mais um arquivo (sempre sobrescrito)
+            colunas_hist = [c for c in colunas_necessarias(variaveis_validas, ALVOS_REGRAS, derivadas) if c in df_hist.columns]
+            gravar_historico(df_hist[colunas_hist], PASTA_HISTORICO, "ft_atual")
+            estatisticas = minerar_arquivos(
+                arquivos_historico(PASTA_HISTORICO), variaveis_validas, ALVOS_REGRAS, Q_FAIXAS, derivadas=derivadas
+            )
         else:
-            df_ns = base_df
-
-    def montar_saida_oportunidades(df_origem: pd.DataFrame) -> pd.DataFrame:
-        if df_origem is None or df_origem.empty:
+            estatisticas = minerar_estatisticas(df_hist, variaveis_validas, ALVOS_REGRAS, Q_FAIXAS, derivadas=derivadas)
+        interacoes = (
+            minerar_interacoes(df_hist, estatisticas, ALVOS_REGRAS, MIN_LINHAS_FAIXA, derivadas=derivadas)
+            if TOP_INTERACOES_POR_ALVO > 0 else {}
+        )
+        modelo = ModeloRegras(
+            estatisticas, ALVOS_REGRAS, MIN_LINHAS_FAIXA, variaveis_validas, colunas_numericas, hashes_ft, assinatura_hist,
+            interacoes=interacoes,
+        )
+        if modelo.regras["target_casa_vence"].empty or modelo.regras["target_visitante_vence"].empty:
+            raise ValueError("Não houve regras suficientes. Revise nomes de colunas e variáveis válidas.")
+        estado.modelo = modelo
+        gravar_modelo(estado.modelo)
+    elif novas_ft:
+        # Refazer corte só com o FT da planilha não vale para o histórico em arquivos
+        limite_deriva = float("inf") if PASTA_HISTORICO else LIMITE_DERIVA
+        estado.modelo.absorver(df_base[mask_hist], hashes_ft, assinatura_hist, derivadas, limite_deriva)
+        gravar_modelo(estado.modelo)
+    modelo = estado.modelo
+    variaveis_validas = modelo.variaveis
+    tops = montar_tops(modelo.regras, modelo.interacoes)
+    df_base, _ = estado.scores.processar(df_base, assinatura, lambda d: pontuar_linhas(d, tops, derivadas), contexto=modelo.identificador)
+    # FT, NS e todos são recortes por máscara do mesmo frame: o painel de
+    # oportunidades é calculado uma vez, só sobre as colunas que a saída usa
+    df_hist = df_base[mask_hist]
+    df_ns = df_base[mask_ns] if mask_ns is not None else pd.DataFrame()
+
+    colunas_mapa = [
+        mapa_base.get("league"), mapa_base.get("hour"), mapa_base.get("home_team"),
+        mapa_base.get("away_team"), mapa_base.get("status"), mapa_base.get("result"),
+        mapa_base.get("gols_casa"), mapa_base.get("gols_fora"),
+        mapa_base.get("odds_home_win"), mapa_base.get("odds_draw"), mapa_base.get("odds_away_win"),
+    ]
+    extras = [
+        "score_casa_vence", "score_visitante_vence", "score_casa_2mais", "score_visitante_2mais",
+        "vantagem_casa", "vantagem_2mais_casa", "direcao_prevista", "nivel_forca_vencedor", "nivel_forca_margem",
+        "leitura_final", "mercado_sugerido", "semaforo_oportunidade", "prioridade_operacional", "mercado_operacional",
+        "score_geral_oportunidade", "gols_casa_final", "gols_fora_final",
+        "odds_casa_para_vencer", "odds_empate", "odds_visitante_para_vencer",
+    ]
+    colunas_entrada = list(dict.fromkeys(c for c in colunas_mapa + extras if c and c in df_base.columns))
+    painel = montar_painel_oportunidades(df_base[colunas_entrada])
+    colunas_saida = list(dict.fromkeys(c for c in colunas_mapa + extras if c and c in painel.columns))
+    painel = painel[colunas_saida]
+
+    def montar_saida_oportunidades(mascara=None) -> pd.DataFrame:
+        recorte = painel if mascara is None else painel[mascara]
+        if recorte.empty:
             return pd.DataFrame()
-        df_oportunidades = montar_painel_oportunidades(df_origem.copy())
-
-        colunas_saida = []
-        for c in [
-            mapa_base.get("league"), mapa_base.get("hour"), mapa_base.get("home_team"),
-            mapa_base.get("away_team"), mapa_base.get("status"), mapa_base.get("result"),
-            mapa_base.get("gols_casa"), mapa_base.get("gols_fora"),
-            mapa_base.get("odds_home_win"), mapa_base.get("odds_draw"), mapa_base.get("odds_away_win"),
-        ]:
-            if c and c in df_oportunidades.columns and c not in colunas_saida:
-                colunas_saida.append(c)
-        extras = [
-            "score_casa_vence", "score_visitante_vence", "score_casa_2mais", "score_visitante_2mais",
-            "vantagem_casa", "vantagem_2mais_casa", "direcao_prevista", "nivel_forca_vencedor", "nivel_forca_margem",
-            "leitura_final", "mercado_sugerido", "semaforo_oportunidade", "prioridade_operacional", "mercado_operacional",
-            "score_geral_oportunidade", "gols_casa_final", "gols_fora_final",
-            "odds_casa_para_vencer", "odds_empate", "odds_visitante_para_vencer",
-        ]
-        for c in extras:
-            if c in df_oportunidades.columns and c not in colunas_saida:
-                colunas_saida.append(c)
-
-        return df_oportunidades[colunas_saida].copy().sort_values(
+        return recorte.sort_values(
             ["prioridade_operacional", "score_geral_oportunidade"], ascending=[True, False]
         ).head(TOP_LIVE)
 
-    df_oportunidades_live = montar_saida_oportunidades(df_ns if not df_ns.empty else df_base)
-    df_oportunidades_ft = montar_saida_oportunidades(df_hist)
-    df_oportunidades_todos = montar_saida_oportunidades(df_base)
+    df_oportunidades_live = montar_saida_oportunidades(mask_ns if not df_ns.empty else None)
+    df_oportunidades_ft = montar_saida_oportunidades(mask_hist)
+    df_oportunidades_todos = montar_saida_oportunidades()
 
     def resumo_regras(df_regras, nome):
         if df_regras.empty:
             return pd.DataFrame()
-        r = df_regras[["var", "faixa", "jogos", "taxa_acerto", "baseline", "lift", "forca"]].copy()
+        r = df_regras.reindex(columns=[
+            "var", "faixa", "var2", "faixa2", "jogos", "taxa_acerto", "taxa_inf", "taxa_sup",
+            "baseline", "lift", "lift_inf", "lift_sup", "forca", "forca_inf",
+        ])
         r["alvo"] = nome
         return r
 
     resumo_top_regras = pd.concat([
-        resumo_regras(top_casa_vence, "Casa vence"),
-        resumo_regras(top_visitante_vence, "Visitante vence"),
-        resumo_regras(top_casa_2mais, "Casa 2+"),
-        resumo_regras(top_visitante_2mais, "Visitante 2+"),
+        resumo_regras(tops["score_casa_vence"], "Casa vence"),
+        resumo_regras(tops["score_visitante_vence"], "Visitante vence"),
+        resumo_regras(tops["score_casa_2mais"], "Casa 2+"),
+        resumo_regras(tops["score_visitante_2mais"], "Visitante 2+"),
     ], ignore_index=True)
 
+    if DOBRAS_WALK_FORWARD and (motivo_mineracao or estado.walk_forward is None):
+        estado.walk_forward = rodar_walk_forward(df_hist, variaveis_validas, derivadas)
+
     return {
         "df_oportunidades_live": df_oportunidades_live,
         "df_oportunidades_ft": df_oportunidades_ft,
         "df_oportunidades_todos": df_oportunidades_todos,
         "resumo_top_regras": resumo_top_regras,
+        "walk_forward": estado.walk_forward["tabela"] if estado.walk_forward else pd.DataFrame(),
         "variaveis_validas": pd.DataFrame({"variavel_modelagem": pd.Series(variaveis_validas)}),
         "df_ns": df_ns,
         "mapa_base": mapa_base,
@@ -584,6 +656,12 @@ def rodar_pipeline_completo():
             "num_numericas": len(colunas_numericas),
             "num_variaveis_validas": len(variaveis_validas),
             "num_pares": len(pares_encontrados),
+            "fontes": diag_fontes,
+            "incremental": {**resumo_delta, "mineracao_reaproveitada": motivo_mineracao is None},
+            "modelo": {**modelo.resumo(), "motivo_mineracao": motivo_mineracao, "novas_ft": novas_ft},
+            "walk_forward": {k: v for k, v in (estado.walk_forward or {}).items() if k != "tabela"},
+            "cache_colunas": estado.colunas.encerrar_rodada(),
+            "inferencia_tipos": estado.tipos.estatisticas,
         }
     }
 
@@ -783,7 +861,8 @@ def unir_bases_generico(df1, df2):
     comuns = [c for c in chaves_candidatas if c in df1.columns and c in df2.columns]
     if len(comuns) >= 2:
         cols_extras_2 = [c for c in df2.columns if c not in comuns]
-        return df1.merge(df2[comuns + cols_extras_2], on=comuns, how="left").loc[:, ~df1.merge(df2[comuns + cols_extras_2], on=comuns, how="left").columns.duplicated()].copy()
+        unido = df1.merge(df2[comuns + cols_extras_2], on=comuns, how="left")
+        return unido.loc[:, ~unido.columns.duplicated()].copy()
     return df1.loc[:, ~df1.columns.duplicated()].copy()
 
 def criar_score_1_under(df, mapa):
@@ -876,16 +955,9 @@ def criar_janelas_exposicao(df, mapa):
     df["leitura_operacional"] = df.apply(leitura, axis=1)
     return df
 
-@st.cache_data(ttl=1800, show_spinner=False)
-def rodar_pipeline_under_live():
-    df1 = carregar_csv(CSV_1, "UNDER_ABA_1")
-    try:
-        df2 = carregar_csv(CSV_2, "UNDER_ABA_2")
-        aba2_ok = True
-    except Exception:
-        df2 = pd.DataFrame()
-        aba2_ok = False
-    df_base = unir_bases_generico(df1, df2) if aba2_ok and not df2.empty else df1.copy()
+def calcular_pipeline_under_live(abas):
+    df1, df2, _, diag_fontes = abas
+    df_base = unir_bases_generico(df1, df2)
     mapa = mapear_colunas_under(df_base)
     faltantes = [k for k, v in mapa.items() if v is None]
     if faltantes:
@@ -897,7 +969,7 @@ def rodar_pipeline_under_live():
     df_ns[odd_over_col] = to_float_series(df_ns[odd_over_col])
     df_ns = df_ns[df_ns[odd_over_col] < ODD_OVER25_MAX].copy()
     if df_ns.empty:
-        return {"jogos": pd.DataFrame(), "janelas": pd.DataFrame(), "mapa": mapa, "diagnostico": {"linhas_ns": 0}}
+        return {"jogos": pd.DataFrame(), "janelas": pd.DataFrame(), "mapa": mapa, "diagnostico": {"linhas_ns": 0, "fontes": diag_fontes}}
     df_ns = criar_score_1_under(df_ns, mapa)
     df_ns = criar_score_2_under(df_ns, mapa)
     df_ns = criar_score_under_operacional(df_ns)
@@ -932,10 +1004,33 @@ def rodar_pipeline_under_live():
         "jogos": jogos,
         "janelas": tabela_janelas,
         "mapa": mapa,
-        "diagnostico": {"linhas_ns": len(df_ns), "linhas_filtradas_odd": len(jogos), "odd_over25_max": ODD_OVER25_MAX}
+        "diagnostico": {"linhas_ns": len(df_ns), "linhas_filtradas_odd": len(jogos), "odd_over25_max": ODD_OVER25_MAX, "fontes": diag_fontes}
     }
 
 
+# As abas são consultadas a cada INTERVALO_FONTES_S (304/hash igual custa quase nada);
+# os pipelines só recalculam quando alguma aba mudou de hash. A página nunca espera
+# o recálculo: lê o último resultado pronto.
+@st.cache_resource(show_spinner=False)
+def atualizadores():
+    abas = Atualizador(
+        "abas", baixar_abas, intervalo_s=INTERVALO_FONTES_S,
+        versao=lambda a: tuple(d.get("hash") for d in a[3].values()),
+    )
+    estado = EstadoIncremental()
+    completo = Atualizador("pipeline_completo", lambda: calcular_pipeline_completo(abas.obter(), estado), depende_de=[abas])
+    under = Atualizador("pipeline_under_live", lambda: calcular_pipeline_under_live(abas.obter()), depende_de=[abas])
+    return {"abas": abas, "completo": completo, "under": under}
+
+
+def rodar_pipeline_completo():
+    return atualizadores()["completo"].obter()
+
+
+def rodar_pipeline_under_live():
+    return atualizadores()["under"].obter()
+
+
 st.sidebar.markdown("## Ajustes")
 mostrar_diag = st.sidebar.checkbox("Mostrar diagnóstico", value=False)
 qtde_top = st.sidebar.slider("Qtd. jogos na fila", 10, 100, 30, 5)
@@ -1011,6 +1106,7 @@ with m4:
 if mostrar_diag:
     with st.expander("Diagnóstico do pipeline", expanded=False):
         st.write(diagnostico)
+        st.write("Atualização em segundo plano:", {k: a.diagnostico() for k, a in atualizadores().items()})
         st.write("Mapeamento base:", mapa_base)
         st.write("Colunas oportunidades:", df_live.columns.tolist())
 
@@ -1171,6 +1267,8 @@ with tab_under:
 with tab2:
     st.markdown("<div class='section-title'>Top regras</div><div class='section-sub'>Melhores faixas por alvo binário geradas pelo pipeline completo.</div>", unsafe_allow_html=True)
     st.dataframe(resumo_top_regras, use_container_width=True, hide_index=True)
+    st.markdown("<div class='section-title' style='margin-top:14px;'>Walk-forward</div><div class='section-sub'>Acerto por nível do semáforo em jogos FT pontuados com regras mineradas só com jogos anteriores.</div>", unsafe_allow_html=True)
+    st.dataframe(resultado["walk_forward"], use_container_width=True, hide_index=True)
 
 with tab3:
     st.markdown("<div class='section-title'>Variáveis válidas</div><div class='section-sub'>Variáveis finais para modelagem encontradas no histórico FT.</div>", unsafe_allow_html=True)
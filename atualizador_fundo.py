@@ -0,0 +1,84 @@
+import threading
+import time
+from typing import Callable, List, Optional
+
+# =========================================================
+# ATUALIZADOR EM SEGUNDO PLANO (STALE-WHILE-REVALIDATE)
+# Quem lê recebe sempre o último resultado bom, na hora. Uma thread
+# recalcula no intervalo e troca a referência de uma vez quando termina.
+# Atualizadores dependentes só recalculam quando a fonte muda de versão.
+# =========================================================
+INTERVALO_APOS_FALHA = 60
+
+
+class Atualizador:
+    def __init__(self, nome: str, funcao: Callable, intervalo_s: Optional[float] = None,
+                 depende_de: Optional[List["Atualizador"]] = None, versao: Optional[Callable] = None):
+        self.nome = nome
+        self.funcao = funcao
+        self.intervalo_s = intervalo_s
+        self.versao = versao
+        self._estado = (None, None, None)  # (valor, versao, erro), trocado de uma vez
+        self._pronto = threading.Event()
+        self._acordar = threading.Event()
+        self._dependentes: List["Atualizador"] = []
+        self.atualizado_em = None
+        self.duracao_s = None
+        self.execucoes = 0
+        self.falhas = 0
+        for fonte in depende_de or []:
+            fonte._dependentes.append(self)
+        self._thread = threading.Thread(target=self._loop, name=f"atualizador-{nome}", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while True:
+            ok = self._executar()
+            espera = self.intervalo_s if ok else min(self.intervalo_s or INTERVALO_APOS_FALHA, INTERVALO_APOS_FALHA)
+            self._acordar.wait(timeout=espera)
+            self._acordar.clear()
+
+    def _executar(self) -> bool:
+        inicio = time.perf_counter()
+        valor_antigo, versao_antiga, _ = self._estado
+        tinha_valor = self._pronto.is_set() and valor_antigo is not None
+        try:
+            novo = self.funcao()
+        except Exception as e:
+            self.falhas += 1
+            self._estado = (valor_antigo, versao_antiga, e)
+            self._pronto.set()
+            return False
+        nova_versao = self.versao(novo) if self.versao else None
+        self._estado = (novo, nova_versao, None)
+        self.execucoes += 1
+        self.atualizado_em = time.time()
+        self.duracao_s = round(time.perf_counter() - inicio, 3)
+        self._pronto.set()
+        if tinha_valor and (self.versao is None or nova_versao != versao_antiga):
+            for dependente in self._dependentes:
+                dependente.acordar()
+        return True
+
+    def acordar(self):
+        self._acordar.set()
+
+    def obter(self, timeout: Optional[float] = None):
+        # Só bloqueia na primeira carga; depois devolve sempre o último valor bom
+        self._pronto.wait(timeout)
+        valor, _, erro = self._estado
+        if valor is None:
+            if erro is not None:
+                raise erro
+            raise TimeoutError(f"{self.nome}: primeira carga ainda em andamento.")
+        return valor
+
+    def diagnostico(self) -> dict:
+        _, _, erro = self._estado
+        return {
+            "atualizado_em": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.atualizado_em)) if self.atualizado_em else None,
+            "duracao_s": self.duracao_s,
+            "execucoes": self.execucoes,
+            "falhas": self.falhas,
+            "ultimo_erro": str(erro) if erro is not None else None,
+        }
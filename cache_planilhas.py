@@ -0,0 +1,284 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import CodeType, FunctionType
+from typing import Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from snapshots_colunares import carregar_snapshot, gravar_snapshot, hash_na_data
+
+# =========================================================
+# CACHE EM DISCO DAS PLANILHAS PUBLICADAS
+# Cada URL vira um snapshot (.csv + .json) com ETag, Last-Modified
+# e hash do conteúdo. Planilha sem mudança custa um 304 (ou um hash
+# igual) e uma leitura local, sem novo parse.
+# =========================================================
+PASTA_CACHE = Path(os.environ.get("GOL_PASTA_CACHE", Path(__file__).resolve().parent / ".cache_planilhas"))
+TIMEOUT_PADRAO = 40
+POLITICA_PADRAO = {"timeout": TIMEOUT_PADRAO, "tentativas": 3, "backoff": 0.5}
+STATUS_REPETIR = {429, 500, 502, 503, 504}
+MAX_DOWNLOADS_SIMULTANEOS = 8
+TAM_BLOCO = 1 << 16
+# GOL_REPLAY_DATA=YYYY-MM-DD serve o último snapshot colunar daquele dia, sem rede
+DATA_REPLAY = os.environ.get("GOL_REPLAY_DATA")
+# Sobe quando o que vai para o snapshot muda fora do código alcançável a
+# partir do parser (formato do arquivo, versão do pandas/pyarrow, etc.)
+VERSAO_SNAPSHOT = 1
+
+_travas: Dict[str, threading.Lock] = {}
+_trava_global = threading.Lock()
+_parse_memo: Dict[tuple, object] = {}
+_sessao = None
+
+
+def _trava(chave: str) -> threading.Lock:
+    with _trava_global:
+        if chave not in _travas:
+            _travas[chave] = threading.Lock()
+        return _travas[chave]
+
+
+def sessao_http() -> requests.Session:
+    # Uma sessão keep-alive por processo, compartilhada por todas as abas
+    global _sessao
+    with _trava_global:
+        if _sessao is None:
+            s = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=MAX_DOWNLOADS_SIMULTANEOS, pool_maxsize=MAX_DOWNLOADS_SIMULTANEOS)
+            s.mount("http://", adaptador)
+            s.mount("https://", adaptador)
+            _sessao = s
+        return _sessao
+
+
+def _get_com_retentativas(http, url: str, headers: dict, politica: dict):
+    tentativas = max(1, int(politica.get("tentativas", 1)))
+    for i in range(1, tentativas + 1):
+        try:
+            resp = http.get(url, timeout=politica.get("timeout", TIMEOUT_PADRAO), headers=headers, stream=True)
+            if resp.status_code not in STATUS_REPETIR or i == tentativas:
+                return resp, i
+            resp.close()
+        except (requests.ConnectionError, requests.Timeout):
+            if i == tentativas:
+                raise
+        time.sleep(politica.get("backoff", 0) * (2 ** (i - 1)))
+
+
+def chave_url(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:20]
+
+
+def _caminhos(url: str, pasta: Path):
+    chave = chave_url(url)
+    return pasta / f"{chave}.csv", pasta / f"{chave}.json"
+
+
+def ler_meta(url: str, pasta: Optional[Path] = None) -> dict:
+    _, arq_meta = _caminhos(url, Path(pasta or PASTA_CACHE))
+    try:
+        return json.loads(arq_meta.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _tmp(destino: Path) -> Path:
+    return destino.with_name(f"{destino.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _gravar_meta(arq_meta: Path, meta: dict) -> None:
+    tmp = _tmp(arq_meta)
+    tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, arq_meta)
+
+
+def _gravar_corpo(resp, destino: Path) -> str:
+    # Corpo vai direto da rede para o disco em blocos, com o hash calculado
+    # no caminho: o CSV inteiro nunca fica na memória.
+    h = hashlib.sha256()
+    try:
+        with open(destino, "wb") as f:
+            for bloco in resp.iter_content(chunk_size=TAM_BLOCO):
+                h.update(bloco)
+                f.write(bloco)
+    except BaseException:
+        destino.unlink(missing_ok=True)
+        raise
+    return h.hexdigest()
+
+
+def _hash_arquivo(arquivo) -> str:
+    # sha256 do arquivo aberto; volta ao início para o parser
+    h = hashlib.sha256()
+    for bloco in iter(lambda: arquivo.read(TAM_BLOCO), b""):
+        h.update(bloco)
+    arquivo.seek(0)
+    return h.hexdigest()
+
+
+def baixar_csv(url: str, nome: str = "base", pasta: Optional[Path] = None,
+               politica: Optional[dict] = None, sessao=None) -> dict:
+    # origem: "rede" (conteúdo novo), "304" (servidor confirmou que nada mudou)
+    # ou "hash" (veio 200, mas o conteúdo é igual ao snapshot local)
+    inicio = time.perf_counter()
+    resp = _baixar_csv(url, nome, Path(pasta or PASTA_CACHE), {**POLITICA_PADRAO, **(politica or {})}, sessao or sessao_http())
+    resp["tempo_s"] = round(time.perf_counter() - inicio, 3)
+    return resp
+
+
+def _baixar_csv(url: str, nome: str, pasta: Path, politica: dict, http) -> dict:
+    with _trava(chave_url(url)):
+        arq_csv, arq_meta = _caminhos(url, pasta)
+        meta = ler_meta(url, pasta)
+        tem_local = bool(meta) and arq_csv.exists()
+        headers = {}
+        if tem_local:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        resp, tentativas = _get_com_retentativas(http, url, headers, politica)
+        with resp:
+            if resp.status_code == 304 and tem_local:
+                return {"nome": nome, "arquivo": arq_csv, "hash": meta["hash"], "origem": "304", "tentativas": tentativas}
+            resp.raise_for_status()
+            pasta.mkdir(parents=True, exist_ok=True)
+            tmp = _tmp(arq_csv)
+            h = _gravar_corpo(resp, tmp)
+            novo_meta = {
+                "url": url,
+                "hash": h,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+            }
+
+        if tem_local and meta.get("hash") == h:
+            tmp.unlink()
+            if novo_meta != meta:
+                _gravar_meta(arq_meta, novo_meta)
+            return {"nome": nome, "arquivo": arq_csv, "hash": h, "origem": "hash", "tentativas": tentativas}
+
+        os.replace(tmp, arq_csv)
+        _gravar_meta(arq_meta, novo_meta)
+        return {"nome": nome, "arquivo": arq_csv, "hash": h, "origem": "rede", "tentativas": tentativas}
+
+
+def _canonico(valor) -> str:
+    # repr com sets em ordem fixa: o repr de um set muda com o PYTHONHASHSEED
+    if isinstance(valor, (set, frozenset)):
+        return f"{type(valor).__name__}({sorted(map(_canonico, valor))!r})"
+    if isinstance(valor, (tuple, list)):
+        itens = ", ".join(map(_canonico, valor))
+        return f"({itens},)" if isinstance(valor, tuple) else f"[{itens}]"
+    if isinstance(valor, dict):
+        return "{" + ", ".join(f"{_canonico(k)}: {_canonico(v)}" for k, v in valor.items()) + "}"
+    return repr(valor)
+
+
+def _assinar_codigo(h, codigo: CodeType, globais: dict, vistos: set) -> None:
+    # Bytecode e constantes da função, das funções aninhadas e de tudo que ela
+    # chama pelo nome (tipar_frame, para_numero, normalizar_coluna...), mais os
+    # valores simples dos globais que ela lê (regex, tamanhos de bloco, mapas)
+    h.update(codigo.co_code)
+    for const in codigo.co_consts:
+        if isinstance(const, CodeType):
+            _assinar_codigo(h, const, globais, vistos)
+        else:
+            h.update(_canonico(const).encode("utf-8"))
+    for nome in codigo.co_names:
+        if nome not in globais:
+            continue
+        valor = globais[nome]
+        if isinstance(valor, FunctionType):
+            if valor.__code__ not in vistos:
+                vistos.add(valor.__code__)
+                _assinar_codigo(h, valor.__code__, valor.__globals__, vistos)
+        elif isinstance(valor, re.Pattern):
+            h.update(f"{nome}={valor.pattern!r}".encode("utf-8"))
+        elif isinstance(valor, (str, bytes, int, float, tuple, list, dict, set, frozenset)):
+            h.update(f"{nome}={_canonico(valor)}".encode("utf-8"))
+
+
+def fonte_snapshot(url: str, parser: Callable) -> str:
+    # O código que produz o frame entra na chave: mudou o parser ou algum
+    # ajudante dele, o snapshot antigo não serve (nem no replay)
+    h = hashlib.sha1(f"v{VERSAO_SNAPSHOT}".encode("utf-8"))
+    _assinar_codigo(h, parser.__code__, parser.__globals__, {parser.__code__})
+    return f"{chave_url(url)}__{parser.__qualname__}_{h.hexdigest()[:8]}"
+
+
+def _parse_memorizado(url: str, parser: Callable, resp: dict):
+    chave = (url, parser.__module__, parser.__qualname__)
+    memo = _parse_memo.get(chave)
+    if memo is None or memo[0] != resp["hash"]:
+        fonte = fonte_snapshot(url, parser)
+        h = resp["hash"]
+        df = carregar_snapshot(fonte, h)
+        if df is None:
+            if resp["arquivo"] is None:
+                raise ValueError(f"{resp['nome']}: snapshot {resp['hash'][:12]} não encontrado.")
+            # parser(arquivo_binario, nome) lê o CSV direto do disco. Outro
+            # processo pode ter trocado o arquivo (os.replace) depois do
+            # download; o arquivo aberto não muda mais, então o hash dele é o
+            # que vale para o snapshot e para o memo.
+            with open(resp["arquivo"], "rb") as arquivo:
+                h = _hash_arquivo(arquivo)
+                df = parser(arquivo, resp["nome"])
+            gravar_snapshot(fonte, h, df)
+        _parse_memo[chave] = (h, df)
+    else:
+        df = memo[1]
+    return df.copy()
+
+
+def _resposta_replay(url: str, parser: Callable, nome: str) -> dict:
+    h = hash_na_data(fonte_snapshot(url, parser), DATA_REPLAY)
+    if h is None:
+        raise ValueError(f"{nome}: nenhum snapshot gravado até {DATA_REPLAY}.")
+    return {"nome": nome, "arquivo": None, "hash": h, "origem": "replay", "tentativas": 0, "tempo_s": 0.0}
+
+
+def _obter(url: str, parser: Callable, nome: str, **kwargs) -> dict:
+    if DATA_REPLAY:
+        return _resposta_replay(url, parser, nome)
+    return baixar_csv(url, nome, **kwargs)
+
+
+def ler_dataframe(url: str, parser: Callable, nome: str = "base", **kwargs):
+    # o parser só roda quando o hash mudou; o chamador sempre recebe uma cópia
+    return _parse_memorizado(url, parser, _obter(url, parser, nome, **kwargs))
+
+
+def ler_dataframes(fontes: Dict[str, tuple], **kwargs):
+    # fontes: nome -> (url, parser) ou (url, parser, politica). Todas as abas são
+    # baixadas em paralelo; a latência fica presa à aba mais lenta, não à soma.
+    # Retorna (frames, diagnostico); aba que falhou vem como a exceção em frames[nome].
+    def tarefa(nome, spec):
+        url, parser = spec[0], spec[1]
+        politica = spec[2] if len(spec) > 2 else None
+        inicio = time.perf_counter()
+        try:
+            resp = _obter(url, parser, nome, politica=politica, **kwargs)
+            return _parse_memorizado(url, parser, resp), {
+                "tempo_s": resp["tempo_s"], "tentativas": resp["tentativas"], "origem": resp["origem"],
+                "hash": resp["hash"][:16],
+            }
+        except Exception as e:
+            return e, {"tempo_s": round(time.perf_counter() - inicio, 3), "erro": str(e)}
+
+    if not fontes:
+        return {}, {}
+    with ThreadPoolExecutor(max_workers=min(MAX_DOWNLOADS_SIMULTANEOS, len(fontes))) as pool:
+        futuros = {nome: pool.submit(tarefa, nome, spec) for nome, spec in fontes.items()}
+    frames, diagnostico = {}, {}
+    for nome, futuro in futuros.items():
+        frames[nome], diagnostico[nome] = futuro.result()
+    return frames, diagnostico
@@ -0,0 +1,137 @@
+import hashlib
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# CACHE DE COLUNAS TIPADAS
+# Cada coluna de texto é convertida para número uma vez só: o resultado fica
+# guardado por (nome da coluna, hash do conteúdo). Detecção de tipo, features
+# e alvos leem daqui; na próxima atualização só as colunas que mudaram
+# passam de novo pelo conversor.
+# =========================================================
+def hash_coluna(s: pd.Series) -> str:
+    h = pd.util.hash_pandas_object(s, index=False).to_numpy()
+    return hashlib.sha1(h.tobytes()).hexdigest()
+
+
+def _eh_numerica(s: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s)
+
+
+class CacheColunas:
+    def __init__(self, conversor: Callable[[pd.Series], pd.Series]):
+        self.conversor = conversor
+        self._memo: Dict[tuple, np.ndarray] = {}
+        self._usadas = set()
+        self.conversoes = 0
+        self.acertos = 0
+
+    def converter(self, s: pd.Series) -> pd.Series:
+        if _eh_numerica(s):
+            return s.astype(float)
+        chave = (s.name, len(s), hash_coluna(s))
+        valores = self._memo.get(chave)
+        if valores is None:
+            valores = self.conversor(s).to_numpy(dtype=float)
+            self._memo[chave] = valores
+            self.conversoes += 1
+        else:
+            self.acertos += 1
+        self._usadas.add(chave)
+        return pd.Series(valores.copy(), index=s.index, name=s.name)
+
+    def tipar(self, df: pd.DataFrame, colunas: Optional[Iterable[str]] = None) -> Dict[str, pd.Series]:
+        return {c: self.converter(df[c]) for c in (df.columns if colunas is None else colunas)}
+
+    def encerrar_rodada(self) -> dict:
+        # Esquece o que não foi usado nesta atualização (colunas que mudaram/sumiram)
+        self._memo = {k: v for k, v in self._memo.items() if k in self._usadas}
+        resumo = {"conversoes": self.conversoes, "acertos": self.acertos, "em_cache": len(self._memo)}
+        self._usadas = set()
+        self.conversoes = self.acertos = 0
+        return resumo
+
+
+# =========================================================
+# INFERÊNCIA DE TIPO POR AMOSTRA
+# Regra: numérica = pelo menos min_validos das linhas convertem e há pelo
+# menos min_unicos valores distintos. Colunas já numéricas são checadas
+# direto (barato). Coluna de texto passa primeiro por uma amostra
+# estratificada aleatória (uma linha sorteada em cada uma de
+# TAMANHO_AMOSTRA fatias iguais da planilha, sorteios independentes): se a
+# taxa de válidos fica abaixo do limite com folga (Hoeffding, que vale
+# porque a linha de cada fatia é sorteada e não fixa), é descartada sem
+# converter a coluna inteira; caso contrário a decisão sai da coluna
+# completa, pelo CacheColunas, que as features vão usar de qualquer jeito.
+# As decisões ficam guardadas por impressão do conjunto de colunas, e as
+# positivas pulam a amostra na próxima atualização.
+# =========================================================
+TAMANHO_AMOSTRA = 512
+DELTA_AMOSTRA = 1e-6
+SEMENTE_AMOSTRA = 0
+
+
+def impressao_colunas(colunas: Iterable[str]) -> str:
+    return hashlib.sha1("\x1f".join(map(str, colunas)).encode("utf-8")).hexdigest()[:16]
+
+
+class InferenciaTipos:
+    def __init__(self, cache: CacheColunas, min_validos: float = 0.50, min_unicos: int = 4,
+                 tamanho_amostra: int = TAMANHO_AMOSTRA, delta: float = DELTA_AMOSTRA,
+                 semente: int = SEMENTE_AMOSTRA):
+        self.cache = cache
+        self.min_validos = min_validos
+        self.min_unicos = min_unicos
+        self.tamanho_amostra = tamanho_amostra
+        self.folga = float(np.sqrt(np.log(2 / delta) / (2 * tamanho_amostra)))
+        self._aleatorio = np.random.default_rng(semente)
+        self._impressao = None
+        self._decisoes: Dict[str, bool] = {}
+        self.estatisticas = {}
+
+    def _amostra(self, n: int) -> np.ndarray:
+        # Uma posição sorteada por fatia: cobre o começo, o meio e o fim da
+        # planilha e não deixa valores ruins escondidos entre posições fixas
+        if n <= self.tamanho_amostra:
+            return np.arange(n)
+        cortes = np.linspace(0, n, self.tamanho_amostra + 1).astype(np.int64)
+        return cortes[:-1] + (self._aleatorio.random(self.tamanho_amostra) * np.diff(cortes)).astype(np.int64)
+
+    def _decidir(self, s: pd.Series) -> bool:
+        validos = int(s.notna().sum())
+        if len(s) == 0 or validos < self.min_validos * len(s):
+            return False
+        return s.nunique(dropna=True) >= self.min_unicos
+
+    def colunas_numericas(self, df: pd.DataFrame, mascara=None) -> list:
+        impressao = impressao_colunas(df.columns)
+        if impressao != self._impressao:
+            self._impressao, self._decisoes = impressao, {}
+        linhas = np.flatnonzero(np.ones(len(df), bool) if mascara is None else np.asarray(mascara, dtype=bool))
+        amostra = linhas[self._amostra(len(linhas))]
+        contagem = {"diretas": 0, "descartadas_amostra": 0, "varredura_completa": 0, "reaproveitadas": 0}
+        numericas = []
+        for c in df.columns:
+            s = df[c]
+            if _eh_numerica(s):
+                contagem["diretas"] += 1
+                decisao = self._decidir(s.iloc[linhas])
+            else:
+                if self._decisoes.get(c):
+                    contagem["reaproveitadas"] += 1
+                else:
+                    if len(amostra) >= self.tamanho_amostra:
+                        taxa = float(self.cache.conversor(s.iloc[amostra]).notna().mean())
+                        if taxa < self.min_validos - self.folga:
+                            contagem["descartadas_amostra"] += 1
+                            self._decisoes[c] = False
+                            continue
+                    contagem["varredura_completa"] += 1
+                decisao = self._decidir(self.cache.converter(s).iloc[linhas])
+            self._decisoes[c] = decisao
+            if decisao:
+                numericas.append(c)
+        self.estatisticas = contagem
+        return numericas
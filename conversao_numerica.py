@@ -0,0 +1,81 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# CONVERSÃO NUMÉRICA ÚNICA (PT-BR E EN)
+# Um só parser para todos os painéis. Regras, nesta ordem:
+#   - descarta tudo que não é dígito, ponto, vírgula ou sinal ("45%", "R$ 2,10")
+#   - com ponto e vírgula juntos, o que vem por último é o decimal ("1.234,5", "1,234.5")
+#   - um separador só, aparecendo uma vez, é decimal ("2,10", "1.85")
+#   - separador repetido é milhar ("1.234.567")
+#   - "-" só vale como sinal no começo ("2-1" não é número)
+#   - expoente colado num dígito, no fim, é notação científica ("2.5E3", "1,5e-3")
+# A conversão roda sobre os valores distintos da coluna (factorize) e volta
+# por índice, então colunas com muitos valores repetidos custam pouco.
+# =========================================================
+RE_LIXO = r"[^\d.,\-]"
+RE_EXPOENTE = r"^(.*\d)\s*[eE]([+\-]?\d+)\s*$"
+RE_FLOAT = r"^-?(?:\d+\.?\d*|\.\d+)(?:e[+\-]?\d+)?$"
+
+
+def _converter_textos(textos: pd.Series) -> np.ndarray:
+    # A mantissa passa pelas regras de separador; o expoente volta no fim
+    texto = textos.astype(str)
+    expoente = pd.Series(np.nan, index=texto.index, dtype=object)
+    tem_e = texto.str.contains("[eE]", regex=True).to_numpy(dtype=bool)
+    if tem_e.any():
+        partes = texto[tem_e].str.extract(RE_EXPOENTE)
+        texto = texto.copy()
+        texto[tem_e] = partes[0].fillna(texto[tem_e])
+        expoente[tem_e] = partes[1]
+    com_expoente = expoente.notna().to_numpy()
+    t = texto.str.replace(RE_LIXO, "", regex=True)
+    pontos = t.str.count(r"\.").to_numpy()
+    virgulas = t.str.count(",").to_numpy()
+    ult_ponto = t.str.rfind(".").to_numpy()
+    ult_virgula = t.str.rfind(",").to_numpy()
+    dec_virgula = (virgulas == 1) & ((pontos == 0) | (ult_virgula > ult_ponto))
+    dec_ponto = (pontos == 1) & ((virgulas == 0) | (ult_ponto > ult_virgula))
+
+    limpo = t.copy()
+    if dec_virgula.any():
+        limpo[dec_virgula] = t[dec_virgula].str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    if dec_ponto.any():
+        limpo[dec_ponto] = t[dec_ponto].str.replace(",", "", regex=False)
+    milhar = ~(dec_virgula | dec_ponto) & ((pontos > 0) | (virgulas > 0))
+    if milhar.any():
+        limpo[milhar] = t[milhar].str.replace(r"[.,]", "", regex=True)
+    if com_expoente.any():
+        limpo[com_expoente] = limpo[com_expoente] + "e" + expoente[com_expoente]
+    # float() do Python arredonda certo; o to_numeric trunca mantissas longas
+    valido = limpo.str.match(RE_FLOAT).to_numpy(dtype=bool)
+    saida = np.full(len(limpo), np.nan)
+    saida[valido] = limpo[valido].astype(float).to_numpy()
+    return saida
+
+
+def para_numero(s: pd.Series) -> pd.Series:
+    # Booleanos viram 1/0, como no pd.to_numeric
+    if pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s):
+        return s.astype(float)
+    codigos, unicos = pd.factorize(s, use_na_sentinel=True)
+    unicos = np.asarray(unicos, dtype=object)
+    valores = _converter_textos(pd.Series(unicos)) if len(unicos) else np.empty(0)
+    booleanos = np.array([isinstance(u, (bool, np.bool_)) for u in unicos], dtype=bool)
+    if booleanos.any():
+        valores[booleanos] = unicos[booleanos].astype(float)
+    saida = np.full(len(s), np.nan)
+    validos = codigos >= 0
+    saida[validos] = valores[codigos[validos]]
+    return pd.Series(saida, index=s.index, name=s.name)
+
+
+def para_numero_escalar(valor) -> Optional[float]:
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    if isinstance(valor, (int, float, np.number, np.bool_)):
+        return float(valor)
+    convertido = _converter_textos(pd.Series([valor], dtype=object))[0]
+    return None if np.isnan(convertido) else float(convertido)
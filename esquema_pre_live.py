@@ -0,0 +1,157 @@
+from functools import lru_cache
+from typing import BinaryIO, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from conversao_numerica import para_numero
+from snapshots_colunares import tipar_frame
+
+# =========================================================
+# ESQUEMA DA PLANILHA PRÉ-LIVE
+# Cada campo lógico tem seus apelidos na planilha, o tipo de conteúdo
+# ("numero", "par", "par_texto", "texto") e o dtype final. O cabeçalho
+# real é resolvido uma vez num plano, e o plano converte cada coluna
+# inteira de uma vez, sem chamada Python por célula.
+# =========================================================
+class Campo(NamedTuple):
+    nome: str
+    apelidos: Tuple[str, ...]
+    tipo: str
+    dtype: str
+
+
+ESQUEMA_PRE_LIVE: List[Campo] = [
+    Campo("league", ("League", "Liga", "Campeonato"), "texto", "category"),
+    Campo("country", ("Country", "País"), "texto", "category"),
+    Campo("home", ("Home Team", "Casa", "Mandante", "Time Casa"), "texto", "category"),
+    Campo("away", ("Visitor Team", "Visitante", "Fora", "Time Visitante"), "texto", "category"),
+    Campo("hour", ("Hour", "Hora"), "texto", "str"),
+    Campo("date", ("Date", "Data"), "texto", "str"),
+    Campo("status", ("Status",), "texto", "str"),
+    Campo("odd_home", ("Odds Casa para vencer", "(Odds)Casa para vencer", "Odd Casa"), "numero", "float64"),
+    Campo("odd_away", ("Odds Visitante para vencer", "(Odds)Visitante para vencer", "Odd Visitante"), "numero", "float64"),
+    Campo("odd_over25", ("Odds Mais de 2.5 gols", "(Odds)Mais de 2.5 gols"), "numero", "float64"),
+    Campo("odd_under25", ("Odds Menos de 2.5 gols", "(Odds)Menos de 2.5 gols"), "numero", "float64"),
+    Campo("odd_btts_yes", ("Odds Ambas as equipes marcam (Sim)", "(Odds)Ambas as equipes marcam (Sim)"), "numero", "float64"),
+    Campo("odd_btts_no", ("Odds Ambas as equipes marcam (Não)", "(Odds)Ambas as equipes marcam (Não)"), "numero", "float64"),
+    Campo("odd_over05ht", ("Odds Mais de 0.5 gol 1º tempo", "(Odds)Mais de 0.5 gol 1º tempo"), "numero", "float64"),
+    Campo("win_pct", ("(W%) Vitórias",), "par", "float64"),
+    Campo("draw_pct", ("(D%) Empates",), "par", "float64"),
+    Campo("loss_pct", ("(L%) Derrotas",), "par", "float64"),
+    Campo("efficiency", ("Eficiência",), "par", "float64"),
+    Campo("efficacy_ht", ("Eficácia 1º tempo",), "par", "float64"),
+    Campo("efficiency_2h", ("Eficiência 2º tempo",), "par", "float64"),
+    Campo("rank", ("Classificação",), "par", "float64"),
+    Campo("games", ("Número de jogos calculados",), "par", "float64"),
+    Campo("avg_gf", ("Média de gols marcados",), "par", "float64"),
+    Campo("avg_ga", ("Média de gols sofridos",), "par", "float64"),
+    Campo("avg_gf_ht", ("Média de gols marcados 1º tempo",), "par", "float64"),
+    Campo("avg_ga_ht", ("Média de gols sofridos 1º tempo",), "par", "float64"),
+    Campo("avg_gf_2h", ("Média de gols marcados 2º tempo",), "par", "float64"),
+    Campo("avg_ga_2h", ("Média de gols sofridos 2º tempo",), "par", "float64"),
+    Campo("over15", ("Mais de 1.5 gols",), "numero", "float64"),
+    Campo("over25", ("Mais de 2.5 gols",), "numero", "float64"),
+    Campo("over05ht", ("Mais de 0.5 gol 1º tempo",), "numero", "float64"),
+    Campo("under25", ("Menos de 2.5 gols",), "numero", "float64"),
+    Campo("under15", ("Menos de 1.5 gols",), "numero", "float64"),
+    Campo("btts", ("Ambas marcam", "Ambas as equipes marcam"), "numero", "float64"),
+    Campo("scored_first", ("Marcou primeiro gol",), "par", "float64"),
+    Campo("scored_first_ht", ("Marcou primeiro gol 1º tempo",), "par", "float64"),
+    Campo("conceded_first_ht", ("Sofreu primeiro gol 1º tempo",), "par", "float64"),
+    Campo("conceded_first", ("Sofreu primeiro gol",), "par", "float64"),
+    Campo("res1", ("Primeiro resultado mais comum",), "par_texto", "str"),
+    Campo("res2", ("Segundo resultado mais comum",), "par_texto", "str"),
+    Campo("res3", ("Terceiro resultado mais comum",), "par_texto", "str"),
+    Campo("res1_ht", ("Primeiro resultado mais comum 1º tempo",), "par_texto", "str"),
+    Campo("res2_ht", ("Segundo resultado mais comum 1º tempo",), "par_texto", "str"),
+    Campo("res3_ht", ("Terceiro resultado mais comum 1º tempo",), "par_texto", "str"),
+    Campo("win_pct_ht", ("(W%) Vitórias 1º tempo",), "par", "float64"),
+    Campo("win_pct_2h", ("(W%) Vitórias 2º tempo",), "par", "float64"),
+]
+
+RE_SEPARADOR_PAR = r"\||/| x | X | vs | VS |;"
+
+
+def numero_vetorizado(s: pd.Series) -> pd.Series:
+    # Mesmo parser de todos os painéis (conversao_numerica)
+    return para_numero(s)
+
+
+def par_vetorizado(s: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    # "55 | 40", "55/40", "1.2 x 0.8"... -> (casa, visitante). Com menos de dois
+    # números, o texto inteiro vira o valor da casa e o visitante fica NaN.
+    t = s.astype(str)
+    partes = t.str.split(RE_SEPARADOR_PAR, regex=True, expand=True)
+    numeros = np.column_stack([numero_vetorizado(partes[c]).to_numpy() for c in partes.columns])
+    valido = ~np.isnan(numeros)
+    ordem = np.argsort(~valido, axis=1, kind="stable")
+    alinhados = np.take_along_axis(numeros, ordem, axis=1)
+    dois = valido.sum(axis=1) >= 2
+    inteiro = numero_vetorizado(t).to_numpy()
+    casa = np.where(dois, alinhados[:, 0], inteiro)
+    fora = np.where(dois, alinhados[:, 1] if alinhados.shape[1] > 1 else np.nan, np.nan)
+    return pd.Series(casa, index=s.index), pd.Series(fora, index=s.index)
+
+
+def par_texto_vetorizado(s: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    # "2-1 | 1-1" -> ("2-1", "1-1"); sem "|" o texto fica na casa e o visitante é "-"
+    t = s.astype(str).where(s.notna(), "-")
+    tem = t.str.contains("|", regex=False)
+    partes = t.str.split("|", n=2)
+    casa = t.where(~tem, partes.str[0].str.strip())
+    fora = pd.Series("-", index=s.index, dtype=t.dtype).where(~tem, partes.str[1].str.strip())
+    return casa, fora
+
+
+@lru_cache(maxsize=32)
+def compilar_plano(colunas: Tuple[str, ...], esquema: Tuple[Campo, ...] = tuple(ESQUEMA_PRE_LIVE)) -> tuple:
+    # Resolve apelidos -> coluna real (primeiro apelido presente, sem diferenciar
+    # maiúsculas/espaços). Devolve (renomear, campos resolvidos, faltantes).
+    por_chave = {str(c).lower().strip(): c for c in colunas}
+    renomear = {}
+    for campo in esquema:
+        for apelido in campo.apelidos:
+            original = por_chave.get(apelido.lower().strip())
+            if original is not None:
+                renomear[original] = campo.nome
+                break
+    presentes = set(renomear.values())
+    resolvidos = tuple(c for c in esquema if c.nome in presentes)
+    faltantes = tuple(c for c in esquema if c.nome not in presentes)
+    return renomear, resolvidos, faltantes
+
+
+def dtypes_leitura(cabecalho: Sequence[str]) -> dict:
+    # Colunas de texto/par são lidas como str direto pelo read_csv, sem inferência
+    renomear, resolvidos, _ = compilar_plano(tuple(str(c).strip() for c in cabecalho))
+    tipos = {c.nome: c.tipo for c in resolvidos}
+    return {bruto: str for bruto in cabecalho
+            if tipos.get(renomear.get(str(bruto).strip())) in ("texto", "par", "par_texto")}
+
+
+def ler_pre_live(arquivo: BinaryIO) -> pd.DataFrame:
+    cabecalho = pd.read_csv(arquivo, nrows=0).columns
+    arquivo.seek(0)
+    df = pd.read_csv(arquivo, dtype=dtypes_leitura(cabecalho))
+    df.columns = [str(c).strip() for c in df.columns]
+    return aplicar_esquema(df)
+
+
+def aplicar_esquema(df: pd.DataFrame) -> pd.DataFrame:
+    renomear, resolvidos, faltantes = compilar_plano(tuple(df.columns))
+    df = df.rename(columns=renomear)
+    novas = {}
+    for campo in resolvidos:
+        s = df[campo.nome]
+        if campo.tipo == "numero":
+            novas[campo.nome] = numero_vetorizado(s)
+        elif campo.tipo == "par":
+            novas[f"{campo.nome}_home"], novas[f"{campo.nome}_away"] = par_vetorizado(s)
+        elif campo.tipo == "par_texto":
+            novas[f"{campo.nome}_home"], novas[f"{campo.nome}_away"] = par_texto_vetorizado(s)
+    for campo in faltantes:
+        if campo.tipo == "texto":
+            novas[campo.nome] = "-"
+    df = df.assign(**novas)
+    return tipar_frame(df, categoricas=[c.nome for c in ESQUEMA_PRE_LIVE if c.dtype == "category"])
@@ -0,0 +1,29 @@
+import os
+from typing import Dict
+
+# =========================================================
+# REGISTRO DAS FONTES (PLANILHAS PUBLICADAS)
+# Todo painel pega a URL daqui pelo nome lógico. Para rodar sem rede:
+#   GOL_FONTES_URL=http://127.0.0.1:8765  -> {base}/{nome}.csv (servidor_replay.py)
+#   GOL_FONTE_<NOME>=http://...           -> sobrescreve uma fonte só
+# =========================================================
+FONTES: Dict[str, str] = {
+    "regras_aba1": "https://docs.google.com/spreadsheets/d/e/2PACX-1vSF5WBP5KeBr6cVbAK0yH2IJf_luqoK90gOz1fj_VlS_hoAb4E6v_awCWO-bTi28I-mWYWEeewnhmTh/pub?gid=0&single=true&output=csv",
+    "regras_aba2": "https://docs.google.com/spreadsheets/d/e/2PACX-1vSF5WBP5KeBr6cVbAK0yH2IJf_luqoK90gOz1fj_VlS_hoAb4E6v_awCWO-bTi28I-mWYWEeewnhmTh/pub?gid=1768207754&single=true&output=csv",
+    "jogos_pagina1": "https://docs.google.com/spreadsheets/d/e/2PACX-1vRVsf4nH4SJ7cBV174FLEkkmpFLCxiS4FKKyhrTlKnKoUpVX9giYZ6V5_AMGavD3-AEadpm_zynvBK6/pub?gid=0&single=true&output=csv",
+    "jogos_pagina2": "https://docs.google.com/spreadsheets/d/e/2PACX-1vRVsf4nH4SJ7cBV174FLEkkmpFLCxiS4FKKyhrTlKnKoUpVX9giYZ6V5_AMGavD3-AEadpm_zynvBK6/pub?gid=272845724&single=true&output=csv",
+    "radar_pagina2": "https://docs.google.com/spreadsheets/d/e/2PACX-1vTh8nrJcHw1kIQOLk_ER7kmevSJXqQAoelNyn3wnEN9UgSAF_kFQF4NGZkqYhT-E5tpX20Lr6XW_oBt/pub?gid=682279336&single=true&output=csv",
+    "pre_live": "https://docs.google.com/spreadsheets/d/e/2PACX-1vTHLhAS8u9JBw2sFr2qkQdsUBeRWIFaWm0STZ17yCROnYbBWgrqlBFS6bo35rtsKhHpg3NstBBHDFIe/pub?gid=0&single=true&output=csv",
+}
+
+
+def url_fonte(nome: str) -> str:
+    if nome not in FONTES:
+        raise KeyError(f"Fonte desconhecida: {nome}")
+    especifica = os.environ.get(f"GOL_FONTE_{nome.upper()}")
+    if especifica:
+        return especifica
+    base = os.environ.get("GOL_FONTES_URL")
+    if base:
+        return f"{base.rstrip('/')}/{nome}.csv"
+    return FONTES[nome]
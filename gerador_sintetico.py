@@ -0,0 +1,317 @@
+import argparse
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from esquema_pre_live import ESQUEMA_PRE_LIVE
+
+# =========================================================
+# GERADOR SINTÉTICO DAS PLANILHAS
+# Gera CSVs com as mesmas colunas (e os mesmos formatos de texto: vírgula
+# decimal, "%", pares "casa | visitante", placar "2-1") que cada painel
+# espera, em qualquer escala. Os nomes dos arquivos seguem fontes_dados,
+# então a pasta pode ser servida direto pelo servidor_replay.py.
+#
+#   python gerador_sintetico.py --pasta replay/ --jogos 20000 --ligas 80
+# =========================================================
+PARAMETROS_PADRAO = {
+    "jogos": 2000,             # partidas por planilha (radar: partidas, 90 linhas cada)
+    "ligas": 40,
+    "times_por_liga": 18,
+    "frac_nao_iniciados": 0.2,  # fração de jogos NS (sem resultado) nas bases com histórico
+    "gols_casa": 1.45,          # média de gols do mandante
+    "gols_fora": 1.15,          # média de gols do visitante
+    "frac_gols_1t": 0.44,       # fração dos gols que sai no 1º tempo
+    "frac_vazios": 0.02,        # células numéricas sem valor
+}
+
+MERCADOS_JOGOS = {
+    "Mais de 1.5 gols": lambda ft, ht: ft >= 2,
+    "Mais de 2.5 gols": lambda ft, ht: ft >= 3,
+    "Menos de 2.5 gols": lambda ft, ht: ft < 3,
+    "Menos de 3.5 gols": lambda ft, ht: ft < 4,
+    "Mais de 0.5 gols 1° tempo": lambda ft, ht: ht >= 1,
+    "Menos de 1.5 gols 1° tempo": lambda ft, ht: ht < 2,
+    "Mais de 0.5 gols 2° tempo": lambda ft, ht: ft - ht >= 1,
+}
+
+ESTATISTICAS_PAREADAS = [
+    "Média de gols marcados", "Média de gols sofridos", "Posse de bola", "Chutes no alvo",
+    "Escanteios", "Ataques perigosos", "Cartões",
+]
+FAIXAS_MINUTOS = ["0-15", "16-30", "31-45", "46-60", "61-75", "76-90"]
+
+
+def _parametros(**kwargs) -> dict:
+    desconhecidos = set(kwargs) - set(PARAMETROS_PADRAO)
+    if desconhecidos:
+        raise KeyError(f"Parâmetros desconhecidos: {sorted(desconhecidos)}")
+    return {**PARAMETROS_PADRAO, **kwargs}
+
+
+def _texto_decimal(valores: np.ndarray, casas: int = 2, virgula: bool = True, sufixo: str = "") -> np.ndarray:
+    txt = np.char.mod(f"%.{casas}f", valores)
+    if virgula:
+        txt = np.char.replace(txt, ".", ",")
+    if sufixo:
+        txt = np.char.add(txt, sufixo)
+    return txt.astype(object)
+
+
+def _esvaziar(rng, valores: np.ndarray, frac: float) -> np.ndarray:
+    valores = np.asarray(valores, dtype=object)
+    if frac > 0:
+        valores[rng.random(len(valores)) < frac] = ""
+    return valores
+
+
+def gerar_partidas(rng, p: dict) -> pd.DataFrame:
+    # Calendário base compartilhado pelos geradores: liga, times, horário,
+    # força relativa e placares FT/HT (Poisson ajustado pela força).
+    n = p["jogos"]
+    ligas = np.array([f"Liga {i:03d}" for i in range(p["ligas"])], dtype=object)
+    liga = rng.integers(0, p["ligas"], n)
+    casa = rng.integers(0, p["times_por_liga"], n)
+    fora = (casa + rng.integers(1, p["times_por_liga"], n)) % p["times_por_liga"]
+    forca = rng.normal(0, 1, n)
+    gols_casa = rng.poisson(p["gols_casa"] * np.exp(0.25 * forca))
+    gols_fora = rng.poisson(p["gols_fora"] * np.exp(-0.25 * forca))
+    ht_casa = rng.binomial(gols_casa, p["frac_gols_1t"])
+    ht_fora = rng.binomial(gols_fora, p["frac_gols_1t"])
+    hora = rng.integers(8, 24, n) * 100 + rng.choice([0, 15, 30, 45], n)
+    dias = rng.integers(0, 60, n)
+    return pd.DataFrame({
+        "liga": ligas[liga],
+        "casa": np.char.add(np.char.add(ligas[liga].astype(str), " Casa "), casa.astype(str)).astype(object),
+        "fora": np.char.add(np.char.add(ligas[liga].astype(str), " Time "), fora.astype(str)).astype(object),
+        "hora": np.char.mod("%04d", hora).astype(object),
+        "data": (np.datetime64("2025-01-01") + dias).astype(str).astype(object),
+        "forca": forca,
+        "gols_casa": gols_casa,
+        "gols_fora": gols_fora,
+        "ht_casa": ht_casa,
+        "ht_fora": ht_fora,
+        "iniciado": rng.random(n) >= p["frac_nao_iniciados"],
+    }).assign(hora=lambda d: d["hora"].str[:2] + ":" + d["hora"].str[2:])
+
+
+def _placar(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.char.add(np.char.add(a.astype(str), "-"), b.astype(str)).astype(object)
+
+
+def _odds_1x2(rng, forca: np.ndarray) -> tuple:
+    odd_casa = np.clip(2.5 * np.exp(-0.45 * forca) + rng.normal(0, 0.15, len(forca)), 1.05, 21)
+    odd_fora = np.clip(3.0 * np.exp(0.45 * forca) + rng.normal(0, 0.15, len(forca)), 1.05, 26)
+    odd_empate = rng.uniform(2.9, 4.4, len(forca))
+    return odd_casa, odd_empate, odd_fora
+
+
+# =========================================================
+# PAINEL DE REGRAS (CSV_1 / CSV_2)
+# =========================================================
+def gerar_regras(rng, p: dict, partidas: Optional[pd.DataFrame] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    d = gerar_partidas(rng, p) if partidas is None else partidas
+    n = len(d)
+    status = np.where(d["iniciado"], "FT", "NS").astype(object)
+    aba1 = pd.DataFrame({
+        "League": d["liga"], "Hour": d["hora"], "Home Team": d["casa"], "Visitor Team": d["fora"], "Status": status,
+        "result_home": np.where(d["iniciado"], d["gols_casa"].astype(str), ""),
+        "result_visitor": np.where(d["iniciado"], d["gols_fora"].astype(str), ""),
+    })
+    odd_casa, odd_empate, odd_fora = _odds_1x2(rng, d["forca"].to_numpy())
+    aba1["Odds casa para vencer"] = _texto_decimal(odd_casa)
+    aba1["Odds empate"] = _texto_decimal(odd_empate, virgula=False)
+    aba1["Odds visitante para vencer"] = _texto_decimal(odd_fora)
+    vies = d["forca"].to_numpy()
+    for est in ESTATISTICAS_PAREADAS:
+        escala = rng.uniform(0.5, 3)
+        for lado, sinal in [("casa", 1), ("visitante", -1)]:
+            valores = rng.gamma(4, escala * np.exp(0.15 * sinal * vies) / 4, n)
+            aba1[f"{est} {lado}"] = _esvaziar(rng, _texto_decimal(valores, virgula=rng.random() < 0.5), p["frac_vazios"])
+    for lado in ["casa", "visitante"]:
+        aba1[f"Aproveitamento {lado}"] = _texto_decimal(rng.uniform(10, 90, n), 1, sufixo="%")
+
+    aba2 = aba1[["League", "Hour", "Home Team", "Visitor Team", "Status"]].copy()
+    for faixa in FAIXAS_MINUTOS:
+        aba2[f"Média de gols {faixa}' minutos"] = _texto_decimal(rng.uniform(0.05, 0.8, n), virgula=False)
+    for lado in ["casa", "visitante"]:
+        aba2[f"Precisão nos chutes no alvo {lado}"] = _texto_decimal(rng.uniform(20, 60, n), 0, sufixo="%")
+        aba2[f"Chutes por gol {lado}"] = _texto_decimal(rng.uniform(4, 12, n), 1)
+        aba2[f"Média de chutes no gol marcados 1º tempo {lado}"] = _texto_decimal(rng.uniform(0.5, 4, n), 1)
+        aba2[f"Média total de chutes sofridos 1º tempo {lado}"] = _texto_decimal(rng.uniform(2, 9, n), 1)
+    aba2["Odds mais de 2,5"] = _texto_decimal(rng.uniform(1.35, 2.7, n), virgula=False)
+    return aba1, aba2
+
+
+# =========================================================
+# PAINEL DE JOGOS (PÁGINA1 = HISTÓRICO, PÁGINA2 = JOGOS DO DIA)
+# =========================================================
+def _pagina_jogos(rng, d: pd.DataFrame, historico: bool) -> pd.DataFrame:
+    n = len(d)
+    ft = (d["gols_casa"] + d["gols_fora"]).to_numpy()
+    ht = (d["ht_casa"] + d["ht_fora"]).to_numpy()
+    nomes = list(MERCADOS_JOGOS)
+    mercado = rng.integers(0, len(nomes), n)
+    acerto = np.zeros(n, bool)
+    for i, nome in enumerate(nomes):
+        m = mercado == i
+        acerto[m] = MERCADOS_JOGOS[nome](ft[m], ht[m])
+    # a chance prevista carrega um pouco de sinal do acerto real
+    chance = np.clip(55 + 12 * (acerto - 0.5) + rng.normal(0, 10, n), 20, 95)
+    valor = 100 / chance
+    odd = np.clip(valor * rng.normal(1.0, 0.12, n), 1.01, None)
+    pagina = pd.DataFrame({
+        "League": d["liga"], "Hour": d["hora"], "Home Team": d["casa"], "Visitor Team": d["fora"],
+        "Status": "FT" if historico else "NS",
+        "Resultado": _placar(d["gols_casa"].to_numpy(), d["gols_fora"].to_numpy()) if historico else "",
+        "HT": _placar(d["ht_casa"].to_numpy(), d["ht_fora"].to_numpy()) if historico else "",
+        "A Mais Provavel": np.array(nomes, dtype=object)[mercado],
+        "Previsão de chance": _texto_decimal(chance, 1, sufixo="%"),
+        "Odd Ofertada": _texto_decimal(odd),
+        "Valor esperado": _texto_decimal(valor),
+        "Saldo entre odd ofertada e esperada": _texto_decimal(odd - valor),
+        "Estatisticas Ultimos Jogos": _texto_decimal(np.clip(chance + rng.normal(0, 8, n), 0, 100), 0, sufixo="%"),
+    })
+    return pagina
+
+
+def gerar_jogos(rng, p: dict, partidas: Optional[pd.DataFrame] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    d = gerar_partidas(rng, p) if partidas is None else partidas
+    hoje = max(1, int(len(d) * p["frac_nao_iniciados"]))
+    return _pagina_jogos(rng, d.iloc[hoje:], True), _pagina_jogos(rng, d.iloc[:hoje], False)
+
+
+# =========================================================
+# RADAR (UMA LINHA POR MINUTO DE CADA PARTIDA)
+# =========================================================
+def gerar_radar(rng, p: dict, partidas: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    d = gerar_partidas(rng, p) if partidas is None else partidas
+    n, minutos = len(d), 90
+    rep = np.repeat(np.arange(n), minutos)
+    minuto = np.tile(np.arange(1, minutos + 1), n)
+    forca = d["forca"].to_numpy()[rep]
+    # pressão com memória curta: média móvel de ruído por partida
+    ruido = rng.normal(0, 1.5, (n, minutos))
+    suave = pd.DataFrame(ruido.T).rolling(5, min_periods=1).mean().to_numpy().T.ravel()
+    press_casa = np.clip(5 + 1.5 * forca + suave * 2, 0, None)
+    press_fora = np.clip(5 - 1.5 * forca - suave * 2, 0, None)
+    gols_jogo = (d["gols_casa"] + d["gols_fora"]).to_numpy()
+    gol = np.zeros(n * minutos, dtype=int)
+    for k in range(int(gols_jogo.max(initial=0))):
+        tem = np.flatnonzero(gols_jogo > k)
+        np.add.at(gol, tem * minutos + rng.integers(0, minutos, len(tem)), 1)
+    status = np.where(d["iniciado"], "Finalizado", "Ao vivo").astype(object)
+    partida = d.assign(
+        id_partida=np.char.add("P", np.arange(n).astype(str)).astype(object),
+        placar_ht=_placar(d["ht_casa"].to_numpy(), d["ht_fora"].to_numpy()),
+        placar_ft=_placar(d["gols_casa"].to_numpy(), d["gols_fora"].to_numpy()),
+        status=status,
+    )
+    return pd.DataFrame({
+        "id_partida": partida["id_partida"].to_numpy()[rep],
+        "data_referencia_lista": partida["data"].to_numpy()[rep],
+        "competicao": partida["liga"].to_numpy()[rep],
+        "data_partida": (partida["data"] + " " + partida["hora"]).to_numpy()[rep],
+        "time_casa": partida["casa"].to_numpy()[rep],
+        "time_visitante": partida["fora"].to_numpy()[rep],
+        "placar_ht": partida["placar_ht"].to_numpy()[rep],
+        "placar_ft": partida["placar_ft"].to_numpy()[rep],
+        "status": partida["status"].to_numpy()[rep],
+        "minuto": minuto,
+        "indice_pressao_casa": press_casa.round(2),
+        "indice_pressao_visitante": press_fora.round(2),
+        "gol_total_minuto": gol,
+        "escanteios_total_minuto": rng.poisson(0.11, n * minutos),
+        "chutes_no_gol_total_minuto": rng.poisson(0.09, n * minutos),
+        "chutes_para_fora_total_minuto": rng.poisson(0.13, n * minutos),
+    })
+
+
+# =========================================================
+# PRÉ-LIVE (CAMPOS DO ESQUEMA, COM PARES "CASA | VISITANTE")
+# =========================================================
+def gerar_pre_live(rng, p: dict, partidas: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    d = gerar_partidas(rng, p) if partidas is None else partidas
+    n = len(d)
+    forca = d["forca"].to_numpy()
+    odd_casa, _, odd_fora = _odds_1x2(rng, forca)
+    origem = {
+        "league": d["liga"], "country": d["liga"].str.replace("Liga", "País", regex=False),
+        "home": d["casa"], "away": d["fora"], "hour": d["hora"], "date": d["data"],
+        "status": np.full(n, "NS", dtype=object),
+        "odd_home": odd_casa, "odd_away": odd_fora,
+    }
+    colunas = {}
+    for campo in ESQUEMA_PRE_LIVE:
+        rotulo = campo.apelidos[0]
+        if campo.nome in origem:
+            valor = origem[campo.nome]
+            colunas[rotulo] = _texto_decimal(valor) if campo.tipo == "numero" else np.asarray(valor, dtype=object)
+        elif campo.tipo == "numero":
+            if campo.nome.startswith("odd_"):
+                colunas[rotulo] = _esvaziar(rng, _texto_decimal(rng.uniform(1.3, 3.2, n)), p["frac_vazios"])
+            else:
+                colunas[rotulo] = _esvaziar(rng, _texto_decimal(rng.uniform(15, 90, n), 0, virgula=False, sufixo="%"), p["frac_vazios"])
+        elif campo.tipo == "par":
+            if campo.nome in ("rank", "games"):
+                a, b = rng.integers(1, 21, n), rng.integers(1, 21, n)
+                txt = np.char.add(np.char.add(a.astype(str), " | "), b.astype(str))
+            else:
+                a = np.clip(rng.normal(50 + 8 * forca, 12), 0, 100)
+                b = np.clip(rng.normal(50 - 8 * forca, 12), 0, 100)
+                txt = np.char.add(np.char.add(_texto_decimal(a, 1).astype(str), "% | "), _texto_decimal(b, 1).astype(str))
+                txt = np.char.add(txt, "%")
+            colunas[rotulo] = _esvaziar(rng, txt.astype(object), p["frac_vazios"])
+        elif campo.tipo == "par_texto":
+            a = _placar(rng.poisson(1.3, n), rng.poisson(1.0, n))
+            b = _placar(rng.poisson(1.3, n), rng.poisson(1.0, n))
+            colunas[rotulo] = np.char.add(np.char.add(a.astype(str), " | "), b.astype(str)).astype(object)
+        else:
+            colunas[rotulo] = np.full(n, "-", dtype=object)
+    return pd.DataFrame(colunas)
+
+
+def gerar_fontes(semente: int = 0, **parametros) -> Dict[str, pd.DataFrame]:
+    # Um DataFrame por fonte de fontes_dados, todos a partir do mesmo calendário
+    p = _parametros(**parametros)
+    rng = np.random.default_rng(semente)
+    partidas = gerar_partidas(rng, p)
+    aba1, aba2 = gerar_regras(rng, p, partidas)
+    pagina1, pagina2 = gerar_jogos(rng, p, partidas)
+    return {
+        "regras_aba1": aba1,
+        "regras_aba2": aba2,
+        "jogos_pagina1": pagina1,
+        "jogos_pagina2": pagina2,
+        "radar_pagina2": gerar_radar(rng, p, partidas),
+        "pre_live": gerar_pre_live(rng, p, partidas),
+    }
+
+
+def gravar_fontes_sinteticas(pasta, semente: int = 0, **parametros) -> Dict[str, int]:
+    pasta = Path(pasta)
+    pasta.mkdir(parents=True, exist_ok=True)
+    tamanhos = {}
+    for nome, df in gerar_fontes(semente, **parametros).items():
+        arq = pasta / f"{nome}.csv"
+        df.to_csv(arq, index=False)
+        tamanhos[nome] = arq.stat().st_size
+    return tamanhos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera planilhas sintéticas para todos os painéis.")
+    parser.add_argument("--pasta", required=True)
+    parser.add_argument("--semente", type=int, default=0)
+    for chave, padrao in PARAMETROS_PADRAO.items():
+        parser.add_argument(f"--{chave.replace('_', '-')}", type=type(padrao), default=padrao)
+    args = parser.parse_args()
+    parametros = {k: getattr(args, k) for k in PARAMETROS_PADRAO}
+    for nome, tamanho in gravar_fontes_sinteticas(args.pasta, args.semente, **parametros).items():
+        print(f"{nome}: {tamanho / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
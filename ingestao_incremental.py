@@ -0,0 +1,105 @@
+import hashlib
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# INGESTÃO INCREMENTAL
+# Cada linha ganha uma chave (liga/hora/casa/visitante, id_partida...) e um
+# hash do conteúdo. Comparando com o snapshot anterior, só as linhas
+# inseridas ou atualizadas passam de novo pelas etapas linha-a-linha.
+# =========================================================
+_SALTO_OCORRENCIA = np.uint64(0x9E3779B97F4A7C15)
+
+
+def assinar_linhas(df: pd.DataFrame, chaves: Sequence[str]) -> tuple:
+    # (chave_u64, hash_u64) por linha. Chave repetida (ex.: id_partida no radar,
+    # uma linha por minuto) é desempatada pela ordem de ocorrência.
+    conteudo = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    chaves = [c for c in chaves if c in df.columns]
+    base = pd.util.hash_pandas_object(df[chaves], index=False).to_numpy() if chaves else conteudo
+    ocorrencia = pd.Series(base).groupby(base).cumcount().to_numpy().astype(np.uint64)
+    with np.errstate(over="ignore"):
+        chave = base + ocorrencia * _SALTO_OCORRENCIA
+    return chave, conteudo
+
+
+def comparar_snapshots(anterior: Optional[tuple], atual: tuple) -> dict:
+    chave, conteudo = atual
+    if anterior is None:
+        pos = np.full(len(chave), -1, dtype=np.int64)
+        return {"inseridas": pos < 0, "atualizadas": np.zeros(len(chave), bool),
+                "inalteradas": np.zeros(len(chave), bool), "pos_anterior": pos, "removidas": 0}
+    chave_ant, conteudo_ant = anterior
+    pos = pd.Index(chave_ant).get_indexer(chave)
+    existe = pos >= 0
+    iguais = np.zeros(len(chave), bool)
+    iguais[existe] = conteudo_ant[pos[existe]] == conteudo[existe]
+    return {
+        "inseridas": ~existe,
+        "atualizadas": existe & ~iguais,
+        "inalteradas": iguais,
+        "pos_anterior": pos,
+        "removidas": int(len(chave_ant) - existe.sum()),
+    }
+
+
+def resumo_diff(diff: dict) -> dict:
+    return {
+        "inseridas": int(diff["inseridas"].sum()),
+        "atualizadas": int(diff["atualizadas"].sum()),
+        "inalteradas": int(diff["inalteradas"].sum()),
+        "removidas": diff["removidas"],
+    }
+
+
+def assinatura_subconjunto(assinatura: tuple, mascara, extra=()) -> str:
+    # Impressão digital de um recorte (ex.: só as linhas FT) + contexto extra
+    _, conteudo = assinatura
+    h = hashlib.sha1(np.sort(conteudo[np.asarray(mascara, dtype=bool)]).tobytes())
+    h.update(repr(tuple(extra)).encode("utf-8"))
+    return h.hexdigest()
+
+
+class ProcessadorIncremental:
+    # Guarda a saída de uma etapa linha-a-linha (mesmas linhas, mesma ordem
+    # da entrada). Se o contexto ou as colunas mudarem, recalcula tudo.
+    def __init__(self, nome: str):
+        self.nome = nome
+        self._assinatura = None
+        self._contexto = None
+        self._colunas = None
+        self._saida = None
+
+    def processar(self, df: pd.DataFrame, assinatura: tuple, etapa: Callable, contexto=None):
+        colunas = list(df.columns)
+        completo = (
+            self._saida is None or len(df) == 0
+            or contexto != self._contexto or colunas != self._colunas
+        )
+        diff = comparar_snapshots(None if completo else self._assinatura, assinatura)
+        if completo:
+            saida = etapa(df.copy())
+        else:
+            mudadas = ~diff["inalteradas"]
+            pos_mudadas = np.flatnonzero(mudadas)
+            pos_iguais = np.flatnonzero(diff["inalteradas"])
+            partes = []
+            if len(pos_iguais):
+                velhas = self._saida.iloc[diff["pos_anterior"][pos_iguais]]
+                partes.append(velhas.set_axis(pos_iguais))
+            if len(pos_mudadas):
+                novas = etapa(df.iloc[pos_mudadas].copy())
+                partes.append(novas.set_axis(pos_mudadas))
+            saida = pd.concat(partes).sort_index() if len(partes) > 1 else partes[0]
+            for c in saida.columns:
+                if c not in self._saida.columns or saida[c].dtype == self._saida[c].dtype:
+                    continue
+                if isinstance(self._saida[c].dtype, pd.CategoricalDtype):
+                    saida[c] = saida[c].astype("category")
+                elif isinstance(self._saida[c].dtype, pd.StringDtype):
+                    saida[c] = saida[c].astype(self._saida[c].dtype)
+        saida = saida.set_axis(df.index)
+        self._assinatura, self._contexto, self._colunas, self._saida = assinatura, contexto, colunas, saida
+        return saida, {**resumo_diff(diff), "recalculo_total": completo}
@@ -0,0 +1,145 @@
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from mineracao_regras import (
+    EstatisticasFaixas, codificar_faixas, colunas_intervalo, matriz_variaveis, ordenar_regras, rotulos_faixas,
+)
+from variaveis_derivadas import Derivada
+
+# =========================================================
+# REGRAS DE INTERAÇÃO (PARES DE FAIXAS, BITMAPS)
+# Regra simples = uma faixa de uma variável; a de interação exige duas
+# faixas de variáveis diferentes ao mesmo tempo. Cada faixa candidata vira
+# um bitmap das linhas do FT (bits empacotados em uint64), assim como cada
+# alvo e o "variável preenchida". Um par é um AND de bitmaps e a contagem é
+# popcount, então o espaço quadrático de pares custa operações de bits
+# sobre n/64 palavras por par.
+# Pares com menos de min_linhas jogos saem antes de qualquer lift; só os
+# que sobram têm acertos e baseline (linhas com as duas variáveis
+# preenchidas) contados. Candidatas: as MAX_FAIXAS_INTERACAO faixas de
+# maior forca de cada alvo, com as bordas já cortadas na mineração.
+# Saída no layout das regras simples mais var2/faixa2.
+# Os pares são contados sobre o df_hist recebido (o FT da planilha), não
+# sobre os arquivos de histórico, e sempre do zero: não há soma de linhas
+# novas como em EstatisticasFaixas.
+# =========================================================
+MAX_FAIXAS_INTERACAO = 64
+MAX_REGRAS_INTERACAO = 200
+PARES_POR_BLOCO = 4096
+
+
+def bitmaps(mascara: np.ndarray) -> np.ndarray:
+    # [linhas, k] bool -> [k, palavras] uint64
+    bits = np.packbits(mascara, axis=0, bitorder="little")
+    sobra = -len(bits) % 8
+    if sobra:
+        bits = np.vstack([bits, np.zeros((sobra, bits.shape[1]), dtype=np.uint8)])
+    return np.ascontiguousarray(bits.T).view(np.uint64)
+
+
+def contar_bits(b: np.ndarray) -> np.ndarray:
+    return np.bitwise_count(b).sum(axis=-1, dtype=np.int64)
+
+
+def _candidatas(est: EstatisticasFaixas, min_linhas: int, max_faixas: int) -> np.ndarray:
+    # -> [(coluna, faixa)] das faixas de maior forca de cada alvo do grupo
+    existe = np.arange(est.q_faixas)[None, :] < (est.n_bordas - 1)[:, None]
+    ok = existe & (est.validos >= min_linhas * 2)[:, None] & (est.jogos >= min_linhas)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        taxa = est.acertos / est.jogos[:, :, None]
+        base = est.soma_alvos / est.validos[:, None]
+        forca = (taxa - base[:, None, :]) * np.log1p(est.jogos)[:, :, None]
+    escolhidas = set()
+    for t in range(len(est.alvos)):
+        col, faixa = np.nonzero(ok)
+        ordem = np.argsort(-forca[col, faixa, t], kind="stable")[:max_faixas]
+        escolhidas.update(zip(col[ordem].tolist(), faixa[ordem].tolist()))
+    return np.array(sorted(escolhidas), dtype=np.int64).reshape(-1, 2)
+
+
+def _interacoes_grupo(df_hist: pd.DataFrame, est: EstatisticasFaixas, min_linhas: int, max_faixas: int,
+                      max_regras: int, derivadas: Optional[Dict[str, Derivada]],
+                      com_intervalos: bool) -> Dict[str, pd.DataFrame]:
+    candidatas = _candidatas(est, min_linhas, max_faixas)
+    if len(candidatas) < 2:
+        return {}
+    alvos = pd.DataFrame({a: pd.to_numeric(df_hist[a], errors="coerce") for a in est.alvos}, index=df_hist.index)
+    linhas = alvos[est.alvos[0]].notna().to_numpy()
+    colunas, pos_variavel = np.unique(candidatas[:, 0], return_inverse=True)
+    X = matriz_variaveis(df_hist[linhas], [est.variaveis[c] for c in colunas], derivadas)
+    faixa = codificar_faixas(X, est.bordas[:, colunas])
+    B = bitmaps(faixa[:, pos_variavel] == candidatas[:, 1])
+    V = bitmaps(~np.isnan(X))
+    T = bitmaps(alvos.loc[linhas].to_numpy(dtype=float) == 1)
+
+    # Poda só com AND + popcount
+    pares_i, pares_j, pares_jogos = [], [], []
+    for i in range(len(B) - 1):
+        jogos = contar_bits(B[i] & B[i + 1:])
+        j = np.flatnonzero((jogos >= min_linhas) & (pos_variavel[i + 1:] != pos_variavel[i]))
+        pares_i.append(np.full(len(j), i))
+        pares_j.append(j + i + 1)
+        pares_jogos.append(jogos[j])
+    ii, jj, n_jogos = (np.concatenate(p) for p in (pares_i, pares_j, pares_jogos))
+    if len(ii) == 0:
+        return {}
+
+    acertos = np.empty((len(ii), len(T)), dtype=np.int64)
+    validos = np.empty(len(ii), dtype=np.int64)
+    soma = np.empty((len(ii), len(T)), dtype=np.int64)
+    for inicio in range(0, len(ii), PARES_POR_BLOCO):
+        bloco = slice(inicio, inicio + PARES_POR_BLOCO)
+        juntos = B[ii[bloco]] & B[jj[bloco]]
+        preenchidos = V[pos_variavel[ii[bloco]]] & V[pos_variavel[jj[bloco]]]
+        validos[bloco] = contar_bits(preenchidos)
+        for t in range(len(T)):
+            acertos[bloco, t] = contar_bits(juntos & T[t])
+            soma[bloco, t] = contar_bits(preenchidos & T[t])
+    manter = validos >= min_linhas * 2
+    ii, jj, n_jogos, acertos, validos, soma = ii[manter], jj[manter], n_jogos[manter], acertos[manter], validos[manter], soma[manter]
+
+    rotulos = {}
+
+    def intervalos(k: np.ndarray) -> pd.arrays.IntervalArray:
+        col, f = candidatas[k, 0], candidatas[k, 1]
+        for c in np.unique(col):
+            if c not in rotulos:
+                rotulos[c] = rotulos_faixas(est.bordas[:est.n_bordas[c], c])
+        return pd.arrays.IntervalArray.from_arrays(
+            [rotulos[c][b] for c, b in zip(col, f)], [rotulos[c][b + 1] for c, b in zip(col, f)], closed="right"
+        )
+
+    nomes = np.asarray(est.variaveis, dtype=object)
+    saida = {}
+    for t, alvo in enumerate(est.alvos):
+        taxa = acertos[:, t] / n_jogos
+        lift = taxa - soma[:, t] / validos
+        ordem = pd.DataFrame({"forca": lift * np.log1p(n_jogos), "taxa_acerto": taxa, "jogos": n_jogos})
+        # Rótulos e intervalos só para os pares que ficam
+        k = ordenar_regras(ordem).head(max_regras).index.to_numpy()
+        saida[alvo] = pd.DataFrame({
+            "faixa": intervalos(ii[k]),
+            "jogos": n_jogos[k],
+            "taxa_acerto": taxa[k],
+            "var": nomes[candidatas[ii[k], 0]],
+            "baseline": soma[k, t] / validos[k],
+            "lift": lift[k],
+            "forca": ordem["forca"].to_numpy()[k],
+            **(colunas_intervalo(acertos[k, t], n_jogos[k], soma[k, t], validos[k]) if com_intervalos else {}),
+            "var2": nomes[candidatas[jj[k], 0]],
+            "faixa2": intervalos(jj[k]),
+        })
+    return saida
+
+
+def minerar_interacoes(df_hist: pd.DataFrame, estatisticas: Sequence[EstatisticasFaixas], alvos: Sequence[str],
+                       min_linhas: int = 20, max_faixas: int = MAX_FAIXAS_INTERACAO,
+                       max_regras: int = MAX_REGRAS_INTERACAO,
+                       derivadas: Optional[Dict[str, Derivada]] = None,
+                       com_intervalos: bool = True) -> Dict[str, pd.DataFrame]:
+    interacoes: Dict[str, pd.DataFrame] = {}
+    for est in estatisticas:
+        interacoes.update(_interacoes_grupo(df_hist, est, min_linhas, max_faixas, max_regras, derivadas, com_intervalos))
+    return {a: interacoes.get(a, pd.DataFrame()) for a in alvos}
@@ -0,0 +1,628 @@
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from sketch_quantis import K_SKETCH, SketchQuantis
+from variaveis_derivadas import Derivada, avaliar_lote
+
+# =========================================================
+# MINERAÇÃO DE REGRAS (VÁRIOS ALVOS NUMA PASSADA)
+# As variáveis viram uma matriz float (linhas x variáveis); bordas de
+# quantil, faixa de cada valor e contagens saem de operações sobre a
+# matriz inteira, sem qcut/groupby por variável, e a contagem de acertos
+# por faixa cobre todos os alvos juntos.
+# Alvos com linhas faltando em posições diferentes não podem dividir o
+# mesmo corte, então são agrupados pelo padrão de faltantes (na planilha
+# atual todos os alvos são completos e cai tudo num grupo só).
+# Saída por alvo igual à de antes: var, faixa, jogos, taxa_acerto,
+# baseline, lift, forca, ordenada por forca/taxa_acerto/jogos.
+# =========================================================
+ORDEM_REGRAS = ["forca", "taxa_acerto", "jogos"]
+PROCESSOS_MINERACAO = int(os.environ.get("GOL_PROCESSOS_MINERACAO", os.cpu_count() or 1))
+MIN_COLUNAS_POR_PROCESSO = 128
+
+
+def ordenar_regras(df: pd.DataFrame, chave: str = "forca") -> pd.DataFrame:
+    # chave troca só o primeiro critério (ex.: forca_inf pune faixa pequena com lift de sorte)
+    return df.sort_values([chave] + ORDEM_REGRAS[1:], ascending=[False, False, False])
+
+
+# =========================================================
+# INTERVALOS DE CONFIANÇA DAS REGRAS
+# taxa_acerto: intervalo de Wilson. lift: bootstrap de Poisson feito sobre
+# as contagens, não sobre as linhas. Reamostrar linhas com peso Poisson(1)
+# dá, para cada grupo de linhas, soma de acertos ~ Poisson(acertos) e de
+# erros ~ Poisson(erros); os quatro grupos de uma regra (dentro/fora da
+# faixa x acerto/erro) viram quatro matrizes regras x réplicas sorteadas
+# de uma vez, e o lift de cada réplica é taxa dentro - taxa entre todos
+# os válidos. Semente fixa: a mesma mineração dá os mesmos intervalos.
+# =========================================================
+Z_INTERVALO = 1.96
+REPLICAS_BOOTSTRAP = 200
+SEMENTE_BOOTSTRAP = 0
+
+
+def intervalo_wilson(acertos: np.ndarray, jogos: np.ndarray, z: float = Z_INTERVALO) -> Tuple[np.ndarray, np.ndarray]:
+    n = np.asarray(jogos, dtype=float)
+    p = acertos / n
+    z2 = z * z
+    centro = (p + z2 / (2 * n)) / (1 + z2 / n)
+    meia = z * np.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+    return centro - meia, centro + meia
+
+
+def intervalo_lift_bootstrap(acertos: np.ndarray, jogos: np.ndarray, soma_alvo: np.ndarray, validos: np.ndarray,
+                             replicas: int = REPLICAS_BOOTSTRAP, nivel: float = 0.95,
+                             semente: int = SEMENTE_BOOTSTRAP) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(semente)
+    forma = (len(acertos), replicas)
+    contagens = [acertos, jogos - acertos, soma_alvo - acertos, validos - jogos - (soma_alvo - acertos)]
+    dentro_1, dentro_0, fora_1, fora_0 = (rng.poisson(np.asarray(c, dtype=float)[:, None], forma) for c in contagens)
+    dentro = np.maximum(dentro_1 + dentro_0, 1)
+    todos = np.maximum(dentro_1 + dentro_0 + fora_1 + fora_0, 1)
+    lift = dentro_1 / dentro - (dentro_1 + fora_1) / todos
+    limites = np.quantile(lift, [(1 - nivel) / 2, (1 + nivel) / 2], axis=1)
+    return limites[0], limites[1]
+
+
+def colunas_intervalo(acertos: np.ndarray, jogos: np.ndarray, soma_alvo: np.ndarray,
+                      validos: np.ndarray) -> Dict[str, np.ndarray]:
+    taxa_inf, taxa_sup = intervalo_wilson(acertos, jogos)
+    lift_inf, lift_sup = intervalo_lift_bootstrap(acertos, jogos, soma_alvo, validos)
+    return {
+        "taxa_inf": taxa_inf,
+        "taxa_sup": taxa_sup,
+        "lift_inf": lift_inf,
+        "lift_sup": lift_sup,
+        "forca_inf": lift_inf * np.log1p(jogos),
+    }
+
+
+# =========================================================
+# NÚCLEO NUMÉRICO
+# Reproduz o pd.qcut(x, q, duplicates="drop") de cada coluna:
+#   - q efetivo = min(q, valores distintos)
+#   - bordas = quantis lineares (np.quantile, como o Series.quantile)
+#   - bordas repetidas descartadas
+#   - faixa fechada à direita, a primeira incluindo o mínimo
+# =========================================================
+def _ordenar_e_contar(X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # -> (colunas ordenadas com NaN no fim, válidos por coluna, distintos por coluna)
+    n = X.shape[0]
+    n_validos = (~np.isnan(X)).sum(axis=0)
+    ordenado = np.sort(X, axis=0)
+    novos = (ordenado[1:] != ordenado[:-1]) & (np.arange(1, n)[:, None] < n_validos)
+    distintos = (n_validos > 0) + novos.sum(axis=0)
+    return ordenado, n_validos, distintos
+
+
+def validos_e_distintos(X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Mesmo critério de notna().sum() / nunique() do pandas, para a matriz toda
+    _, n_validos, distintos = _ordenar_e_contar(X)
+    return n_validos, distintos
+
+
+def quantis_colunas(X: np.ndarray, q_faixas: int) -> Tuple[np.ndarray, np.ndarray]:
+    # -> (bordas [q+1, colunas], sobras = +inf; quantidade de bordas por coluna, 0 = sem corte)
+    n, m = X.shape
+    ordenado, n_validos, distintos = _ordenar_e_contar(X)
+    n_q = np.minimum(q_faixas, distintos)
+
+    bordas = np.full((q_faixas + 1, m), np.inf)
+    n_bordas = np.zeros(m, dtype=np.int64)
+    # Quantis sobre a coluna já ordenada (NaN vai para o fim), em lote para
+    # as colunas com o mesmo q efetivo e a mesma quantidade de válidos
+    chaves = n_q.astype(np.int64) * (n + 1) + n_validos
+    for chave in np.unique(chaves[n_q >= 2]):
+        k, v = divmod(int(chave), n + 1)
+        colunas = np.flatnonzero(chaves == chave)
+        brutas = np.quantile(ordenado[:v, colunas], probabilidades_quantis(k), axis=0)
+        bordas[:k + 1, colunas], n_bordas[colunas] = descartar_repetidas(brutas)
+    return bordas, n_bordas
+
+
+def probabilidades_quantis(k: int) -> np.ndarray:
+    quantis = np.linspace(0, 1, k + 1)
+    np.putmask(quantis, k * quantis != np.arange(k + 1), np.nextafter(quantis, 1))
+    return quantis
+
+
+def descartar_repetidas(brutas: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Bordas repetidas saem e as que ficam sobem; sobras = +inf
+    manter = np.vstack([np.ones((1, brutas.shape[1]), bool), brutas[1:] != brutas[:-1]])
+    ordem = np.argsort(~manter, axis=0, kind="stable")
+    return np.take_along_axis(np.where(manter, brutas, np.inf), ordem, axis=0), manter.sum(axis=0)
+
+
+def codificar_faixas(X: np.ndarray, bordas: np.ndarray) -> np.ndarray:
+    # searchsorted coluna a coluna, feito como contagem de bordas internas
+    # abaixo do valor (no máximo q comparações da matriz inteira); NaN -> -1.
+    # A borda j só é interna se a j+1 existe (não é sobra +inf): valor acima
+    # da última borda fica na última faixa, mesmo com bordas descartadas
+    faixa = np.zeros(X.shape, dtype=np.int8)
+    for j in range(1, bordas.shape[0] - 1):
+        faixa += (X > bordas[j]) & np.isfinite(bordas[j + 1])
+    faixa[np.isnan(X)] = -1
+    return faixa
+
+
+def contar_faixas(faixa: np.ndarray, Y: np.ndarray, q_faixas: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # -> jogos [colunas, q], acertos [colunas, q, alvos], válidos [colunas], soma dos alvos [colunas, alvos].
+    # Uma multiplicação de matriz por faixa conta todos os alvos de todas as
+    # colunas de uma vez (alvos 0/1: somas inteiras, exatas em float)
+    n, m = faixa.shape
+    jogos = np.zeros((m, q_faixas), dtype=np.int64)
+    acertos = np.zeros((m, q_faixas, Y.shape[1]))
+    for b in range(q_faixas):
+        na_faixa = (faixa == b).astype(float)
+        jogos[:, b] = na_faixa.sum(axis=0)
+        acertos[:, b, :] = (Y.T @ na_faixa).T
+    valido = (faixa >= 0).astype(float)
+    return jogos, acertos, valido.sum(axis=0).astype(np.int64), (Y.T @ valido).T
+
+
+def _arredondar(x, casas: int):
+    if not np.isfinite(x) or x == 0:
+        return x
+    frac, inteiro = np.modf(x)
+    digitos = -int(np.floor(np.log10(abs(frac)))) - 1 + casas if inteiro == 0 else casas
+    return np.around(x, digitos)
+
+
+def rotulos_faixas(bordas: np.ndarray, casas: int = 3) -> List[float]:
+    # Mesmos limites que o qcut mostra: menor precisão (>= 3) que mantém as
+    # bordas distintas, e a primeira recuada para incluir o mínimo
+    for p in range(casas, 20):
+        niveis = [_arredondar(b, p) for b in bordas]
+        if len(set(niveis)) == len(bordas):
+            break
+    else:
+        p = casas
+        niveis = [_arredondar(b, p) for b in bordas]
+    niveis[0] = niveis[0] - 10 ** (-p)
+    return niveis
+
+
+# =========================================================
+# ESTATÍSTICAS SUFICIENTES POR FAIXA
+# Tudo que as regras de um grupo de alvos precisam: bordas de cada
+# variável e, por faixa, jogos e acertos de cada alvo (mais válidos e soma
+# do alvo por variável, para o baseline). FT novos entram somando nas
+# faixas que já existem (valor fora das bordas cai na faixa da ponta); o
+# corte de uma variável só é refeito quando a ocupação das faixas se
+# afasta da ocupação no momento do corte (PSI acima de LIMITE_DERIVA).
+# =========================================================
+LIMITE_DERIVA = 0.10
+_EPS_DERIVA = 1e-4
+
+
+class EstatisticasFaixas:
+    CAMPOS = ("bordas", "n_bordas", "jogos", "acertos", "validos", "soma_alvos", "jogos_corte", "validos_corte")
+
+    def __init__(self, variaveis: Sequence[str], alvos: Sequence[str], q_faixas: int,
+                 bordas: np.ndarray, n_bordas: np.ndarray, jogos: np.ndarray, acertos: np.ndarray,
+                 validos: np.ndarray, soma_alvos: np.ndarray,
+                 jogos_corte: Optional[np.ndarray] = None, validos_corte: Optional[np.ndarray] = None):
+        self.variaveis = list(variaveis)
+        self.alvos = list(alvos)
+        self.q_faixas = q_faixas
+        self.bordas = bordas            # [q+1, variáveis], sobras = +inf
+        self.n_bordas = n_bordas        # [variáveis], 0 = sem corte
+        self.jogos = jogos              # [variáveis, q]
+        self.acertos = acertos          # [variáveis, q, alvos]
+        self.validos = validos          # [variáveis]
+        self.soma_alvos = soma_alvos    # [variáveis, alvos]
+        self.jogos_corte = jogos.copy() if jogos_corte is None else jogos_corte
+        self.validos_corte = validos.copy() if validos_corte is None else validos_corte
+
+    @classmethod
+    def calcular(cls, X: np.ndarray, Y: np.ndarray, variaveis: Sequence[str], alvos: Sequence[str],
+                 q_faixas: int) -> "EstatisticasFaixas":
+        bordas, n_bordas = quantis_colunas(X, q_faixas)
+        return cls(variaveis, alvos, q_faixas, bordas, n_bordas, *contar_faixas(codificar_faixas(X, bordas), Y, q_faixas))
+
+    @classmethod
+    def juntar(cls, partes: Sequence["EstatisticasFaixas"]) -> "EstatisticasFaixas":
+        # Fatias de variáveis (execução em paralelo), na ordem das fatias
+        if len(partes) == 1:
+            return partes[0]
+        campos = {c: np.concatenate([getattr(p, c) for p in partes], axis=1 if c == "bordas" else 0) for c in cls.CAMPOS}
+        return cls([v for p in partes for v in p.variaveis], partes[0].alvos, partes[0].q_faixas, **campos)
+
+    def somar(self, X: np.ndarray, Y: np.ndarray):
+        faixa = codificar_faixas(X, self.bordas)
+        faixa[:, self.n_bordas < 2] = -1
+        jogos, acertos, validos, soma_alvos = contar_faixas(faixa, Y, self.q_faixas)
+        self.jogos += jogos
+        self.acertos += acertos
+        self.validos += validos
+        self.soma_alvos += soma_alvos
+
+    def deriva(self) -> np.ndarray:
+        # PSI por variável entre a ocupação das faixas no corte e a atual
+        existe = np.arange(self.q_faixas)[None, :] < (self.n_bordas - 1)[:, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            antes = np.clip(self.jogos_corte / self.validos_corte[:, None], _EPS_DERIVA, None)
+            agora = np.clip(self.jogos / self.validos[:, None], _EPS_DERIVA, None)
+            termos = np.where(existe, (agora - antes) * np.log(agora / antes), 0.0)
+        return np.nan_to_num(termos.sum(axis=1))
+
+    def substituir(self, colunas: np.ndarray, outra: "EstatisticasFaixas"):
+        # Troca as variáveis `colunas` pelas de `outra` (recortada nelas, mesma ordem)
+        for campo in self.CAMPOS:
+            atual, novo = getattr(self, campo), getattr(outra, campo)
+            if campo == "bordas":
+                atual[:, colunas] = novo
+            else:
+                atual[colunas] = novo
+
+    def resumos(self, min_linhas: int, com_intervalos: bool = True) -> Dict[str, pd.DataFrame]:
+        q = self.q_faixas
+        suficiente = self.validos >= min_linhas * 2
+        existe = np.arange(q)[None, :] < (self.n_bordas - 1)[:, None]
+        col, faixa = np.nonzero(existe & suficiente[:, None] & (self.jogos >= min_linhas))
+        if len(col) == 0:
+            return {}
+
+        rotulos = {c: rotulos_faixas(self.bordas[:self.n_bordas[c], c]) for c in np.unique(col)}
+        intervalos = pd.arrays.IntervalArray.from_arrays(
+            [rotulos[c][f] for c, f in zip(col, faixa)], [rotulos[c][f + 1] for c, f in zip(col, faixa)], closed="right"
+        )
+        n_jogos = self.jogos[col, faixa]
+        peso = np.log1p(n_jogos)
+        nomes = np.asarray(self.variaveis, dtype=object)[col]
+
+        saida = {}
+        for t, alvo in enumerate(self.alvos):
+            taxa = self.acertos[col, faixa, t] / n_jogos
+            base = self.soma_alvos[col, t] / self.validos[col]
+            lift = taxa - base
+            saida[alvo] = pd.DataFrame({
+                "faixa": intervalos,
+                "jogos": n_jogos.astype(np.int64),
+                "taxa_acerto": taxa,
+                "var": nomes,
+                "baseline": base,
+                "lift": lift,
+                "forca": lift * peso,
+                **(colunas_intervalo(self.acertos[col, faixa, t], n_jogos, self.soma_alvos[col, t], self.validos[col])
+                   if com_intervalos else {}),
+            })
+        return saida
+
+
+def _grupos_por_faltantes(alvos: pd.DataFrame) -> List[List[str]]:
+    grupos: Dict[bytes, List[str]] = {}
+    for c in alvos.columns:
+        grupos.setdefault(np.packbits(alvos[c].isna().to_numpy()).tobytes(), []).append(c)
+    return list(grupos.values())
+
+
+# =========================================================
+# EXECUÇÃO EM PARALELO
+# Com muitas variáveis (diff__/soma__/ratio__ passam de milhares), as
+# colunas são divididas em fatias contíguas entre processos. A matriz vai
+# uma vez para memória compartilhada (ordem de coluna, fatia = bloco
+# contínuo); cada processo roda o mesmo núcleo sobre a sua fatia e os
+# resultados voltam na ordem das fatias, então a saída é idêntica à serial.
+# Pool com "spawn": o pipeline roda na thread do atualizador, e fork com
+# threads vivas não é seguro. Qualquer falha do pool cai no serial.
+# =========================================================
+_POOL: Dict[int, ProcessPoolExecutor] = {}
+
+
+def _pool(processos: int) -> ProcessPoolExecutor:
+    # Um pool vivo só, reaproveitado entre atualizações (spawn custa caro)
+    if processos not in _POOL:
+        _encerrar_pool()
+        _POOL[processos] = ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context("spawn"))
+    return _POOL[processos]
+
+
+def _encerrar_pool():
+    for pool in _POOL.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    _POOL.clear()
+
+
+def _estatisticas_fatia(nome_memoria: str, forma: Tuple[int, int], inicio: int, fim: int, Y: np.ndarray,
+                        variaveis: Sequence[str], alvos: Sequence[str], q_faixas: int) -> EstatisticasFaixas:
+    memoria = shared_memory.SharedMemory(name=nome_memoria)
+    try:
+        X = np.ndarray(forma, dtype=np.float64, buffer=memoria.buf, order="F")
+        fatia = np.array(X[:, inicio:fim])
+        del X
+        return EstatisticasFaixas.calcular(fatia, Y, variaveis, alvos, q_faixas)
+    finally:
+        memoria.close()
+
+
+def _fatias(m: int, processos: int) -> List[Tuple[int, int]]:
+    n_fatias = min(processos, m // MIN_COLUNAS_POR_PROCESSO)
+    limites = np.linspace(0, m, max(n_fatias, 1) + 1).astype(int)
+    return list(zip(limites[:-1], limites[1:]))
+
+
+def _estatisticas_paralelo(X: np.ndarray, Y: np.ndarray, variaveis: Sequence[str], alvos: Sequence[str],
+                           q_faixas: int, processos: int) -> EstatisticasFaixas:
+    fatias = _fatias(X.shape[1], processos)
+    if len(fatias) < 2:
+        return EstatisticasFaixas.calcular(X, Y, variaveis, alvos, q_faixas)
+    memoria = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+    try:
+        np.ndarray(X.shape, dtype=np.float64, buffer=memoria.buf, order="F")[:] = X
+        futuros = [
+            _pool(processos).submit(_estatisticas_fatia, memoria.name, X.shape, i, f, Y, variaveis[i:f], alvos, q_faixas)
+            for i, f in fatias
+        ]
+        return EstatisticasFaixas.juntar([futuro.result() for futuro in futuros])
+    except (BrokenProcessPool, OSError):
+        _encerrar_pool()
+        return EstatisticasFaixas.calcular(X, Y, variaveis, alvos, q_faixas)
+    finally:
+        memoria.close()
+        memoria.unlink()
+
+
+def matriz_variaveis(df: pd.DataFrame, variaveis: Sequence[str],
+                     derivadas: Optional[Dict[str, Derivada]] = None) -> np.ndarray:
+    # Colunas do frame são lidas direto; derivadas que não viraram coluna
+    # são calculadas em lote dentro da própria matriz
+    X = np.empty((len(df), len(variaveis)), order="F")
+    pendentes = []
+    for j, v in enumerate(variaveis):
+        if v in df.columns:
+            X[:, j] = pd.to_numeric(df[v], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        else:
+            pendentes.append(j)
+    if pendentes:
+        X[:, pendentes] = avaliar_lote(df, [derivadas[variaveis[j]] for j in pendentes])
+    return X
+
+
+def _tabela_alvos(df: pd.DataFrame, alvos: Sequence[str]) -> pd.DataFrame:
+    return pd.DataFrame({a: pd.to_numeric(df[a], errors="coerce") for a in alvos}, index=df.index)
+
+
+def minerar_estatisticas(df_hist: pd.DataFrame, variaveis: Sequence[str], alvos: Sequence[str],
+                         q_faixas: int = 5, processos: Optional[int] = None,
+                         derivadas: Optional[Dict[str, Derivada]] = None) -> List[EstatisticasFaixas]:
+    # Uma EstatisticasFaixas por grupo de alvos com o mesmo padrão de faltantes
+    processos = PROCESSOS_MINERACAO if processos is None else processos
+    variaveis = list(variaveis)
+    if not variaveis or df_hist.empty:
+        return []
+    X = matriz_variaveis(df_hist, variaveis, derivadas)
+    tabela_alvos = _tabela_alvos(df_hist, alvos)
+    estatisticas = []
+    for grupo in _grupos_por_faltantes(tabela_alvos):
+        linhas = tabela_alvos[grupo[0]].notna().to_numpy()
+        Y = tabela_alvos.loc[linhas, grupo].to_numpy(dtype=float)
+        Xg = X if linhas.all() else np.asfortranarray(X[linhas])
+        estatisticas.append(_estatisticas_paralelo(Xg, Y, variaveis, grupo, q_faixas, processos))
+    return estatisticas
+
+
+def resumir_estatisticas(estatisticas: Sequence[EstatisticasFaixas], alvos: Sequence[str],
+                         min_linhas: int = 20, chave: str = "forca", com_intervalos: bool = True) -> Dict[str, pd.DataFrame]:
+    # Empates na ordenação seguem a ordem variável -> faixa, como no concat antigo
+    resumos: Dict[str, pd.DataFrame] = {}
+    for est in estatisticas:
+        resumos.update(est.resumos(min_linhas, com_intervalos))
+    return {a: ordenar_regras(resumos[a], chave) if a in resumos else pd.DataFrame() for a in alvos}
+
+
+def atualizar_estatisticas(estatisticas: Sequence[EstatisticasFaixas], df_novas: pd.DataFrame, df_hist: pd.DataFrame,
+                           derivadas: Optional[Dict[str, Derivada]] = None, limite_deriva: float = LIMITE_DERIVA) -> dict:
+    # Soma as linhas FT novas nas faixas e refaz o corte, sobre o histórico
+    # inteiro, só das variáveis cuja ocupação derivou
+    requantizadas = 0
+    if not estatisticas or df_novas.empty:
+        return {"absorvidas": 0, "requantizadas": 0}
+    variaveis = estatisticas[0].variaveis
+    X_novas = matriz_variaveis(df_novas, variaveis, derivadas)
+    for est in estatisticas:
+        alvos_novas = _tabela_alvos(df_novas, est.alvos)
+        linhas = alvos_novas[est.alvos[0]].notna().to_numpy()
+        est.somar(X_novas[linhas], alvos_novas.loc[linhas].to_numpy(dtype=float))
+        derivou = np.flatnonzero(est.deriva() > limite_deriva)
+        if len(derivou):
+            alvos_hist = _tabela_alvos(df_hist, est.alvos)
+            linhas_hist = alvos_hist[est.alvos[0]].notna().to_numpy()
+            nomes = [variaveis[j] for j in derivou]
+            X = matriz_variaveis(df_hist[linhas_hist], nomes, derivadas)
+            Y = alvos_hist.loc[linhas_hist].to_numpy(dtype=float)
+            est.substituir(derivou, EstatisticasFaixas.calcular(X, Y, nomes, est.alvos, est.q_faixas))
+            requantizadas += len(derivou)
+    return {"absorvidas": len(df_novas), "requantizadas": requantizadas}
+
+
+def minerar_alvos(df_hist: pd.DataFrame, variaveis: Sequence[str], alvos: Sequence[str],
+                  min_linhas: int = 20, q_faixas: int = 5, processos: Optional[int] = None,
+                  derivadas: Optional[Dict[str, Derivada]] = None) -> Dict[str, pd.DataFrame]:
+    estatisticas = minerar_estatisticas(df_hist, variaveis, alvos, q_faixas, processos, derivadas)
+    return resumir_estatisticas(estatisticas, alvos, min_linhas)
+
+
+# =========================================================
+# MINERAÇÃO FORA DA MEMÓRIA (HISTÓRICO EM ARQUIVOS)
+# Para histórico de várias temporadas/ligas que não cabe no processo: os
+# arquivos (Arrow IPC ou Parquet, uma linha por jogo FT, com as colunas
+# base das variáveis e os alvos) são lidos em lotes, nunca inteiros.
+#   0. só as colunas de alvo: padrão de faltantes -> grupos de alvos
+#   1. sketch de quantis por variável e grupo -> bordas das faixas
+#   2. faixa de cada valor com essas bordas -> jogos/acertos por faixa
+# Cada processo cuida de um bloco de arquivos e devolve sketches ou
+# contagens, que se somam; a memória fica limitada ao lote, não ao
+# histórico. As bordas saem do sketch: iguais às do qcut enquanto ele não
+# compacta e aproximadas (erro de posto ~1/K_SKETCH) depois disso.
+# =========================================================
+BYTES_POR_LOTE = 64 << 20
+MIN_LINHAS_LOTE = 1024
+EXTENSOES_HISTORICO = (".arrow", ".feather", ".parquet")
+
+
+def arquivos_historico(pasta) -> List[Path]:
+    pasta = Path(pasta)
+    if not pasta.is_dir():
+        return []
+    return sorted(p for p in pasta.iterdir() if p.suffix in EXTENSOES_HISTORICO)
+
+
+def gravar_historico(df: pd.DataFrame, pasta, nome: str) -> Optional[Path]:
+    destino = Path(pasta) / f"{nome}.arrow"
+    try:
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        tmp = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+        feather.write_feather(df.reset_index(drop=True), tmp, compression="uncompressed")
+        os.replace(tmp, destino)
+    except (OSError, pa.ArrowException, TypeError, ValueError):
+        return None
+    return destino
+
+
+def colunas_necessarias(variaveis: Sequence[str], alvos: Sequence[str],
+                        derivadas: Optional[Dict[str, Derivada]] = None) -> List[str]:
+    colunas = []
+    for v in variaveis:
+        d = (derivadas or {}).get(v)
+        colunas.extend((d.c1, d.c2) if d else (v,))
+    return list(dict.fromkeys(colunas + list(alvos)))
+
+
+def ler_lotes(caminho, colunas: Sequence[str], linhas_por_lote: int) -> Iterator[pd.DataFrame]:
+    # Só as colunas pedidas; as que o arquivo não tem vêm vazias
+    caminho = Path(caminho)
+    if caminho.suffix == ".parquet":
+        arquivo = pq.ParquetFile(caminho)
+        presentes = [c for c in colunas if c in arquivo.schema_arrow.names]
+        for lote in arquivo.iter_batches(batch_size=linhas_por_lote, columns=presentes):
+            yield lote.to_pandas().reindex(columns=colunas)
+        return
+    with pa.memory_map(str(caminho)) as fonte:
+        leitor = pa.ipc.open_file(fonte)
+        presentes = [c for c in colunas if c in leitor.schema.names]
+        for i in range(leitor.num_record_batches):
+            bloco = leitor.get_batch(i).select(presentes)
+            for inicio in range(0, bloco.num_rows, linhas_por_lote):
+                yield bloco.slice(inicio, linhas_por_lote).to_pandas().reindex(columns=colunas)
+
+
+def _linhas_por_lote(m: int) -> int:
+    return max(MIN_LINHAS_LOTE, BYTES_POR_LOTE // (8 * max(m, 1)))
+
+
+def _faltantes_arquivos(caminhos: Sequence[str], alvos: Sequence[str], linhas_por_lote: int) -> Dict[str, bytes]:
+    resumo = {a: hashlib.blake2b(digest_size=16) for a in alvos}
+    for caminho in caminhos:
+        for df in ler_lotes(caminho, alvos, linhas_por_lote):
+            for a in alvos:
+                resumo[a].update(np.packbits(pd.to_numeric(df[a], errors="coerce").isna().to_numpy()).tobytes())
+    return {a: h.digest() for a, h in resumo.items()}
+
+
+def _lotes_grupos(caminhos: Sequence[str], variaveis: Sequence[str], grupos: Sequence[Sequence[str]],
+                  derivadas: Optional[Dict[str, Derivada]]) -> Iterator[List[Tuple[np.ndarray, np.ndarray]]]:
+    # -> por lote, (X, Y) das linhas de cada grupo de alvos
+    colunas = colunas_necessarias(variaveis, [a for g in grupos for a in g], derivadas)
+    for caminho in caminhos:
+        for df in ler_lotes(caminho, colunas, _linhas_por_lote(len(variaveis))):
+            X = matriz_variaveis(df, variaveis, derivadas)
+            saida = []
+            for grupo in grupos:
+                alvos = _tabela_alvos(df, grupo)
+                linhas = alvos[grupo[0]].notna().to_numpy()
+                saida.append((X[linhas], alvos.loc[linhas].to_numpy(dtype=float)))
+            yield saida
+
+
+def _sketches_arquivos(caminhos: Sequence[str], variaveis: Sequence[str], grupos: Sequence[Sequence[str]],
+                       derivadas: Optional[Dict[str, Derivada]], k_sketch: int) -> List[SketchQuantis]:
+    sketches = [SketchQuantis(len(variaveis), k_sketch) for _ in grupos]
+    for lote in _lotes_grupos(caminhos, variaveis, grupos, derivadas):
+        for sketch, (X, _) in zip(sketches, lote):
+            sketch.atualizar(X)
+    return sketches
+
+
+def _contagens_arquivos(caminhos: Sequence[str], variaveis: Sequence[str], grupos: Sequence[Sequence[str]],
+                        derivadas: Optional[Dict[str, Derivada]], bordas: Sequence[Tuple[np.ndarray, np.ndarray]],
+                        q_faixas: int) -> List[List[np.ndarray]]:
+    m = len(variaveis)
+    contagens = [
+        [np.zeros((m, q_faixas), dtype=np.int64), np.zeros((m, q_faixas, len(g))), np.zeros(m, dtype=np.int64), np.zeros((m, len(g)))]
+        for g in grupos
+    ]
+    for lote in _lotes_grupos(caminhos, variaveis, grupos, derivadas):
+        for total, (X, Y), (b, n_b) in zip(contagens, lote, bordas):
+            faixa = codificar_faixas(X, b)
+            faixa[:, n_b < 2] = -1
+            for acumulado, parcial in zip(total, contar_faixas(faixa, Y, q_faixas)):
+                acumulado += parcial
+    return contagens
+
+
+def bordas_sketch(sketch: SketchQuantis, q_faixas: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Mesmo formato de quantis_colunas, com q efetivo e quantis vindos do sketch
+    n_q = np.minimum(q_faixas, sketch.distintos())
+    bordas = np.full((q_faixas + 1, sketch.m), np.inf)
+    n_bordas = np.zeros(sketch.m, dtype=np.int64)
+    for k in np.unique(n_q[n_q >= 2]):
+        colunas = np.flatnonzero(n_q == k)
+        brutas = sketch.quantis(probabilidades_quantis(int(k)), colunas)
+        bordas[:k + 1, colunas], n_bordas[colunas] = descartar_repetidas(brutas)
+    return bordas, n_bordas
+
+
+def _mapear_blocos(funcao, blocos: List[List[str]], processos: int, *args) -> list:
+    # Um bloco de arquivos por processo; falha do pool cai no serial
+    if len(blocos) > 1 and processos > 1:
+        try:
+            futuros = [_pool(processos).submit(funcao, bloco, *args) for bloco in blocos]
+            return [futuro.result() for futuro in futuros]
+        except (BrokenProcessPool, OSError):
+            _encerrar_pool()
+    return [funcao(bloco, *args) for bloco in blocos]
+
+
+def minerar_arquivos(caminhos: Sequence, variaveis: Sequence[str], alvos: Sequence[str], q_faixas: int = 5,
+                     processos: Optional[int] = None, derivadas: Optional[Dict[str, Derivada]] = None,
+                     k_sketch: int = K_SKETCH) -> List[EstatisticasFaixas]:
+    processos = PROCESSOS_MINERACAO if processos is None else processos
+    variaveis = list(variaveis)
+    caminhos = [str(c) for c in caminhos]
+    if not variaveis or not caminhos:
+        return []
+    blocos = [list(b) for b in np.array_split(np.array(caminhos, dtype=object), min(processos, len(caminhos)))]
+
+    resumos = _mapear_blocos(_faltantes_arquivos, blocos, processos, list(alvos), _linhas_por_lote(len(alvos)))
+    grupos: Dict[tuple, List[str]] = {}
+    for a in alvos:
+        grupos.setdefault(tuple(r[a] for r in resumos), []).append(a)
+    grupos = list(grupos.values())
+
+    sketches = _mapear_blocos(_sketches_arquivos, blocos, processos, variaveis, grupos, derivadas, k_sketch)
+    bordas = []
+    for g in range(len(grupos)):
+        sketch = sketches[0][g]
+        for outro in sketches[1:]:
+            sketch.juntar(outro[g])
+        bordas.append(bordas_sketch(sketch, q_faixas))
+
+    partes = _mapear_blocos(_contagens_arquivos, blocos, processos, variaveis, grupos, derivadas, bordas, q_faixas)
+    estatisticas = []
+    for g, grupo in enumerate(grupos):
+        jogos, acertos, validos, soma_alvos = (sum(p[g][i] for p in partes) for i in range(4))
+        estatisticas.append(EstatisticasFaixas(variaveis, grupo, q_faixas, *bordas[g], jogos, acertos, validos, soma_alvos))
+    return estatisticas
@@ -0,0 +1,269 @@
+import io
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from interacoes_regras import minerar_interacoes
+from mineracao_regras import LIMITE_DERIVA, EstatisticasFaixas, atualizar_estatisticas, resumir_estatisticas
+
+# =========================================================
+# MODELO DE REGRAS PERSISTIDO
+# O resultado da mineração (estatísticas por faixa de cada grupo de alvos,
+# regras derivadas delas, regras de interação, variáveis usadas, colunas
+# numéricas de onde saem as derivadas) vira um artefato versionado: um
+# arquivo Arrow com as regras, os metadados, as estatísticas e as
+# interações no schema e os hashes das linhas FT já contadas.
+# FT novos são somados nas faixas (revisão + 1) em vez de disparar outra
+# mineração; a mineração completa só volta a rodar quando o modelo passa
+# da idade máxima, muda o conjunto de variáveis ou somem FT demais da
+# planilha (contagens que não dá para descontar).
+# Modelo minerado sem interações (desligadas no painel) segue sem elas.
+# As interações não são incrementais: a cada absorção os pares são
+# recontados (bitmaps) sobre todo o FT da planilha com as bordas
+# atualizadas, custo O(FT) e não O(linhas novas). Com histórico em
+# arquivos (GOL_PASTA_HISTORICO) as bordas vêm dos arquivos, mas as
+# contagens dos pares continuam só do FT da planilha, como na mineração.
+# =========================================================
+VERSAO_MODELO = 4
+PASTA_MODELOS = Path(os.environ.get(
+    "GOL_PASTA_MODELOS",
+    Path(__file__).resolve().parent / ".cache_planilhas" / "modelos",
+))
+IDADE_MAXIMA_S = 24 * 3600
+MIN_REMOVIDAS_FT = 50
+COLUNAS_VALORES = [
+    "jogos", "taxa_acerto", "baseline", "lift", "forca", "taxa_inf", "taxa_sup", "lift_inf", "lift_sup", "forca_inf",
+]
+
+_trava = threading.Lock()
+
+
+class ModeloRegras:
+    def __init__(self, estatisticas: Sequence[EstatisticasFaixas], alvos: Sequence[str], min_linhas: int,
+                 variaveis: Sequence[str], colunas_numericas: Sequence[str], hashes_ft: np.ndarray,
+                 assinatura_hist: str, criado_em: Optional[str] = None, versao: int = VERSAO_MODELO,
+                 revisao: int = 0, atualizado_em: Optional[str] = None,
+                 interacoes: Optional[Dict[str, pd.DataFrame]] = None):
+        self.estatisticas = list(estatisticas)
+        self.alvos = list(alvos)
+        self.min_linhas = min_linhas
+        self.regras: Dict[str, pd.DataFrame] = resumir_estatisticas(self.estatisticas, self.alvos, min_linhas)
+        self.interacoes: Dict[str, pd.DataFrame] = {a: (interacoes or {}).get(a, pd.DataFrame()) for a in self.alvos}
+        self.variaveis = list(variaveis)
+        self.colunas_numericas = list(colunas_numericas)
+        self.hashes_ft = np.sort(np.asarray(hashes_ft, dtype=np.uint64))
+        self.assinatura_hist = assinatura_hist
+        self.criado_em = criado_em or datetime.now().isoformat(timespec="seconds")
+        self.versao = versao
+        self.revisao = revisao
+        self.atualizado_em = atualizado_em or self.criado_em
+        self.ultima_absorcao = {"absorvidas": 0, "requantizadas": 0}
+
+    @property
+    def identificador(self) -> str:
+        return f"v{self.versao}.{self.revisao}:{self.assinatura_hist}"
+
+    def idade_s(self, agora: Optional[datetime] = None) -> float:
+        return ((agora or datetime.now()) - datetime.fromisoformat(self.criado_em)).total_seconds()
+
+    def _novas(self, hashes_ft: np.ndarray) -> np.ndarray:
+        return ~np.isin(np.asarray(hashes_ft, dtype=np.uint64), self.hashes_ft)
+
+    def novas_ft(self, hashes_ft: np.ndarray) -> int:
+        # Linhas FT (novas ou com conteúdo alterado) que o modelo não contou
+        return int(self._novas(hashes_ft).sum())
+
+    def removidas_ft(self, hashes_ft: np.ndarray) -> int:
+        # Linhas contadas que não estão mais na planilha (saíram ou mudaram)
+        return int((~np.isin(self.hashes_ft, np.asarray(hashes_ft, dtype=np.uint64))).sum())
+
+    def absorver(self, df_hist: pd.DataFrame, hashes_ft: np.ndarray, assinatura_hist: str,
+                 derivadas: Optional[dict] = None, limite_deriva: float = LIMITE_DERIVA) -> dict:
+        # Soma os FT ainda não contados (hashes_ft alinhado às linhas de df_hist)
+        novas = self._novas(hashes_ft)
+        resumo = atualizar_estatisticas(self.estatisticas, df_hist[novas], df_hist, derivadas, limite_deriva)
+        self.regras = resumir_estatisticas(self.estatisticas, self.alvos, self.min_linhas)
+        if any(not r.empty for r in self.interacoes.values()):
+            self.interacoes = minerar_interacoes(df_hist, self.estatisticas, self.alvos, self.min_linhas, derivadas=derivadas)
+        self.hashes_ft = np.union1d(self.hashes_ft, np.asarray(hashes_ft, dtype=np.uint64)[novas])
+        self.assinatura_hist = assinatura_hist
+        self.revisao += 1
+        self.atualizado_em = datetime.now().isoformat(timespec="seconds")
+        self.ultima_absorcao = resumo
+        return resumo
+
+    def resumo(self) -> dict:
+        return {
+            "versao": self.versao,
+            "revisao": self.revisao,
+            "criado_em": self.criado_em,
+            "atualizado_em": self.atualizado_em,
+            "linhas_ft": len(self.hashes_ft),
+            "regras": {a: len(r) for a, r in self.regras.items()},
+            "interacoes": {a: len(r) for a, r in self.interacoes.items()},
+            **self.ultima_absorcao,
+        }
+
+
+def motivo_reminerar(modelo: Optional[ModeloRegras], alvos: Iterable[str], colunas: Iterable[str],
+                     hashes_ft: np.ndarray, assinatura_hist: str, idade_maxima_s: float = IDADE_MAXIMA_S,
+                     min_removidas_ft: int = MIN_REMOVIDAS_FT) -> Tuple[Optional[str], int]:
+    # -> (motivo para minerar de novo ou None para reaproveitar, FT novos a absorver)
+    if modelo is None:
+        return "sem_modelo", len(hashes_ft)
+    if modelo.versao != VERSAO_MODELO or list(alvos) != modelo.alvos:
+        return "versao", len(hashes_ft)
+    if modelo.assinatura_hist == assinatura_hist:
+        return None, 0
+    novas = modelo.novas_ft(hashes_ft)
+    colunas = set(colunas)
+    if any(v not in colunas for v in modelo.variaveis):
+        return "variaveis", novas
+    if modelo.idade_s() >= idade_maxima_s:
+        return "agendado", novas
+    if modelo.removidas_ft(hashes_ft) >= min_removidas_ft:
+        return "removidas_ft", novas
+    return None, novas
+
+
+# =========================================================
+# ARTEFATO EM DISCO
+# =========================================================
+def _arquivo(nome: str) -> Path:
+    return PASTA_MODELOS / f"{nome}_v{VERSAO_MODELO}.arrow"
+
+
+def _estatisticas_bytes(est: EstatisticasFaixas) -> bytes:
+    buf = io.BytesIO()
+    np.savez(buf, **{c: getattr(est, c) for c in EstatisticasFaixas.CAMPOS})
+    return buf.getvalue()
+
+
+def _estatisticas_de_bytes(dados: bytes, variaveis: Sequence[str], grupo: dict) -> EstatisticasFaixas:
+    with np.load(io.BytesIO(dados)) as arq:
+        campos = {c: arq[c] for c in EstatisticasFaixas.CAMPOS}
+    return EstatisticasFaixas(variaveis, grupo["alvos"], grupo["q_faixas"], **campos)
+
+
+def _interacoes_bytes(interacoes: Dict[str, pd.DataFrame]) -> bytes:
+    partes = []
+    for alvo, r in interacoes.items():
+        if r.empty:
+            continue
+        faixa, faixa2 = pd.arrays.IntervalArray(r["faixa"]), pd.arrays.IntervalArray(r["faixa2"])
+        partes.append(pd.DataFrame({
+            "alvo": alvo,
+            "var": r["var"].astype(str).to_numpy(),
+            "faixa_esq": np.asarray(faixa.left, dtype=float),
+            "faixa_dir": np.asarray(faixa.right, dtype=float),
+            "var2": r["var2"].astype(str).to_numpy(),
+            "faixa2_esq": np.asarray(faixa2.left, dtype=float),
+            "faixa2_dir": np.asarray(faixa2.right, dtype=float),
+            **{c: r[c].to_numpy() for c in COLUNAS_VALORES},
+        }))
+    if not partes:
+        return b""
+    buf = io.BytesIO()
+    feather.write_feather(pd.concat(partes, ignore_index=True), buf, compression="uncompressed")
+    return buf.getvalue()
+
+
+def _interacoes_de_bytes(dados: bytes) -> Dict[str, pd.DataFrame]:
+    if not dados:
+        return {}
+    df = feather.read_table(pa.BufferReader(dados)).to_pandas()
+    interacoes = {}
+    for alvo, r in df.groupby("alvo", sort=False):
+        interacoes[alvo] = pd.DataFrame({
+            "faixa": pd.arrays.IntervalArray.from_arrays(r["faixa_esq"], r["faixa_dir"], closed="right"),
+            "jogos": r["jogos"].to_numpy(),
+            "taxa_acerto": r["taxa_acerto"].to_numpy(),
+            "var": r["var"].to_numpy(),
+            **{c: r[c].to_numpy() for c in COLUNAS_VALORES[2:]},
+            "var2": r["var2"].to_numpy(),
+            "faixa2": pd.arrays.IntervalArray.from_arrays(r["faixa2_esq"], r["faixa2_dir"], closed="right"),
+        })
+    return interacoes
+
+
+def _tabela_regras(modelo: ModeloRegras) -> pa.Table:
+    # As regras vão como tabela para inspeção; no carregamento saem das estatísticas
+    partes = []
+    for alvo, r in modelo.regras.items():
+        if r is None or r.empty:
+            continue
+        faixa = pd.arrays.IntervalArray(r["faixa"])
+        partes.append(pd.DataFrame({
+            "alvo": alvo,
+            "var": r["var"].astype(str).to_numpy(),
+            "faixa_esq": np.asarray(faixa.left, dtype=float),
+            "faixa_dir": np.asarray(faixa.right, dtype=float),
+            **{c: r[c].to_numpy() for c in COLUNAS_VALORES},
+        }))
+    df = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(
+        columns=["alvo", "var", "faixa_esq", "faixa_dir", *COLUNAS_VALORES]
+    )
+    meta = {
+        "versao": modelo.versao,
+        "revisao": modelo.revisao,
+        "criado_em": modelo.criado_em,
+        "atualizado_em": modelo.atualizado_em,
+        "assinatura_hist": modelo.assinatura_hist,
+        "alvos": modelo.alvos,
+        "min_linhas": modelo.min_linhas,
+        "grupos": [{"alvos": e.alvos, "q_faixas": e.q_faixas} for e in modelo.estatisticas],
+        "variaveis": modelo.variaveis,
+        "colunas_numericas": modelo.colunas_numericas,
+    }
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    return tabela.replace_schema_metadata({
+        b"modelo": json.dumps(meta, ensure_ascii=False).encode("utf-8"),
+        b"hashes_ft": modelo.hashes_ft.tobytes(),
+        b"interacoes": _interacoes_bytes(modelo.interacoes),
+        **{f"estatisticas_{i}".encode(): _estatisticas_bytes(e) for i, e in enumerate(modelo.estatisticas)},
+    })
+
+
+def gravar_modelo(modelo: ModeloRegras, nome: str = "regras") -> bool:
+    destino = _arquivo(nome)
+    try:
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        with _trava:
+            tmp = destino.with_name(f"{destino.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            feather.write_feather(_tabela_regras(modelo), tmp, compression="uncompressed")
+            os.replace(tmp, destino)
+    except (OSError, pa.ArrowException, TypeError, ValueError):
+        return False
+    return True
+
+
+def carregar_modelo(nome: str = "regras") -> Optional[ModeloRegras]:
+    arq = _arquivo(nome)
+    if not arq.exists():
+        return None
+    try:
+        metadados = feather.read_table(arq).schema.metadata
+        meta = json.loads(metadados[b"modelo"].decode("utf-8"))
+        if meta.get("versao") != VERSAO_MODELO:
+            return None
+        hashes_ft = np.frombuffer(metadados[b"hashes_ft"], dtype=np.uint64)
+        estatisticas = [
+            _estatisticas_de_bytes(metadados[f"estatisticas_{i}".encode()], meta["variaveis"], grupo)
+            for i, grupo in enumerate(meta["grupos"])
+        ]
+        interacoes = _interacoes_de_bytes(metadados[b"interacoes"])
+    except (OSError, pa.ArrowException, KeyError, ValueError):
+        return None
+    return ModeloRegras(
+        estatisticas, meta["alvos"], meta["min_linhas"], meta["variaveis"], meta["colunas_numericas"], hashes_ft,
+        meta["assinatura_hist"], criado_em=meta["criado_em"], versao=meta["versao"], revisao=meta["revisao"],
+        atualizado_em=meta["atualizado_em"], interacoes=interacoes,
+    )
@@ -1,10 +1,15 @@
-import re
-from typing import Optional, Tuple
+from typing import BinaryIO, Optional
 
 import numpy as np
 import pandas as pd
 import streamlit as st
 
+from atualizador_fundo import Atualizador
+from cache_planilhas import ler_dataframe
+from fontes_dados import url_fonte
+from esquema_pre_live import ler_pre_live
+from conversao_numerica import para_numero_escalar
+
 # ============================================================
 # CONFIG
 # ============================================================
@@ -15,7 +20,7 @@ st.set_page_config(
     initial_sidebar_state="collapsed",
 )
 
-CSV_URL = "https://docs.google.com/spreadsheets/d/e/2PACX-1vTHLhAS8u9JBw2sFr2qkQdsUBeRWIFaWm0STZ17yCROnYbBWgrqlBFS6bo35rtsKhHpg3NstBBHDFIe/pub?gid=0&single=true&output=csv"
+CSV_URL = url_fonte("pre_live")
 
 
 # ============================================================
@@ -283,38 +288,7 @@ def inject_css() -> None:
 # HELPERS
 # ============================================================
 def to_float(val) -> Optional[float]:
-    if pd.isna(val):
-        return None
-    s = str(val).strip()
-    if s == "":
-        return None
-    s = s.replace("%", "").replace(",", ".")
-    s = re.sub(r"[^0-9.\-]", "", s)
-    if s in {"", ".", "-", "-."}:
-        return None
-    try:
-        return float(s)
-    except ValueError:
-        return None
-
-
-def split_pair_value(val) -> tuple[Optional[float], Optional[float]]:
-    if pd.isna(val):
-        return None, None
-    s = str(val).strip()
-    if not s:
-        return None, None
-    s = s.replace("%", "").replace(",", ".")
-    parts = [p.strip() for p in re.split(r"\||/| x | X | vs | VS |;", s) if p.strip()]
-    nums = []
-    for p in parts:
-        n = to_float(p)
-        if n is not None:
-            nums.append(n)
-    if len(nums) >= 2:
-        return nums[0], nums[1]
-    n = to_float(s)
-    return n, None
+    return para_numero_escalar(val)
 
 
 def fmt_num(v, nd: int = 2, pct: bool = False) -> str:
@@ -357,29 +331,6 @@ def fmt_pct(v, nd: int = 2) -> str:
         return "-"
 
 
-def infer_prob_from_odd(odd: Optional[float]) -> Optional[float]:
-    if odd is None or odd <= 0:
-        return None
-    return (1 / odd) * 100
-
-
-def pick_confidence(score: float) -> Tuple[str, str]:
-    if score >= 70:
-        return "Alta", "green"
-    if score >= 50:
-        return "Média", "yellow"
-    return "Baixa", "red"
-
-
-def get_first_existing(df: pd.DataFrame, names: list[str]) -> Optional[str]:
-    lower_map = {c.lower().strip(): c for c in df.columns}
-    for name in names:
-        key = name.lower().strip()
-        if key in lower_map:
-            return lower_map[key]
-    return None
-
-
 def has_detail_data(row: pd.Series) -> bool:
     critical_required = [
         "odd_home", "odd_away", "odd_over25", "odd_under25",
@@ -412,24 +363,18 @@ def has_detail_data(row: pd.Series) -> bool:
     return critical_ok and compare_count >= 6 and pattern_count >= 2
 
 
-def calcular_forca_geral(row: pd.Series) -> int:
-    score_casa = 0
-    score_fora = 0
+def calcular_forca_geral(df: pd.DataFrame) -> pd.Series:
+    forca = pd.Series(0, index=df.index)
     campos = ["win_pct", "efficiency", "efficacy_ht", "efficiency_2h"]
 
     for base in campos:
-        casa = to_float(row.get(f"{base}_home"))
-        fora = to_float(row.get(f"{base}_away"))
-
-        if casa is None or fora is None:
+        if f"{base}_home" not in df.columns or f"{base}_away" not in df.columns:
             continue
+        casa = pd.to_numeric(df[f"{base}_home"], errors="coerce")
+        fora = pd.to_numeric(df[f"{base}_away"], errors="coerce")
+        forca += (casa > fora).astype(int) - (fora > casa).astype(int)
 
-        if casa > fora:
-            score_casa += 1
-        elif fora > casa:
-            score_fora += 1
-
-    return score_casa - score_fora
+    return forca
 
 
 def compute_daily_indicator_means(df: pd.DataFrame) -> dict:
@@ -505,170 +450,53 @@ def indicator_with_day_signal(value, day_mean) -> str:
 # ============================================================
 # LOAD DATA
 # ============================================================
-@st.cache_data(show_spinner=False, ttl=300)
-def load_data() -> pd.DataFrame:
-    df = pd.read_csv(CSV_URL)
-    df.columns = [str(c).strip() for c in df.columns]
-
-    rename_map = {}
-    possible_names = {
-        "league": ["League", "Liga", "Campeonato"],
-        "country": ["Country", "País"],
-        "home": ["Home Team", "Casa", "Mandante", "Time Casa"],
-        "away": ["Visitor Team", "Visitante", "Fora", "Time Visitante"],
-        "hour": ["Hour", "Hora"],
-        "date": ["Date", "Data"],
-        "status": ["Status"],
-        "odd_home": ["Odds Casa para vencer", "(Odds)Casa para vencer", "Odd Casa"],
-        "odd_away": ["Odds Visitante para vencer", "(Odds)Visitante para vencer", "Odd Visitante"],
-        "odd_over25": ["Odds Mais de 2.5 gols", "(Odds)Mais de 2.5 gols"],
-        "odd_under25": ["Odds Menos de 2.5 gols", "(Odds)Menos de 2.5 gols"],
-        "odd_btts_yes": ["Odds Ambas as equipes marcam (Sim)", "(Odds)Ambas as equipes marcam (Sim)"],
-        "odd_btts_no": ["Odds Ambas as equipes marcam (Não)", "(Odds)Ambas as equipes marcam (Não)"],
-        "odd_over05ht": ["Odds Mais de 0.5 gol 1º tempo", "(Odds)Mais de 0.5 gol 1º tempo"],
-        "win_pct": ["(W%) Vitórias"],
-        "draw_pct": ["(D%) Empates"],
-        "loss_pct": ["(L%) Derrotas"],
-        "efficiency": ["Eficiência"],
-        "efficacy_ht": ["Eficácia 1º tempo"],
-        "efficiency_2h": ["Eficiência 2º tempo"],
-        "rank": ["Classificação"],
-        "games": ["Número de jogos calculados"],
-        "avg_gf": ["Média de gols marcados"],
-        "avg_ga": ["Média de gols sofridos"],
-        "avg_gf_ht": ["Média de gols marcados 1º tempo"],
-        "avg_ga_ht": ["Média de gols sofridos 1º tempo"],
-        "avg_gf_2h": ["Média de gols marcados 2º tempo"],
-        "avg_ga_2h": ["Média de gols sofridos 2º tempo"],
-        "over15": ["Mais de 1.5 gols"],
-        "over25": ["Mais de 2.5 gols"],
-        "over05ht": ["Mais de 0.5 gol 1º tempo"],
-        "under25": ["Menos de 2.5 gols"],
-        "under15": ["Menos de 1.5 gols"],
-        "btts": ["Ambas marcam", "Ambas as equipes marcam"],
-        "scored_first": ["Marcou primeiro gol"],
-        "scored_first_ht": ["Marcou primeiro gol 1º tempo"],
-        "conceded_first_ht": ["Sofreu primeiro gol 1º tempo"],
-        "conceded_first": ["Sofreu primeiro gol"],
-        "res1": ["Primeiro resultado mais comum"],
-        "res2": ["Segundo resultado mais comum"],
-        "res3": ["Terceiro resultado mais comum"],
-        "res1_ht": ["Primeiro resultado mais comum 1º tempo"],
-        "res2_ht": ["Segundo resultado mais comum 1º tempo"],
-        "res3_ht": ["Terceiro resultado mais comum 1º tempo"],
-        "win_pct_ht": ["(W%) Vitórias 1º tempo"],
-        "win_pct_2h": ["(W%) Vitórias 2º tempo"],
-    }
-
-    for new_name, options in possible_names.items():
-        col = get_first_existing(df, options)
-        if col:
-            rename_map[col] = new_name
-
-    df = df.rename(columns=rename_map)
-
-    pair_base_cols = [
-        "win_pct", "draw_pct", "loss_pct", "efficiency", "efficacy_ht", "efficiency_2h",
-        "rank", "games", "avg_gf", "avg_ga", "avg_gf_ht", "avg_ga_ht",
-        "avg_gf_2h", "avg_ga_2h", "scored_first", "scored_first_ht",
-        "conceded_first_ht", "conceded_first", "win_pct_ht", "win_pct_2h"
-    ]
+def parse_data(content: BinaryIO, name: str = "CSV_URL") -> pd.DataFrame:
+    df = ler_pre_live(content)
 
-    for col in ["odd_home", "odd_away", "odd_over25", "odd_under25", "odd_btts_yes", "odd_btts_no", "odd_over05ht"]:
-        if col in df.columns:
-            df[col] = df[col].apply(to_float)
+    df["match_name"] = df["home"].astype(str) + " vs " + df["away"].astype(str)
+    for col, prob_col in [("odd_home", "prob_home"), ("odd_away", "prob_away"),
+                          ("odd_over25", "prob_over25"), ("odd_under25", "prob_under25")]:
+        df[prob_col] = (1 / df[col] * 100).where(df[col] > 0) if col in df.columns else None
+
+    def col(name: str) -> pd.Series:
+        return df[name] if name in df.columns else pd.Series(np.nan, index=df.index)
+
+    diff_win = col("win_pct_home") - col("win_pct_away")
+    df["direcao_sugerida"] = np.select(
+        [diff_win >= 12, -diff_win >= 12, col("over25") >= 62, col("under25") >= 60, col("btts") >= 60],
+        ["Casa para vencer", "Visitante para vencer", "Mais de 2.5 gols", "Menos de 2.5 gols", "Ambas marcam"],
+        default="Jogo equilibrado",
+    )
 
-    for col in pair_base_cols:
-        if col in df.columns:
-            split_vals = df[col].apply(split_pair_value)
-            df[f"{col}_home"] = split_vals.apply(lambda x: x[0])
-            df[f"{col}_away"] = split_vals.apply(lambda x: x[1])
+    weights = {"win_pct": 0.28, "efficiency": 0.22, "scored_first": 0.20, "win_pct_ht": 0.20}
+    score = pd.Series(0.0, index=df.index)
+    for base, weight in weights.items():
+        for side in ["home", "away"]:
+            score += col(f"{base}_{side}").fillna(0) * (weight / 2)
+    for side in ["home", "away"]:
+        score += col(f"games_{side}").clip(upper=40).fillna(0) * 0.05
+    df["score_final"] = score.clip(upper=100)
+    df["confianca"] = np.select([score >= 70, score >= 50], ["Alta", "Média"], default="Baixa")
+    df["confianca_cor"] = np.select([score >= 70, score >= 50], ["green", "yellow"], default="red")
+    df["forca_diff"] = calcular_forca_geral(df)
+
+    df["mercado_sugerido"] = df["direcao_sugerida"].map({
+        "Casa para vencer": "ML Casa",
+        "Visitante para vencer": "ML Visitante",
+        "Mais de 2.5 gols": "Over 2.5",
+        "Menos de 2.5 gols": "Under 2.5",
+        "Ambas marcam": "BTTS Sim",
+    }).fillna("Sem vantagem clara")
+    return df
 
-    for col in ["res1", "res2", "res3", "res1_ht", "res2_ht", "res3_ht"]:
-        if col in df.columns:
-            df[f"{col}_home"] = df[col].astype(str).apply(
-                lambda s: [p.strip() for p in str(s).split("|")][0] if "|" in str(s) else str(s)
-            )
-            df[f"{col}_away"] = df[col].astype(str).apply(
-                lambda s: [p.strip() for p in str(s).split("|")][1]
-                if "|" in str(s) and len([p.strip() for p in str(s).split("|")]) > 1
-                else "-"
-            )
-
-    overall_numeric_cols = ["over15", "over25", "over05ht", "under25", "under15", "btts"]
-    for col in overall_numeric_cols:
-        if col in df.columns:
-            df[col] = df[col].apply(to_float)
 
-    for col in ["league", "country", "home", "away", "hour", "date", "status"]:
-        if col not in df.columns:
-            df[col] = "-"
+@st.cache_resource(show_spinner=False)
+def data_refresher() -> Atualizador:
+    return Atualizador("pre_live", lambda: ler_dataframe(CSV_URL, parse_data, "CSV_URL"), intervalo_s=300)
 
-    df["match_name"] = df["home"].astype(str) + " vs " + df["away"].astype(str)
-    df["prob_home"] = df["odd_home"].apply(infer_prob_from_odd) if "odd_home" in df.columns else None
-    df["prob_away"] = df["odd_away"].apply(infer_prob_from_odd) if "odd_away" in df.columns else None
-    df["prob_over25"] = df["odd_over25"].apply(infer_prob_from_odd) if "odd_over25" in df.columns else None
-    df["prob_under25"] = df["odd_under25"].apply(infer_prob_from_odd) if "odd_under25" in df.columns else None
-
-    def define_direction(row: pd.Series) -> str:
-        home_w = row.get("win_pct_home")
-        away_w = row.get("win_pct_away")
-
-        if home_w is not None and away_w is not None:
-            if home_w - away_w >= 12:
-                return "Casa para vencer"
-            if away_w - home_w >= 12:
-                return "Visitante para vencer"
-
-        if row.get("over25") is not None and row.get("over25") >= 62:
-            return "Mais de 2.5 gols"
-        if row.get("under25") is not None and row.get("under25") >= 60:
-            return "Menos de 2.5 gols"
-        if row.get("btts") is not None and row.get("btts") >= 60:
-            return "Ambas marcam"
-        return "Jogo equilibrado"
-
-    def score_row(row: pd.Series) -> float:
-        score = 0.0
-        bases = ["win_pct", "efficiency", "scored_first", "win_pct_ht"]
-        weights = {"win_pct": 0.28, "efficiency": 0.22, "scored_first": 0.20, "win_pct_ht": 0.20}
-
-        for base in bases:
-            for side in ["home", "away"]:
-                value = row.get(f"{base}_{side}")
-                if value is not None and not pd.isna(value):
-                    score += float(value) * (weights[base] / 2)
-
-        games_home = row.get("games_home")
-        games_away = row.get("games_away")
-        if games_home is not None and not pd.isna(games_home):
-            score += min(float(games_home), 40) * 0.05
-        if games_away is not None and not pd.isna(games_away):
-            score += min(float(games_away), 40) * 0.05
-
-        return min(score, 100)
-
-    df["direcao_sugerida"] = df.apply(define_direction, axis=1)
-    df["score_final"] = df.apply(score_row, axis=1)
-    df[["confianca", "confianca_cor"]] = df["score_final"].apply(lambda s: pd.Series(pick_confidence(s)))
-    df["forca_diff"] = df.apply(calcular_forca_geral, axis=1)
-
-    def market_tag(row: pd.Series) -> str:
-        d = row.get("direcao_sugerida", "")
-        if d == "Casa para vencer":
-            return "ML Casa"
-        if d == "Visitante para vencer":
-            return "ML Visitante"
-        if d == "Mais de 2.5 gols":
-            return "Over 2.5"
-        if d == "Menos de 2.5 gols":
-            return "Under 2.5"
-        if d == "Ambas marcam":
-            return "BTTS Sim"
-        return "Sem vantagem clara"
-
-    df["mercado_sugerido"] = df.apply(market_tag, axis=1)
-    return df
+
+def load_data() -> pd.DataFrame:
+    return data_refresher().obter()
 
 
 # ============================================================
@@ -0,0 +1,79 @@
+from itertools import repeat
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# PONTUAÇÃO POR REGRAS (COMPILADA)
+# As regras de todos os scores são agrupadas por variável. Para cada
+# variável, as bordas de todas as faixas (de qualquer score) formam
+# segmentos (b[i-1], b[i]]; um searchsorted põe cada linha no seu segmento
+# e uma tabela segmento x regra diz quais regras casam. A coluna é
+# convertida uma vez por variável, não uma vez por regra.
+# Regras de interação (var2/faixa2 preenchidos) casam quando as duas
+# faixas casam; são poucas e vão por comparação direta das duas colunas.
+# Somas no mesmo sentido do loop antigo: score = lift das regras que casam,
+# acumulado na ordem das regras (cumsum), e __regras = quantas casaram.
+# =========================================================
+class PontuadorRegras:
+    def __init__(self, tops: Dict[str, pd.DataFrame]):
+        self.scores: List[str] = list(tops)
+        self.max_regras = max((len(r) for r in tops.values()), default=0)
+        por_var: Dict[str, list] = {}
+        self.pares: List[tuple] = []
+        for s, regras in enumerate(tops.values()):
+            if regras is None or regras.empty:
+                continue
+            segundas = zip(regras["var2"], regras["faixa2"]) if "var2" in regras.columns else repeat((None, None))
+            for k, (var, faixa, lift, (var2, faixa2)) in enumerate(zip(regras["var"], regras["faixa"], regras["lift"], segundas)):
+                if not isinstance(faixa, pd.Interval):
+                    continue
+                if isinstance(faixa2, pd.Interval):
+                    self.pares.append((s, k, var, faixa, var2, faixa2, lift))
+                else:
+                    por_var.setdefault(var, []).append((s, k, float(faixa.left), float(faixa.right), lift))
+
+        # var -> (bordas, pertence [segmento, regra], score de cada regra, posição, lift)
+        self.por_variavel = {}
+        for var, itens in por_var.items():
+            s_idx, k_idx, esq, dir_, lift = (np.asarray(c) for c in zip(*itens))
+            bordas = np.unique(np.concatenate([esq, dir_]))
+            pertence = (esq[None, :] <= bordas[:-1, None]) & (bordas[1:, None] <= dir_[None, :])
+            self.por_variavel[var] = (bordas, pertence, s_idx, k_idx, lift.astype(float))
+
+    def colunas(self, df: pd.DataFrame) -> Dict[str, pd.Series]:
+        n, S, R = len(df), len(self.scores), self.max_regras
+        lifts = np.zeros((n, S, R))
+        casou = np.zeros((n, S, R), dtype=bool)
+        for var, (bordas, pertence, s_idx, k_idx, lift) in self.por_variavel.items():
+            if var not in df.columns:
+                continue
+            x = pd.to_numeric(df[var], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            segmento = np.searchsorted(bordas, x, side="left") - 1
+            linhas = np.flatnonzero((segmento >= 0) & (segmento < len(bordas) - 1))
+            li, ri = np.nonzero(pertence[segmento[linhas]])
+            lifts[linhas[li], s_idx[ri], k_idx[ri]] = lift[ri]
+            casou[linhas[li], s_idx[ri], k_idx[ri]] = True
+        numericas = {}
+        for s, k, var, faixa, var2, faixa2, lift in self.pares:
+            if var not in df.columns or var2 not in df.columns:
+                continue
+            dentro = np.ones(n, dtype=bool)
+            for v, f in ((var, faixa), (var2, faixa2)):
+                if v not in numericas:
+                    numericas[v] = pd.to_numeric(df[v], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+                dentro &= (numericas[v] > f.left) & (numericas[v] <= f.right)
+            lifts[dentro, s, k] = lift
+            casou[dentro, s, k] = True
+
+        score = np.cumsum(lifts, axis=2)[:, :, -1] if R else np.zeros((n, S))
+        contagem = casou.sum(axis=2).astype(np.int64)
+        saida = {}
+        for s, nome in enumerate(self.scores):
+            saida[nome] = pd.Series(score[:, s], index=df.index)
+            saida[f"{nome}__regras"] = pd.Series(contagem[:, s], index=df.index)
+        return saida
+
+    def pontuar(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.assign(**self.colunas(df))
@@ -1,6 +1,14 @@
+from typing import BinaryIO
+
 import streamlit as st
 import pandas as pd
 
+from atualizador_fundo import Atualizador
+from cache_planilhas import ler_dataframe
+from conversao_numerica import para_numero
+from fontes_dados import url_fonte
+from snapshots_colunares import tipar_frame
+
 st.set_page_config(page_title="Radar de Blocos 15'", layout="wide")
 
 # =========================================================
@@ -83,7 +91,7 @@ st.markdown(
 # =========================================================
 # CONFIGURAÇÕES
 # =========================================================
-URL_PAGINA2 = "https://docs.google.com/spreadsheets/d/e/2PACX-1vTh8nrJcHw1kIQOLk_ER7kmevSJXqQAoelNyn3wnEN9UgSAF_kFQF4NGZkqYhT-E5tpX20Lr6XW_oBt/pub?gid=682279336&single=true&output=csv"
+URL_PAGINA2 = url_fonte("radar_pagina2")
 
 COL_ID_PARTIDA = "id_partida"
 COL_DATA_REF = "data_referencia_lista"
@@ -121,9 +129,8 @@ def render_panel_end():
     st.markdown("</div>", unsafe_allow_html=True)
 
 
-@st.cache_data(ttl=300)
-def carregar_base():
-    df = pd.read_csv(URL_PAGINA2)
+def parse_base(arquivo: BinaryIO, nome: str = "PAGINA2") -> pd.DataFrame:
+    df = pd.read_csv(arquivo)
     df.columns = [str(c).strip() for c in df.columns]
 
     cols_numericas = [
@@ -137,7 +144,7 @@ def carregar_base():
     ]
     for col in cols_numericas:
         if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+            df[col] = para_numero(df[col]).fillna(0)
 
     cols_texto = [
         COL_ID_PARTIDA,
@@ -153,7 +160,16 @@ def carregar_base():
         if col in df.columns:
             df[col] = df[col].astype(str).str.strip()
 
-    return df
+    return tipar_frame(df, categoricas=[COL_COMPETICAO, COL_HOME, COL_AWAY])
+
+
+@st.cache_resource(show_spinner=False)
+def atualizador_base() -> Atualizador:
+    return Atualizador("radar_base", lambda: ler_dataframe(URL_PAGINA2, parse_base, "PAGINA2"), intervalo_s=300)
+
+
+def carregar_base():
+    return atualizador_base().obter()
 
 
 def listar_partidas(df: pd.DataFrame) -> pd.DataFrame:
@@ -202,7 +218,7 @@ def build_block_df(df_partida: pd.DataFrame, start: int, end: int) -> pd.DataFra
     for col in [COL_PRESS_CASA, COL_PRESS_VISIT, COL_ESC, COL_CH_GOL, COL_CH_FORA]:
         if col not in block.columns:
             block[col] = 0
-        block[col] = pd.to_numeric(block[col], errors="coerce").fillna(0)
+        block[col] = para_numero(block[col]).fillna(0)
 
     block = block[[COL_MINUTO, COL_PRESS_CASA, COL_PRESS_VISIT, COL_ESC, COL_CH_GOL, COL_CH_FORA]].copy()
     block.columns = ["Min", "Press_Casa", "Press_Visitante", "Esc", "Ch_Gol", "Ch_Fora"]
@@ -227,7 +243,7 @@ def init_history_status():
 def calc_metrics(df_block: pd.DataFrame, base_rate: float):
     df = df_block.copy()
     for col in ["Press_Casa", "Press_Visitante", "Esc", "Ch_Gol", "Ch_Fora"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+        df[col] = para_numero(df[col]).fillna(0)
 
     home_avg = df["Press_Casa"].mean()
     away_avg = df["Press_Visitante"].mean()
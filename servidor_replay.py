@@ -0,0 +1,222 @@
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from cache_planilhas import sessao_http
+from fontes_dados import FONTES
+
+# =========================================================
+# SERVIDOR DE REPLAY (SUBSTITUTO LOCAL DAS PLANILHAS)
+# Serve <pasta>/<nome>.csv em http://host:porta/<nome>.csv, com ETag e
+# Last-Modified como o Google Sheets, mais latência, tamanho e falhas
+# configuráveis. Apontando GOL_FONTES_URL para ele, qualquer painel roda
+# e pode ser medido sem rede.
+#
+#   python servidor_replay.py gravar --pasta replay/            (grava as fontes reais)
+#   python servidor_replay.py servir --pasta replay/ --latencia-ms 300 --taxa-erro 0.1
+# =========================================================
+CONFIG_PADRAO = {
+    "latencia_ms": 0,       # espera antes de responder
+    "jitter_ms": 0,         # +- aleatório sobre a latência
+    "repetir": 1,           # multiplica as linhas de dados (payload maior)
+    "banda_kbps": 0,        # 0 = sem limite
+    "taxa_erro": 0.0,       # fração de respostas 503
+    "taxa_html": 0.0,       # fração de respostas 200 com página HTML (planilha fora do ar)
+    "taxa_queda": 0.0,      # fração de conexões fechadas sem resposta
+}
+TAM_BLOCO_ENVIO = 1 << 16
+HTML_FALHA = b"<!DOCTYPE html><html><head><title>Erro</title></head><body>Planilha indisponivel</body></html>"
+
+
+class ServidorReplay:
+    # config: valores globais; por_fonte: {nome: {chave: valor}} sobrescreve só aquela fonte.
+    # Ambos podem ser alterados com o servidor rodando.
+    def __init__(self, pasta, host: str = "127.0.0.1", porta: int = 0, semente: Optional[int] = 0,
+                 por_fonte: Optional[Dict[str, dict]] = None, **config):
+        self.pasta = Path(pasta)
+        self.config = {**CONFIG_PADRAO, **config}
+        self.por_fonte = por_fonte or {}
+        self._aleatorio = random.Random(semente)
+        self._trava = threading.Lock()
+        self._corpos: Dict[tuple, tuple] = {}
+        self.estatisticas: Dict[str, Dict[str, int]] = {}
+        self._http = ThreadingHTTPServer((host, porta), self._handler())
+        self._http.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url_base(self) -> str:
+        host, porta = self._http.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def iniciar(self) -> str:
+        self._thread = threading.Thread(target=self._http.serve_forever, name="servidor-replay", daemon=True)
+        self._thread.start()
+        return self.url_base
+
+    def parar(self):
+        self._http.shutdown()
+        self._http.server_close()
+
+    def _config(self, nome: str) -> dict:
+        return {**self.config, **self.por_fonte.get(nome, {})}
+
+    def _sortear(self, taxa: float) -> bool:
+        with self._trava:
+            return taxa > 0 and self._aleatorio.random() < taxa
+
+    def _contar(self, nome: str, evento: str):
+        with self._trava:
+            por_evento = self.estatisticas.setdefault(nome, {})
+            por_evento[evento] = por_evento.get(evento, 0) + 1
+
+    def corpo(self, nome: str, repetir: int) -> Optional[tuple]:
+        # (bytes, etag, last_modified); relido quando o arquivo muda no disco
+        arq = self.pasta / f"{nome}.csv"
+        try:
+            mtime = arq.stat().st_mtime
+        except OSError:
+            return None
+        chave = (nome, repetir)
+        with self._trava:
+            atual = self._corpos.get(chave)
+        if atual is not None and atual[0] == mtime:
+            return atual[1]
+        dados = arq.read_bytes()
+        if repetir > 1:
+            cabecalho, _, linhas = dados.partition(b"\n")
+            if linhas and not linhas.endswith(b"\n"):
+                linhas += b"\n"
+            dados = cabecalho + b"\n" + linhas * repetir
+        etag = '"%s"' % hashlib.sha1(dados).hexdigest()[:16]
+        pronto = (dados, etag, formatdate(mtime, usegmt=True))
+        with self._trava:
+            self._corpos[chave] = (mtime, pronto)
+        return pronto
+
+    def _handler(self):
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _responder(self, status: int, corpo: bytes = b"", tipo: str = "text/csv; charset=utf-8",
+                           cabecalhos: Optional[dict] = None, banda_kbps: float = 0):
+                self.send_response(status)
+                self.send_header("Content-Type", tipo)
+                self.send_header("Content-Length", str(len(corpo)))
+                for k, v in (cabecalhos or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                for i in range(0, len(corpo), TAM_BLOCO_ENVIO):
+                    bloco = corpo[i:i + TAM_BLOCO_ENVIO]
+                    self.wfile.write(bloco)
+                    if banda_kbps:
+                        time.sleep(len(bloco) / (banda_kbps * 1024))
+
+            def do_GET(self):
+                caminho = self.path.split("?", 1)[0].strip("/")
+                if caminho == "_estatisticas":
+                    with servidor._trava:
+                        corpo = json.dumps(servidor.estatisticas).encode("utf-8")
+                    return self._responder(200, corpo, "application/json")
+                nome = caminho[:-4] if caminho.endswith(".csv") else caminho
+                cfg = servidor._config(nome)
+                with servidor._trava:
+                    atraso = cfg["latencia_ms"] + servidor._aleatorio.uniform(-1, 1) * cfg["jitter_ms"]
+                if atraso > 0:
+                    time.sleep(atraso / 1000)
+
+                if servidor._sortear(cfg["taxa_queda"]):
+                    servidor._contar(nome, "queda")
+                    self.close_connection = True
+                    return
+                if servidor._sortear(cfg["taxa_erro"]):
+                    servidor._contar(nome, "503")
+                    return self._responder(503, b"indisponivel", "text/plain")
+                if servidor._sortear(cfg["taxa_html"]):
+                    servidor._contar(nome, "html")
+                    return self._responder(200, HTML_FALHA, "text/html; charset=utf-8")
+
+                pronto = servidor.corpo(nome, max(1, int(cfg["repetir"])))
+                if pronto is None:
+                    servidor._contar(nome, "404")
+                    return self._responder(404, b"fonte nao encontrada", "text/plain")
+                dados, etag, modificado = pronto
+                validadores = {"ETag": etag, "Last-Modified": modificado}
+                if self.headers.get("If-None-Match") == etag:
+                    servidor._contar(nome, "304")
+                    return self._responder(304, cabecalhos=validadores)
+                servidor._contar(nome, "200")
+                self._responder(200, dados, cabecalhos=validadores, banda_kbps=cfg["banda_kbps"])
+
+        return Handler
+
+
+def gravar_fontes(pasta, nomes: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    # Grava o estado atual das planilhas reais em <pasta>/<nome>.csv para replay
+    pasta = Path(pasta)
+    pasta.mkdir(parents=True, exist_ok=True)
+    gravados = {}
+    for nome in nomes or FONTES:
+        resp = sessao_http().get(FONTES[nome], timeout=60)
+        resp.raise_for_status()
+        (pasta / f"{nome}.csv").write_bytes(resp.content)
+        gravados[nome] = len(resp.content)
+    return gravados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Substituto local das planilhas publicadas.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_gravar = sub.add_parser("gravar", help="grava as fontes reais numa pasta")
+    p_gravar.add_argument("--pasta", required=True)
+    p_gravar.add_argument("--fonte", action="append", choices=sorted(FONTES))
+
+    p_servir = sub.add_parser("servir", help="serve a pasta como se fossem as planilhas")
+    p_servir.add_argument("--pasta", required=True)
+    p_servir.add_argument("--host", default="127.0.0.1")
+    p_servir.add_argument("--porta", type=int, default=8765)
+    p_servir.add_argument("--semente", type=int, default=0)
+    p_servir.add_argument("--latencia-ms", type=float, default=0)
+    p_servir.add_argument("--jitter-ms", type=float, default=0)
+    p_servir.add_argument("--repetir", type=int, default=1)
+    p_servir.add_argument("--banda-kbps", type=float, default=0)
+    p_servir.add_argument("--taxa-erro", type=float, default=0.0)
+    p_servir.add_argument("--taxa-html", type=float, default=0.0)
+    p_servir.add_argument("--taxa-queda", type=float, default=0.0)
+    p_servir.add_argument("--por-fonte", help='JSON: {"regras_aba2": {"taxa_erro": 1}}')
+
+    args = parser.parse_args()
+    if args.comando == "gravar":
+        for nome, tamanho in gravar_fontes(args.pasta, args.fonte).items():
+            print(f"{nome}: {tamanho} bytes")
+        return
+
+    servidor = ServidorReplay(
+        args.pasta, host=args.host, porta=args.porta, semente=args.semente,
+        por_fonte=json.loads(args.por_fonte) if args.por_fonte else None,
+        **{k: getattr(args, k) for k in CONFIG_PADRAO},
+    )
+    print(f"Servindo {args.pasta} em {servidor.url_base}  (export GOL_FONTES_URL={servidor.url_base})")
+    try:
+        servidor._http.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor._http.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import os
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# =========================================================
+# SKETCH DE QUANTIS MESCLÁVEL (KLL, VÁRIAS COLUNAS)
+# Um sketch por coluna, guardado como níveis de matrizes (itens x colunas,
+# NaN onde a coluna tem menos itens): item do nível h vale 2^h linhas.
+# Quando uma coluna passa da capacidade do nível, ele é ordenado e um item
+# de cada par (posição alternada a cada compactação) sobe de nível; o
+# ímpar que sobra fica. Dois sketches se juntam concatenando nível a nível
+# e compactando de novo, então lotes, arquivos e processos são resumidos
+# separados e somados no fim.
+# Mínimo, máximo e total de válidos são exatos. Enquanto nada foi
+# compactado, os quantis são os mesmos do np.quantile; depois, o erro de
+# posto fica na ordem de 1/K_SKETCH.
+# =========================================================
+K_SKETCH = int(os.environ.get("GOL_K_SKETCH", 256))
+CAPACIDADE_MINIMA = 8
+
+
+def _empacotar(nivel: np.ndarray) -> np.ndarray:
+    # Ordena cada coluna (NaN no fim) e corta as linhas só de NaN
+    ordenado = np.sort(nivel, axis=0)
+    return ordenado[:int((~np.isnan(ordenado)).sum(axis=0).max(initial=0))]
+
+
+def _metade(ordenado: np.ndarray, contagem: np.ndarray, paridade: int) -> Tuple[np.ndarray, np.ndarray]:
+    # -> (um item de cada par, para o nível de cima; o ímpar que sobra, ou NaN)
+    pares = contagem // 2
+    linhas = np.arange(int(pares.max(initial=0)))[:, None]
+    sobe = ordenado[np.minimum(2 * linhas + paridade, len(ordenado) - 1), np.arange(ordenado.shape[1])]
+    sobe[linhas >= pares] = np.nan
+    fica = np.where(contagem % 2 == 1, ordenado[np.maximum(contagem - 1, 0), np.arange(ordenado.shape[1])], np.nan)
+    return sobe, fica[None, :]
+
+
+class SketchQuantis:
+    def __init__(self, m: int, k: int = K_SKETCH):
+        self.m = m
+        self.k = k
+        self.niveis: List[np.ndarray] = []
+        self.n = np.zeros(m, dtype=np.int64)
+        self.minimo = np.full(m, np.nan)
+        self.maximo = np.full(m, np.nan)
+        self._paridade = 0
+
+    def _capacidade(self, h: int) -> int:
+        return max(CAPACIDADE_MINIMA, int(self.k * (2 / 3) ** (len(self.niveis) - 1 - h)))
+
+    def _empilhar(self, h: int, bloco: np.ndarray):
+        while len(self.niveis) <= h:
+            self.niveis.append(np.empty((0, self.m)))
+        self.niveis[h] = _empacotar(np.vstack([self.niveis[h], bloco]))
+
+    def _compactar(self):
+        h = 0
+        while h < len(self.niveis):
+            nivel = self.niveis[h]
+            contagem = (~np.isnan(nivel)).sum(axis=0)
+            cheias = np.flatnonzero(contagem > self._capacidade(h))
+            if len(cheias):
+                sobe, fica = _metade(nivel[:, cheias], contagem[cheias], self._paridade)
+                self._paridade ^= 1
+                resto = nivel.copy()
+                resto[:, cheias] = np.nan
+                resto[:1, cheias] = fica
+                self.niveis[h] = _empacotar(resto)
+                bloco = np.full((len(sobe), self.m), np.nan)
+                bloco[:, cheias] = sobe
+                self._empilhar(h + 1, bloco)
+            h += 1
+
+    def atualizar(self, X: np.ndarray) -> "SketchQuantis":
+        if len(X) == 0:
+            return self
+        self.n += (~np.isnan(X)).sum(axis=0)
+        self.minimo = np.fmin(self.minimo, np.fmin.reduce(X, axis=0))
+        self.maximo = np.fmax(self.maximo, np.fmax.reduce(X, axis=0))
+        self._empilhar(0, X)
+        self._compactar()
+        return self
+
+    def juntar(self, outro: "SketchQuantis") -> "SketchQuantis":
+        self.n += outro.n
+        self.minimo = np.fmin(self.minimo, outro.minimo)
+        self.maximo = np.fmax(self.maximo, outro.maximo)
+        for h, nivel in enumerate(outro.niveis):
+            self._empilhar(h, nivel)
+        self._compactar()
+        return self
+
+    def _ordenado(self, colunas: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # -> (itens ordenados por coluna, NaN no fim; peso acumulado)
+        if not self.niveis:
+            return np.empty((0, len(colunas))), np.empty((0, len(colunas)))
+        itens = np.vstack([nivel[:, colunas] for nivel in self.niveis])
+        pesos = np.concatenate([np.full(len(nivel), 2.0 ** h) for h, nivel in enumerate(self.niveis)])
+        ordem = np.argsort(itens, axis=0, kind="stable")
+        itens = np.take_along_axis(itens, ordem, axis=0)
+        return itens, np.cumsum(np.where(np.isnan(itens), 0.0, pesos[ordem]), axis=0)
+
+    def distintos(self) -> np.ndarray:
+        # Distintos entre os itens guardados (exato enquanto nada foi compactado)
+        itens, _ = self._ordenado(np.arange(self.m))
+        novos = (itens[1:] != itens[:-1]) & ~np.isnan(itens[1:])
+        return (self.n > 0) + novos.sum(axis=0)
+
+    def quantis(self, probabilidades: Sequence[float], colunas: np.ndarray) -> np.ndarray:
+        # -> [probabilidades, colunas], interpolação linear como o np.quantile,
+        # com cada item ocupando tantos postos quanto o seu peso
+        itens, acumulado = self._ordenado(colunas)
+        saida = np.full((len(probabilidades), len(colunas)), np.nan)
+        if not len(itens):
+            return saida
+        total = acumulado[-1]
+        ultimo = np.maximum(total - 1, 0)
+        indice = np.arange(len(colunas))
+        for i, p in enumerate(probabilidades):
+            posto = p * ultimo
+            anterior = np.floor(posto)
+            t = posto - anterior
+            a = itens[np.minimum((acumulado <= anterior).sum(axis=0), len(itens) - 1), indice]
+            b = itens[np.minimum((acumulado <= np.minimum(anterior + 1, ultimo)).sum(axis=0), len(itens) - 1), indice]
+            diferenca = b - a
+            saida[i] = np.where(t >= 0.5, b - diferenca * (1 - t), a + diferenca * t)
+        saida[np.asarray(probabilidades) == 0] = self.minimo[colunas]
+        saida[np.asarray(probabilidades) == 1] = self.maximo[colunas]
+        saida[:, self.n[colunas] == 0] = np.nan
+        return saida
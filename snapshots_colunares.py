@@ -0,0 +1,116 @@
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# =========================================================
+# SNAPSHOTS COLUNARES (ARROW IPC)
+# Cada frame já tipado vira um arquivo .arrow sem compressão, versionado
+# pelo hash do CSV de origem. A leitura é memory-mapped, então reinício
+# do app ou fim do ttl não pagam de novo o parse do texto.
+# =========================================================
+PASTA_SNAPSHOTS = Path(os.environ.get(
+    "GOL_PASTA_SNAPSHOTS",
+    Path(__file__).resolve().parent / ".cache_planilhas" / "colunar",
+))
+
+RE_NUMERO_TEXTO = re.compile(r"^\s*[-+]?\s*\d[\d.,]*\s*%?\s*$")
+
+_trava = threading.Lock()
+
+
+def _eh_texto(s: pd.Series) -> bool:
+    return s.dtype == object or isinstance(s.dtype, pd.StringDtype)
+
+
+def tipar_frame(df: pd.DataFrame, conversor: Optional[Callable] = None,
+                categoricas: Iterable[str] = (), texto: Iterable[str] = ()) -> pd.DataFrame:
+    # Converte para float as colunas de texto em que TODO valor preenchido tem
+    # cara de número (o próprio conversor do módulo faz a conversão) e deixa
+    # times/ligas como category. Colunas em `texto` nunca são convertidas.
+    categoricas = [c for c in dict.fromkeys(categoricas) if c and c in df.columns]
+    intocadas = set(categoricas) | {c for c in texto if c}
+    novas = {}
+    if conversor is not None:
+        for c in df.columns:
+            if c in intocadas or not _eh_texto(df[c]):
+                continue
+            s = df[c]
+            preenchido = s.notna() & (s.astype(str).str.strip() != "")
+            if not preenchido.any():
+                continue
+            txt = s[preenchido].astype(str)
+            if not txt.str.match(RE_NUMERO_TEXTO).all():
+                continue
+            convertido = conversor(s)
+            if convertido[preenchido].notna().all():
+                novas[c] = convertido.astype(float)
+    for c in categoricas:
+        if _eh_texto(df[c]):
+            novas[c] = df[c].where(df[c].isna(), df[c].astype(str).str.strip()).astype("category")
+    if not novas:
+        return df
+    return df.assign(**novas)
+
+
+def _pasta_fonte(fonte: str) -> Path:
+    return PASTA_SNAPSHOTS / re.sub(r"[^A-Za-z0-9_.-]", "_", fonte)
+
+
+def _arquivo(fonte: str, hash_csv: str) -> Path:
+    return _pasta_fonte(fonte) / f"{hash_csv[:24]}.arrow"
+
+
+def listar_snapshots(fonte: str) -> List[dict]:
+    try:
+        return json.loads((_pasta_fonte(fonte) / "indice.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+
+
+def gravar_snapshot(fonte: str, hash_csv: str, df: pd.DataFrame) -> bool:
+    destino = _arquivo(fonte, hash_csv)
+    try:
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        if not destino.exists():
+            tmp = destino.with_name(f"{destino.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            feather.write_feather(df, tmp, compression="uncompressed")
+            os.replace(tmp, destino)
+    except (OSError, pa.ArrowException, TypeError, ValueError):
+        return False
+    with _trava:
+        indice = listar_snapshots(fonte)
+        if not any(item["hash"] == hash_csv for item in indice):
+            indice.append({"hash": hash_csv, "gravado_em": datetime.now().isoformat(timespec="seconds")})
+            arq_indice = _pasta_fonte(fonte) / "indice.json"
+            tmp = arq_indice.with_name(f"indice.json.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(indice, ensure_ascii=False, indent=1), encoding="utf-8")
+            os.replace(tmp, arq_indice)
+    return True
+
+
+def carregar_snapshot(fonte: str, hash_csv: str) -> Optional[pd.DataFrame]:
+    arq = _arquivo(fonte, hash_csv)
+    if not arq.exists():
+        return None
+    try:
+        tabela = feather.read_table(arq, memory_map=True)
+    except (OSError, pa.ArrowException):
+        return None
+    return tabela.to_pandas()
+
+
+def hash_na_data(fonte: str, data: str) -> Optional[str]:
+    # Último snapshot gravado até o fim do dia `data` (YYYY-MM-DD), para replay offline
+    limite = f"{data}T23:59:59" if "T" not in data else data
+    candidatos = [item for item in listar_snapshots(fonte) if item["gravado_em"] <= limite]
+    if not candidatos:
+        return None
+    return max(candidatos, key=lambda item: item["gravado_em"])["hash"]
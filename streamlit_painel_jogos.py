@@ -1,19 +1,25 @@
 import itertools
 import re
-from typing import Dict, List, Tuple
+from typing import BinaryIO, Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
 import streamlit as st
 
+from cache_planilhas import ler_dataframes
+from conversao_numerica import para_numero
+from fontes_dados import url_fonte
+from ingestao_incremental import ProcessadorIncremental, assinar_linhas
+from snapshots_colunares import tipar_frame
+
 st.set_page_config(page_title="GolEmNúmeros", layout="wide")
 
 # =========================================================
 # CONFIGURAÇÕES
 # USE AS URLS PUBLICADAS DE CADA ABA
 # =========================================================
-URL_PAGINA1 = "https://docs.google.com/spreadsheets/d/e/2PACX-1vRVsf4nH4SJ7cBV174FLEkkmpFLCxiS4FKKyhrTlKnKoUpVX9giYZ6V5_AMGavD3-AEadpm_zynvBK6/pub?gid=0&single=true&output=csv"
-URL_PAGINA2 = "https://docs.google.com/spreadsheets/d/e/2PACX-1vRVsf4nH4SJ7cBV174FLEkkmpFLCxiS4FKKyhrTlKnKoUpVX9giYZ6V5_AMGavD3-AEadpm_zynvBK6/pub?gid=272845724&single=true&output=csv"
+URL_PAGINA1 = url_fonte("jogos_pagina1")
+URL_PAGINA2 = url_fonte("jogos_pagina2")
 
 
 COLUNAS_EXCLUIDAS = {
@@ -69,6 +75,9 @@ MERCADOS_EXCLUIDOS = {
     "Menos de 7.5 escanteios",
 }
 
+# Estatísticas já convertidas, guardadas até a planilha inteira decidir se ficam
+COLUNA_STATS_NUM = "__stats_num"
+
 # =========================================================
 # ESTILO
 # =========================================================
@@ -191,15 +200,34 @@ def remover_mercados_excluidos(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-@st.cache_data(show_spinner=False)
-def carregar_csv(url: str) -> pd.DataFrame:
-    if not url or "COLE_AQUI" in url:
-        return pd.DataFrame()
-    df = pd.read_csv(url)
+def parse_csv_pagina(arquivo: BinaryIO, nome: str = "base") -> pd.DataFrame:
+    df = pd.read_csv(arquivo)
     df.columns = [str(c).strip() for c in df.columns]
     df = remover_colunas_excluidas(df)
     df = remover_mercados_excluidos(df)
-    return df
+    return tipar_frame(
+        df, converter_numerico_serie,
+        categoricas=[
+            achar_coluna(df, ["League", "Liga"]),
+            achar_coluna(df, ["Home Team", "Casa"]),
+            achar_coluna(df, ["Visitor Team", "Visitante"]),
+        ],
+        texto=[achar_coluna(df, ["Resultado"]), achar_coluna(df, ["HT"]), achar_coluna(df, ["Status"])],
+    )
+
+
+@st.cache_data(show_spinner=False)
+def carregar_paginas(url_pagina1: str, url_pagina2: str) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, dict]]:
+    fontes = {
+        nome: (url, parse_csv_pagina)
+        for nome, url in [("Página1", url_pagina1), ("Página2", url_pagina2)]
+        if url and "COLE_AQUI" not in url
+    }
+    frames, diagnostico = ler_dataframes(fontes)
+    for df in frames.values():
+        if isinstance(df, Exception):
+            raise df
+    return frames.get("Página1", pd.DataFrame()), frames.get("Página2", pd.DataFrame()), diagnostico
 
 
 def achar_coluna(df: pd.DataFrame, candidatos: List[str]) -> str | None:
@@ -212,13 +240,7 @@ def achar_coluna(df: pd.DataFrame, candidatos: List[str]) -> str | None:
 
 
 def converter_numerico_serie(s: pd.Series) -> pd.Series:
-    return pd.to_numeric(
-        s.astype(str)
-        .str.replace("%", "", regex=False)
-        .str.replace(",", ".", regex=False)
-        .str.strip(),
-        errors="coerce",
-    )
+    return para_numero(s)
 
 
 def card_metrica(rotulo: str, valor: str):
@@ -236,18 +258,12 @@ def card_metrica(rotulo: str, valor: str):
 # =========================================================
 # PREPARAÇÃO DAS BASES
 # =========================================================
-def preparar_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    if df.empty:
-        return df
-
-    df = df.copy()
-
+def converter_linhas(df: pd.DataFrame) -> pd.DataFrame:
+    # Parte linha-a-linha da preparação (textos limpos, números convertidos)
     for c in df.columns:
         if df[c].dtype == object:
             df[c] = df[c].astype(str).str.strip()
 
-    df = remover_mercados_excluidos(df)
-
     col_odd = achar_coluna(df, ["Odd Ofertada"])
     col_valor = achar_coluna(df, ["Valor esperado"])
     col_saldo = achar_coluna(df, ["Saldo entre odd ofertada e esperada", "Saldo entre odd ofertada e valor esperado"])
@@ -265,25 +281,43 @@ def preparar_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     elif col_odd and col_valor:
         df["Saldo entre odd ofertada e esperada"] = df[col_odd] - df[col_valor]
 
+    # Estatísticas só viram número se a coluna inteira aguentar (ver finalizar_dataframe)
     if col_stats:
-        stats_num = converter_numerico_serie(df[col_stats])
-        if stats_num.notna().sum() >= max(20, int(len(df) * 0.2)):
+        df[COLUNA_STATS_NUM] = converter_numerico_serie(df[col_stats])
+
+    return df
+
+
+def finalizar_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    # Parte que olha a planilha inteira: tira mercados excluídos e decide as estatísticas
+    df = remover_mercados_excluidos(df)
+
+    col_stats = achar_coluna(df, ["Estatisticas Ultimos Jogos", "Estatísticas Ultimos Jogos"])
+    if COLUNA_STATS_NUM in df.columns:
+        stats_num = df.pop(COLUNA_STATS_NUM)
+        if col_stats and stats_num.notna().sum() >= max(20, int(len(df) * 0.2)):
             df[col_stats] = stats_num
 
     return df
 
 
-def montar_targets_basicos(df: pd.DataFrame) -> pd.DataFrame:
+def preparar_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
 
-    df = df.copy()
+    return finalizar_dataframe(converter_linhas(df.copy()))
 
+
+def tem_placar(df: pd.DataFrame) -> bool:
+    return bool(achar_coluna(df, ["Resultado"]) and achar_coluna(df, ["HT"]))
+
+
+def derivar_targets(df: pd.DataFrame) -> pd.DataFrame:
+    # Parte linha-a-linha: gols, targets e lucro de cada jogo
     col_resultado = achar_coluna(df, ["Resultado"])
     col_ht = achar_coluna(df, ["HT"])
     col_prev = achar_coluna(df, ["A Mais Provavel", "Previsões", "Previsoes"])
     col_odd = achar_coluna(df, ["Odd Ofertada"])
-    col_status = achar_coluna(df, ["Status"])
 
     if not col_resultado or not col_ht:
         return df
@@ -341,6 +375,12 @@ def montar_targets_basicos(df: pd.DataFrame) -> pd.DataFrame:
             np.where(df["Target_Real"] == 0, -1, np.nan),
         )
 
+    return df
+
+
+def filtrar_terminados(df: pd.DataFrame) -> pd.DataFrame:
+    col_status = achar_coluna(df, ["Status"])
+
     # histórico/backtest só com jogos terminados
     if col_status and col_status in df.columns:
         df = df[df[col_status].astype(str).str.upper() == "FT"].copy()
@@ -350,6 +390,45 @@ def montar_targets_basicos(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def montar_targets_basicos(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty or not tem_placar(df):
+        return df
+
+    return filtrar_terminados(derivar_targets(df.copy()))
+
+
+# =========================================================
+# PREPARAÇÃO INCREMENTAL
+# A cada atualização só os jogos novos ou alterados (chave liga/hora/casa/
+# visitante + hash da linha) passam de novo pela conversão e pelos targets;
+# o que depende da planilha inteira (mercados excluídos, decisão das
+# estatísticas, filtro de terminados) roda depois, sobre o resultado.
+# =========================================================
+@st.cache_resource(show_spinner=False)
+def processadores_paginas() -> Dict[str, ProcessadorIncremental]:
+    return {nome: ProcessadorIncremental(nome) for nome in ("Página1", "Página2")}
+
+
+def chaves_jogo(df: pd.DataFrame) -> List[str]:
+    candidatos = [["League", "Liga"], ["Hour", "Hora", "Time"], ["Home Team", "Casa"], ["Visitor Team", "Visitante"]]
+    return [c for c in (achar_coluna(df, nomes) for nomes in candidatos) if c]
+
+
+def preparar_pagina(df: pd.DataFrame, processador: ProcessadorIncremental, com_targets: bool) -> pd.DataFrame:
+    if df.empty:
+        return df
+
+    com_targets = com_targets and tem_placar(df)
+
+    def etapa(d: pd.DataFrame) -> pd.DataFrame:
+        d = converter_linhas(d)
+        return derivar_targets(d) if com_targets else d
+
+    df, _ = processador.processar(df, assinar_linhas(df, chaves_jogo(df)), etapa, contexto=com_targets)
+    df = finalizar_dataframe(df)
+    return filtrar_terminados(df) if com_targets else df
+
+
 def resumo_backtest(df_hist: pd.DataFrame) -> Dict[str, object]:
     if df_hist.empty or "Profit_Odd_Ofertada" not in df_hist.columns:
         return {"entradas": 0, "lucro": 0.0, "dd": 0.0, "pf": 0.0, "curva": pd.Series(dtype=float)}
@@ -876,8 +955,9 @@ def render_dashboard_principal(df_pagina2: pd.DataFrame):
 # =========================================================
 # CARGA DAS BASES
 # =========================================================
-df_pagina1 = montar_targets_basicos(preparar_dataframe(carregar_csv(URL_PAGINA1)))
-df_pagina2 = preparar_dataframe(carregar_csv(URL_PAGINA2))
+df_pagina1_bruta, df_pagina2_bruta, diagnostico_fontes = carregar_paginas(URL_PAGINA1, URL_PAGINA2)
+df_pagina1 = preparar_pagina(df_pagina1_bruta, processadores_paginas()["Página1"], com_targets=True)
+df_pagina2 = preparar_pagina(df_pagina2_bruta, processadores_paginas()["Página2"], com_targets=False)
 
 # =========================================================
 # SIDEBAR GERAL
@@ -1154,6 +1234,7 @@ with aba_backtest:
     with st.expander("Conferência das bases"):
         st.write("Página1:", df_pagina1.shape)
         st.write("Página2:", df_pagina2.shape)
+        st.write("Download das abas:", diagnostico_fontes)
         if not df_pagina1.empty:
             st.write("Colunas Página1:", list(df_pagina1.columns))
         if not df_pagina2.empty:
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import cache_planilhas
+import snapshots_colunares
+from cache_planilhas import baixar_csv, fonte_snapshot, ler_meta
+from servidor_replay import ServidorReplay
+
+CSV = "Home,Away,Gols\nA,B,\"1,5\"\nC,D,2\n"
+
+
+@pytest.fixture
+def servidor(tmp_path):
+    pasta = tmp_path / "replay"
+    pasta.mkdir()
+    (pasta / "aba.csv").write_text(CSV, encoding="utf-8")
+    srv = ServidorReplay(pasta)
+    srv.iniciar()
+    yield srv
+    srv.parar()
+
+
+def test_planilha_sem_mudanca_custa_304(servidor, tmp_path):
+    url = f"{servidor.url_base}/aba.csv"
+    cache = tmp_path / "cache"
+    primeira = baixar_csv(url, "aba", pasta=cache)
+    segunda = baixar_csv(url, "aba", pasta=cache)
+    assert primeira["origem"] == "rede"
+    assert segunda["origem"] == "304"
+    assert segunda["hash"] == primeira["hash"]
+    assert segunda["arquivo"].read_text(encoding="utf-8") == CSV
+    assert servidor.estatisticas["aba"] == {"200": 1, "304": 1}
+
+
+def test_conteudo_novo_troca_o_snapshot(servidor, tmp_path):
+    url = f"{servidor.url_base}/aba.csv"
+    cache = tmp_path / "cache"
+    primeira = baixar_csv(url, "aba", pasta=cache)
+    (servidor.pasta / "aba.csv").write_text(CSV + "E,F,3\n", encoding="utf-8")
+    segunda = baixar_csv(url, "aba", pasta=cache)
+    assert segunda["origem"] == "rede"
+    assert segunda["hash"] != primeira["hash"]
+    assert segunda["arquivo"].read_text(encoding="utf-8").endswith("E,F,3\n")
+
+
+def test_sem_validadores_cai_no_hash(servidor, tmp_path):
+    url = f"{servidor.url_base}/aba.csv"
+    cache = tmp_path / "cache"
+    primeira = baixar_csv(url, "aba", pasta=cache)
+    arq_meta = primeira["arquivo"].with_suffix(".json")
+    meta = ler_meta(url, cache)
+    arq_meta.write_text(json.dumps({**meta, "etag": None, "last_modified": None}), encoding="utf-8")
+    segunda = baixar_csv(url, "aba", pasta=cache)
+    assert segunda["origem"] == "hash"
+    assert segunda["hash"] == primeira["hash"]
+    assert ler_meta(url, cache)["etag"] == meta["etag"]
+
+
+def test_falha_do_servidor_repete_e_desiste(servidor, tmp_path):
+    servidor.config["taxa_erro"] = 1.0
+    with pytest.raises(Exception):
+        baixar_csv(f"{servidor.url_base}/aba.csv", "aba", pasta=tmp_path / "cache",
+                   politica={"tentativas": 2, "backoff": 0})
+    assert servidor.estatisticas["aba"] == {"503": 2}
+
+
+def _parser_de_teste(limite: int, corte: int):
+    ns = {"LIMITE": limite}
+    exec(
+        "def ajudante(df):\n"
+        f"    return df.head({corte})\n"
+        "def parser(arquivo, nome):\n"
+        "    return ajudante(arquivo)[:LIMITE]\n",
+        ns,
+    )
+    return ns["parser"]
+
+
+def test_versao_do_snapshot_segue_ajudantes_e_constantes():
+    base = fonte_snapshot("http://x/aba.csv", _parser_de_teste(10, 5))
+    assert fonte_snapshot("http://x/aba.csv", _parser_de_teste(10, 5)) == base
+    assert fonte_snapshot("http://x/aba.csv", _parser_de_teste(11, 5)) != base
+    assert fonte_snapshot("http://x/aba.csv", _parser_de_teste(10, 6)) != base
+
+
+def test_snapshot_usa_o_hash_do_arquivo_lido(servidor, tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshots_colunares, "PASTA_SNAPSHOTS", tmp_path / "colunar")
+    lidos = []
+
+    def parser(arquivo, nome):
+        lidos.append(arquivo.read())
+        return pd.DataFrame({"linhas": [len(lidos[-1].splitlines())]})
+
+    url = f"{servidor.url_base}/aba.csv"
+    resp = baixar_csv(url, "aba", pasta=tmp_path / "cache")
+    # outro processo troca o CSV entre o download e o parse
+    resp["arquivo"].write_bytes(CSV.encode("utf-8") + b"E,F,3\n")
+    df = cache_planilhas._parse_memorizado(url, parser, resp)
+    assert df["linhas"].iloc[0] == 4
+    fonte = fonte_snapshot(url, parser)
+    assert snapshots_colunares.carregar_snapshot(fonte, resp["hash"]) is None
+    novo = hashlib.sha256(lidos[0]).hexdigest()
+    assert snapshots_colunares.carregar_snapshot(fonte, novo)["linhas"].iloc[0] == 4
+
+
+_CHAVE_EM_PROCESSO = """
+from cache_planilhas import fonte_snapshot
+ns = {"EXCLUIDAS": {"odds", "placar", "minuto", "liga", "status"}, "MAPA": {"x": frozenset({"a", "b", "c"})}}
+exec(
+    "def parser(arquivo, nome):\\n"
+    "    cols = [c for c in arquivo if c not in EXCLUIDAS and c not in {'gols', 'cartoes', 'escanteios'}]\\n"
+    "    return cols, MAPA\\n",
+    ns,
+)
+print(fonte_snapshot("http://x/aba.csv", ns["parser"]))
+"""
+
+
+def test_versao_do_snapshot_nao_depende_do_hashseed():
+    raiz = Path(__file__).resolve().parent.parent
+    chaves = set()
+    for semente in ("1", "2", "3"):
+        saida = subprocess.run(
+            [sys.executable, "-c", _CHAVE_EM_PROCESSO], cwd=raiz, capture_output=True, text=True, check=True,
+            env={**os.environ, "PYTHONHASHSEED": semente},
+        )
+        chaves.add(saida.stdout.strip())
+    assert len(chaves) == 1
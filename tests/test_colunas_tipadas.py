@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from colunas_tipadas import TAMANHO_AMOSTRA, CacheColunas, InferenciaTipos
+from conversao_numerica import para_numero
+
+
+def test_amostra_uma_linha_sorteada_por_fatia():
+    inferencia = InferenciaTipos(CacheColunas(para_numero))
+    n = 10_000
+    amostra = inferencia._amostra(n)
+    cortes = np.linspace(0, n, TAMANHO_AMOSTRA + 1).astype(np.int64)
+    assert len(amostra) == TAMANHO_AMOSTRA
+    assert ((amostra >= cortes[:-1]) & (amostra < cortes[1:])).all()
+    assert not np.array_equal(amostra, inferencia._amostra(n))
+
+
+def test_lixo_entre_posicoes_fixas_nao_engana_a_amostra():
+    # Lixo exatamente nas posições espaçadas por igual: uma amostra fixa
+    # nelas veria 0% de válidos; a coluna inteira tem 70%
+    n = TAMANHO_AMOSTRA * 10
+    rng = np.random.default_rng(0)
+    valores = pd.Series([f"{x:.2f}".replace(".", ",") for x in rng.uniform(0, 100, n)], dtype=object)
+    lixo = np.zeros(n, bool)
+    lixo[np.linspace(0, n - 1, TAMANHO_AMOSTRA).astype(np.int64)] = True
+    lixo[rng.choice(np.flatnonzero(~lixo), int(0.2 * n), replace=False)] = True
+    valores[lixo] = "-"
+    df = pd.DataFrame({"odd": valores, "time": ["A"] * n})
+    inferencia = InferenciaTipos(CacheColunas(para_numero))
+    assert inferencia.colunas_numericas(df) == ["odd"]
+    assert inferencia.estatisticas["descartadas_amostra"] == 1
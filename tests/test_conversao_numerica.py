@@ -0,0 +1,186 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conversao_numerica import para_numero, para_numero_escalar
+
+# Propriedades sobre valores sorteados (semente fixa) em todos os formatos
+# que aparecem nas planilhas; os conversores antigos ficam aqui só como
+# referência para os casos em que eles concordavam.
+N_SORTEIOS = 2000
+
+
+def _milhar(inteiro: str, sep: str) -> str:
+    grupos = []
+    while len(inteiro) > 3:
+        grupos.insert(0, inteiro[-3:])
+        inteiro = inteiro[:-3]
+    return sep.join([inteiro] + grupos)
+
+
+def _formatar(valor: float, casas: int, estilo: str) -> str:
+    sinal = "-" if valor < 0 else ""
+    inteiro, _, frac = f"{abs(valor):.{casas}f}".partition(".")
+    if estilo == "br":
+        return sinal + _milhar(inteiro, ".") + ("," + frac if frac else "")
+    if estilo == "br_simples":
+        return sinal + inteiro + ("," + frac if frac else "")
+    if estilo == "us":
+        return sinal + _milhar(inteiro, ",") + ("." + frac if frac else "")
+    if estilo == "ponto":
+        return f"{valor:.{casas}f}"
+    if estilo == "porcento":
+        return f"{valor:.{casas}f}".replace(".", ",") + "%"
+    if estilo == "moeda":
+        return "R$ " + sinal + _milhar(inteiro, ".") + ("," + frac if frac else "")
+    if estilo == "cientifico":
+        return f"{valor:.{casas}e}".upper() if casas % 2 else f"{valor:.{casas}e}"
+    raise ValueError(estilo)
+
+
+ESTILOS = ["br", "br_simples", "us", "ponto", "porcento", "moeda", "cientifico"]
+
+
+def _sorteio(semente: int = 0):
+    rng = np.random.default_rng(semente)
+    textos, esperados = [], []
+    for _ in range(N_SORTEIOS):
+        estilo = ESTILOS[rng.integers(len(ESTILOS))]
+        # separador de milhar sozinho com 0 casas ("1.234") é ambíguo e
+        # documentado como decimal; o sorteio só usa milhar com casas >= 1
+        casas = int(rng.integers(1 if estilo in ("br", "us", "moeda") else 0, 5))
+        valor = float(rng.choice([-1, 1]) * 10 ** rng.uniform(-3, 7))
+        texto = _formatar(valor, casas, estilo)
+        textos.append(texto)
+        esperados.append(float(f"{valor:.{casas}e}") if estilo == "cientifico" else round(valor, casas))
+    return pd.Series(textos, dtype=object), np.array(esperados)
+
+
+def test_ida_e_volta_em_todos_os_formatos():
+    textos, esperados = _sorteio()
+    obtidos = para_numero(textos).to_numpy()
+    errados = ~np.isclose(obtidos, esperados, rtol=1e-12, atol=0)
+    assert not errados.any(), list(zip(textos[errados][:5], obtidos[errados][:5]))
+
+
+def test_idempotente_sobre_o_proprio_texto():
+    textos, _ = _sorteio(1)
+    uma = para_numero(textos)
+    assert para_numero(uma).equals(uma)
+    # repr do float é o texto canônico (inclui "1e-05" e "1e+22")
+    de_novo = para_numero(pd.Series([repr(x) for x in uma], dtype=object))
+    np.testing.assert_array_equal(de_novo.to_numpy(), uma.to_numpy())
+
+
+def test_floats_extremos_voltam_exatos():
+    rng = np.random.default_rng(2)
+    valores = rng.choice([-1, 1], 500) * 10 ** rng.uniform(-30, 30, 500)
+    textos = pd.Series([repr(float(v)) for v in valores] + [str(float(v)).upper() for v in valores], dtype=object)
+    np.testing.assert_array_equal(para_numero(textos).to_numpy(), np.concatenate([valores, valores]))
+
+
+def test_escalar_igual_ao_vetorizado():
+    textos, _ = _sorteio(3)
+    textos = pd.concat([textos[:300], pd.Series(["", "abc", "-", "2-1", None, np.nan, "45%", " 7 ", True, False],
+                                                dtype=object)])
+    vetor = para_numero(textos).to_numpy()
+    escalar = np.array([np.nan if (v := para_numero_escalar(t)) is None else v for t in textos])
+    np.testing.assert_array_equal(vetor, escalar)
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("1.234,5", 1234.5),
+    ("1,234.5", 1234.5),
+    ("45%", 45.0),
+    ("2,10", 2.1),
+    ("R$ 2,10", 2.1),
+    ("1.234.567", 1234567.0),
+    ("1.85", 1.85),
+    ("2.5E3", 2500.0),
+    ("1e-05", 1e-05),
+    ("1,5e-3", 0.0015),
+    ("-3e+2", -300.0),
+    ("2-1", np.nan),
+    ("abc", np.nan),
+    ("", np.nan),
+])
+def test_casos_da_planilha(texto, esperado):
+    obtido = para_numero(pd.Series([texto], dtype=object)).iloc[0]
+    assert obtido == esperado or (np.isnan(esperado) and np.isnan(obtido))
+
+
+def test_booleanos_viram_um_e_zero_como_no_to_numeric():
+    rng = np.random.default_rng(6)
+    flags = rng.random(200) < 0.5
+    for s in (pd.Series(flags), pd.Series(flags, dtype=object), pd.Series(list(map(np.bool_, flags)), dtype=object)):
+        np.testing.assert_array_equal(para_numero(s).to_numpy(), pd.to_numeric(s).to_numpy(dtype=float))
+    textos, esperados = _sorteio(7)
+    misturado = pd.Series(list(textos[:100]) + list(flags[:100]), dtype=object)
+    np.testing.assert_array_equal(para_numero(misturado).to_numpy(), np.concatenate([esperados[:100], flags[:100]]))
+    com_na = pd.Series([True, None, False], dtype="boolean")
+    np.testing.assert_array_equal(para_numero(com_na).to_numpy(), [1.0, np.nan, 0.0])
+    assert [para_numero_escalar(v) for v in (True, False, np.bool_(True))] == [1.0, 0.0, 1.0]
+
+
+def test_numerico_passa_direto():
+    s = pd.Series([1, 2, 3], name="x")
+    assert para_numero(s).tolist() == [1.0, 2.0, 3.0]
+    assert para_numero(s).name == "x"
+
+
+# =========================================================
+# CONVERSORES ANTIGOS (REFERÊNCIA)
+# =========================================================
+def _to_float_series_antigo(s):
+    s = s.astype(str)
+    s = s.str.replace("%", "", regex=False)
+    s = s.str.replace(r"(?<=\d)\.(?=\d{3}(\D|$))", "", regex=True)
+    s = s.str.replace(",", ".", regex=False)
+    s = s.str.replace(r"[^\d\.\-]", "", regex=True)
+    return pd.to_numeric(s, errors="coerce")
+
+
+def _converter_numerico_serie_antigo(s):
+    return pd.to_numeric(
+        s.astype(str).str.replace("%", "", regex=False).str.replace(",", ".", regex=False).str.strip(),
+        errors="coerce",
+    )
+
+
+def _to_float_antigo(val):
+    if pd.isna(val):
+        return None
+    s = str(val).strip()
+    if s == "":
+        return None
+    s = re.sub(r"[^0-9.\-]", "", s.replace("%", "").replace(",", "."))
+    if s in {"", ".", "-", "-."}:
+        return None
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def test_igual_aos_antigos_onde_eles_concordavam():
+    textos, _ = _sorteio(4)
+    textos = pd.concat([textos, pd.Series(["3", "-2", "0,5", "12%", " 7 ", "1.5", "abc", ""], dtype=object)],
+                       ignore_index=True)
+    antigos = np.vstack([
+        _to_float_series_antigo(textos).to_numpy(dtype=float),
+        _converter_numerico_serie_antigo(textos).to_numpy(dtype=float),
+        np.array([np.nan if (v := _to_float_antigo(t)) is None else v for t in textos]),
+    ])
+    concordam = np.isfinite(antigos).all(axis=0) & (antigos == antigos[0]).all(axis=0)
+    assert concordam.sum() > 100
+    np.testing.assert_array_equal(para_numero(textos[concordam]).to_numpy(), antigos[0, concordam])
+
+
+def test_igual_ao_to_numeric_do_radar_onde_ele_convertia():
+    textos, _ = _sorteio(5)
+    radar = pd.to_numeric(textos, errors="coerce").to_numpy(dtype=float)
+    convertidos = np.isfinite(radar)
+    assert convertidos.sum() > 100
+    np.testing.assert_array_equal(para_numero(textos[convertidos]).to_numpy(), radar[convertidos])
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from interacoes_regras import bitmaps, contar_bits, minerar_interacoes
+from mineracao_regras import minerar_estatisticas
+
+
+def test_popcount_dos_bitmaps_igual_a_soma_das_mascaras():
+    rng = np.random.default_rng(0)
+    for n in (1, 63, 64, 65, 1000):
+        mascara = rng.random((n, 5)) < 0.3
+        B = bitmaps(mascara)
+        assert B.dtype == np.uint64 and B.shape == (5, -(-n // 64))
+        np.testing.assert_array_equal(contar_bits(B), mascara.sum(axis=0))
+        np.testing.assert_array_equal(contar_bits(B[0] & B[1:]), (mascara[:, :1] & mascara[:, 1:]).sum(axis=0))
+
+
+def test_pares_iguais_a_contagem_linha_a_linha():
+    rng = np.random.default_rng(1)
+    n = 800
+    df = pd.DataFrame({
+        "a": rng.normal(size=n),
+        "b": rng.exponential(size=n),
+        "c": np.where(rng.random(n) < 0.15, np.nan, rng.uniform(0, 5, n)),
+    })
+    df["t0"] = ((df["a"] > 0) & (df["b"] > 1) | (rng.random(n) < 0.2)).astype(float)
+    estatisticas = minerar_estatisticas(df, ["a", "b", "c"], ["t0"], 5, processos=1)
+    regras = minerar_interacoes(df, estatisticas, ["t0"], min_linhas=20)["t0"]
+    assert len(regras) > 0
+    # os rótulos são arredondados como os do qcut; a faixa de cada linha vem dele
+    faixas = {v: pd.qcut(df[v], 5, duplicates="drop") for v in ["a", "b", "c"]}
+    for r in regras.itertuples():
+        dentro = (faixas[r.var] == r.faixa) & (faixas[r.var2] == r.faixa2)
+        validos = df[r.var].notna() & df[r.var2].notna()
+        assert r.jogos == dentro.sum()
+        assert np.isclose(r.taxa_acerto, df.loc[dentro, "t0"].mean())
+        assert np.isclose(r.baseline, df.loc[validos, "t0"].mean())
+        assert np.isclose(r.lift, r.taxa_acerto - r.baseline)
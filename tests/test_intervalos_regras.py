@@ -0,0 +1,42 @@
+import numpy as np
+
+from mineracao_regras import colunas_intervalo, intervalo_lift_bootstrap, intervalo_wilson
+
+
+def test_wilson_valores_conhecidos():
+    # referência: statsmodels proportion_confint(method="wilson"), z exato de 95%
+    inf, sup = intervalo_wilson(np.array([5, 0, 20]), np.array([10, 10, 20]), z=1.959963984540054)
+    np.testing.assert_allclose(inf, [0.236593, 0.0, 0.838875], atol=1e-6)
+    np.testing.assert_allclose(sup, [0.763407, 0.277533, 1.0], atol=1e-6)
+
+
+def test_bootstrap_das_contagens_igual_ao_das_linhas():
+    # Poisson(1) por linha somado nos quatro grupos dá o mesmo lift por réplica
+    acertos, jogos, soma, validos = 30, 60, 120, 400
+    inf, sup = intervalo_lift_bootstrap(np.array([acertos]), np.array([jogos]), np.array([soma]), np.array([validos]),
+                                        replicas=4000)
+    rng = np.random.default_rng(1)
+    dentro = np.arange(validos) < jogos
+    alvo = np.zeros(validos, bool)
+    alvo[:acertos] = True
+    alvo[jogos:jogos + soma - acertos] = True
+    pesos = rng.poisson(1.0, (4000, validos))
+    lift = (pesos[:, dentro & alvo].sum(1) / pesos[:, dentro].sum(1)) - pesos[:, alvo].sum(1) / pesos.sum(1)
+    np.testing.assert_allclose([inf[0], sup[0]], np.quantile(lift, [0.025, 0.975]), atol=0.01)
+
+
+def test_intervalos_cercam_o_ponto_e_repetem_com_a_semente():
+    rng = np.random.default_rng(0)
+    jogos = rng.integers(20, 200, 50)
+    acertos = rng.binomial(jogos, 0.4)
+    validos = jogos * 5
+    soma = acertos + rng.binomial(validos - jogos, 0.3)
+    a = colunas_intervalo(acertos, jogos, soma, validos)
+    b = colunas_intervalo(acertos, jogos, soma, validos)
+    for nome in a:
+        np.testing.assert_array_equal(a[nome], b[nome])
+    taxa = acertos / jogos
+    lift = taxa - soma / validos
+    assert (a["taxa_inf"] <= taxa).all() and (taxa <= a["taxa_sup"]).all()
+    assert (a["lift_inf"] <= lift).all() and (lift <= a["lift_sup"]).all()
+    np.testing.assert_allclose(a["forca_inf"], a["lift_inf"] * np.log1p(jogos))
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from mineracao_regras import (
+    LIMITE_DERIVA, EstatisticasFaixas, atualizar_estatisticas, codificar_faixas, contar_faixas, minerar_estatisticas,
+    quantis_colunas,
+)
+
+
+def _dados(n: int, semente: int = 0):
+    rng = np.random.default_rng(semente)
+    X = np.column_stack([
+        rng.normal(size=n),
+        rng.choice([1.0, 2.0, 3.0], n),          # 3 valores: bordas repetidas descartadas
+        rng.exponential(size=n),
+        np.where(rng.random(n) < 0.2, np.nan, rng.uniform(0, 10, n)),
+    ])
+    Y = (rng.random((n, 2)) < [0.4, 0.2]).astype(float)
+    return X, Y
+
+
+def _existe(est: EstatisticasFaixas) -> np.ndarray:
+    return np.arange(est.q_faixas)[None, :] < (est.n_bordas - 1)[:, None]
+
+
+def test_faixas_iguais_ao_qcut():
+    X, _ = _dados(500)
+    bordas, n_bordas = quantis_colunas(X, 5)
+    faixa = codificar_faixas(X, bordas)
+    for c in range(X.shape[1]):
+        esperado = pd.qcut(pd.Series(X[:, c]), 5, labels=False, duplicates="drop")
+        np.testing.assert_array_equal(faixa[:, c], esperado.fillna(-1).to_numpy(dtype=int))
+        assert n_bordas[c] - 1 == esperado.nunique()
+
+
+def test_somar_igual_a_contar_tudo_com_as_mesmas_bordas():
+    X, Y = _dados(600)
+    est = EstatisticasFaixas.calcular(X[:400], Y[:400], list("abcd"), ["t0", "t1"], 5)
+    est.somar(X[400:], Y[400:])
+    jogos, acertos, validos, soma = contar_faixas(codificar_faixas(X, est.bordas), Y, 5)
+    np.testing.assert_array_equal(est.jogos, jogos)
+    np.testing.assert_array_equal(est.acertos, acertos)
+    np.testing.assert_array_equal(est.validos, validos)
+    np.testing.assert_array_equal(est.soma_alvos, soma)
+
+
+def test_valor_fora_das_bordas_cai_na_faixa_da_ponta():
+    X, Y = _dados(300)
+    est = EstatisticasFaixas.calcular(X, Y, list("abcd"), ["t0", "t1"], 5)
+    assert est.n_bordas[1] < 6 and est.n_bordas[0] == 6
+    ultima = est.n_bordas - 2
+    antes = est.jogos.copy()
+    novos = np.tile([[99.0, 5.0, 99.0, 99.0]], (3, 1))
+    est.somar(np.vstack([novos, -novos]), np.ones((6, 2)))
+    colunas = np.arange(X.shape[1])
+    np.testing.assert_array_equal(est.jogos[colunas, ultima] - antes[colunas, ultima], 3)
+    np.testing.assert_array_equal(est.jogos[:, 0] - antes[:, 0], 3)
+    # nada em faixa que não existe: todo válido está numa faixa de verdade
+    assert not est.jogos[~_existe(est)].any()
+    np.testing.assert_array_equal(est.jogos.sum(axis=1), est.validos)
+
+
+def test_deriva_fora_das_bordas_refaz_o_corte():
+    X, Y = _dados(300)
+    df = pd.DataFrame(X, columns=list("abcd")).assign(t0=Y[:, 0], t1=Y[:, 1])
+    est, = minerar_estatisticas(df, list("abcd"), ["t0", "t1"], 5, processos=1)
+    novas = df.sample(200, replace=True, random_state=1).assign(b=5.0)
+    hist = pd.concat([df, novas], ignore_index=True)
+    assert est.deriva()[1] == 0
+    resultado = atualizar_estatisticas([est], novas, hist)
+    assert resultado["requantizadas"] >= 1
+    refeita, = minerar_estatisticas(hist, ["b"], ["t0", "t1"], 5, processos=1)
+    np.testing.assert_array_equal(est.bordas[:, 1], refeita.bordas[:, 0])
+    np.testing.assert_array_equal(est.jogos[1], refeita.jogos[0])
+    assert est.deriva()[1] < LIMITE_DERIVA
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from mineracao_regras import gravar_historico, minerar_arquivos, minerar_estatisticas
+from sketch_quantis import SketchQuantis
+
+PROBABILIDADES = [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0]
+
+
+def _matriz(n: int, semente: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(semente)
+    X = np.column_stack([rng.normal(size=n), rng.exponential(size=n), rng.integers(0, 4, n).astype(float)])
+    X[rng.random(n) < 0.1, 0] = np.nan
+    return X
+
+
+def test_sem_compactar_igual_ao_np_quantile():
+    X = _matriz(200)
+    sketch = SketchQuantis(X.shape[1], k=1024).atualizar(X)
+    esperado = np.nanquantile(X, PROBABILIDADES, axis=0)
+    np.testing.assert_allclose(sketch.quantis(PROBABILIDADES, np.arange(3)), esperado, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(sketch.distintos(), [np.unique(c[~np.isnan(c)]).size for c in X.T])
+
+
+def test_juntar_lotes_igual_a_um_lote_so():
+    X = _matriz(300, 1)
+    inteiro = SketchQuantis(3, k=1024).atualizar(X)
+    partes = [SketchQuantis(3, k=1024).atualizar(lote) for lote in np.array_split(X, 7)]
+    for outra in partes[1:]:
+        partes[0].juntar(outra)
+    np.testing.assert_allclose(partes[0].quantis(PROBABILIDADES, np.arange(3)),
+                               inteiro.quantis(PROBABILIDADES, np.arange(3)), rtol=0, atol=1e-12)
+
+
+def test_erro_de_posto_depois_de_compactar():
+    X = _matriz(50_000, 2)
+    sketch = SketchQuantis(3, k=256)
+    for lote in np.array_split(X, 25):
+        sketch.atualizar(lote)
+    assert len(sketch.niveis) > 1
+    np.testing.assert_array_equal(sketch.n, (~np.isnan(X)).sum(axis=0))
+    np.testing.assert_array_equal(sketch.minimo, np.nanmin(X, axis=0))
+    np.testing.assert_array_equal(sketch.maximo, np.nanmax(X, axis=0))
+    quantis = sketch.quantis(PROBABILIDADES[1:-1], np.arange(2))
+    for c in range(2):
+        coluna = np.sort(X[~np.isnan(X[:, c]), c])
+        postos = np.searchsorted(coluna, quantis[:, c]) / len(coluna)
+        assert np.abs(postos - PROBABILIDADES[1:-1]).max() < 0.02
+
+
+def test_minerar_arquivos_igual_a_mineracao_em_memoria(tmp_path):
+    X = _matriz(400, 3)
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(X, columns=["a", "b", "c"]).assign(t0=(rng.random(400) < 0.4).astype(float))
+    for i, inicio in enumerate(range(0, 400, 150)):
+        gravar_historico(df.iloc[inicio:inicio + 150], tmp_path, f"temporada_{i}")
+    arquivos = sorted(tmp_path.glob("*.arrow"))
+    fora, = minerar_arquivos(arquivos, ["a", "b", "c"], ["t0"], 5, processos=1, k_sketch=1024)
+    dentro, = minerar_estatisticas(df, ["a", "b", "c"], ["t0"], 5, processos=1)
+    np.testing.assert_allclose(fora.bordas, dentro.bordas, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(fora.jogos, dentro.jogos)
+    np.testing.assert_array_equal(fora.acertos, dentro.acertos)
+    np.testing.assert_array_equal(fora.validos, dentro.validos)
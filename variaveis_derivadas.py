@@ -0,0 +1,65 @@
+from typing import Dict, Iterable, NamedTuple, Sequence
+
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# VARIÁVEIS DERIVADAS SOB DEMANDA (PARES CASA/VISITANTE)
+# diff/soma/ratio de cada par casa x visitante ficam só como definição.
+# Validação e mineração calculam as que precisam em lote (matriz linhas x
+# derivadas, direto das colunas base); no frame só entram as que alguma
+# regra escolhida usa na pontuação.
+# =========================================================
+TAMANHO_LOTE = 256
+
+
+class Derivada(NamedTuple):
+    nome: str
+    operacao: str  # "diff" | "soma" | "ratio"
+    c1: str
+    c2: str
+
+
+def expandir_definicoes(definicoes: Iterable[tuple]) -> Dict[str, Derivada]:
+    derivadas = {}
+    for c1, c2, nome_diff, nome_soma, nome_ratio in definicoes:
+        derivadas[nome_diff] = Derivada(nome_diff, "diff", c1, c2)
+        derivadas[nome_soma] = Derivada(nome_soma, "soma", c1, c2)
+        derivadas[nome_ratio] = Derivada(nome_ratio, "ratio", c1, c2)
+    return derivadas
+
+
+def _coluna(df: pd.DataFrame, c: str) -> np.ndarray:
+    return pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def avaliar_lote(df: pd.DataFrame, derivadas: Sequence[Derivada]) -> np.ndarray:
+    # -> matriz [linhas, derivadas] (ordem de coluna); cada coluna base é lida
+    # uma vez e as operações rodam em blocos de TAMANHO_LOTE derivadas
+    saida = np.empty((len(df), len(derivadas)), order="F")
+    bases = {}
+    for d in derivadas:
+        for c in (d.c1, d.c2):
+            if c not in bases:
+                bases[c] = _coluna(df, c)
+    for inicio in range(0, len(derivadas), TAMANHO_LOTE):
+        bloco = derivadas[inicio:inicio + TAMANHO_LOTE]
+        a = np.column_stack([bases[d.c1] for d in bloco])
+        b = np.column_stack([bases[d.c2] for d in bloco])
+        operacao = np.array([d.operacao for d in bloco])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            valores = np.where(
+                operacao == "diff", a - b,
+                np.where(operacao == "soma", a + b, np.where(~np.isnan(b) & (b != 0), a / b, np.nan)),
+            )
+        saida[:, inicio:inicio + len(bloco)] = valores
+    return saida
+
+
+def materializar(df: pd.DataFrame, nomes: Iterable[str], derivadas: Dict[str, Derivada]) -> Dict[str, pd.Series]:
+    # Só as derivadas pedidas que ainda não são coluna do frame
+    faltando = [derivadas[n] for n in dict.fromkeys(nomes) if n in derivadas and n not in df.columns]
+    if not faltando:
+        return {}
+    valores = avaliar_lote(df, faltando)
+    return {d.nome: pd.Series(valores[:, j], index=df.index) for j, d in enumerate(faltando)}
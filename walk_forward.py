@@ -0,0 +1,71 @@
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from interacoes_regras import MAX_REGRAS_INTERACAO, minerar_interacoes
+from mineracao_regras import atualizar_estatisticas, minerar_estatisticas, resumir_estatisticas
+from variaveis_derivadas import Derivada
+
+# =========================================================
+# AVALIAÇÃO WALK-FORWARD
+# As regras mineradas sobre todo o FT e aplicadas ao mesmo FT parecem
+# melhores do que são ao vivo. Aqui o FT, na ordem da planilha (a mais
+# antiga primeiro), é cortado em janelas: a dobra k minera só com o que
+# veio antes da janela k e pontua a janela k, que ainda não entrou nas
+# regras. Só a primeira dobra minera do zero; depois disso a janela
+# avaliada é somada nas estatísticas por faixa (atualizar_estatisticas,
+# com recorte por deriva sobre o treino acumulado) e vira treino da
+# próxima. Regras, pontuação e semáforo vêm de quem chama, iguais aos do
+# painel ao vivo.
+# =========================================================
+FRACAO_TREINO_INICIAL = 0.5
+
+
+def janelas_walk_forward(n: int, dobras: int, fracao_inicial: float = FRACAO_TREINO_INICIAL) -> List[Tuple[int, int]]:
+    # -> [(início, fim)] das janelas avaliadas; o treino da dobra é [0, início)
+    inicio = int(n * fracao_inicial)
+    if dobras < 1 or n - inicio < dobras:
+        return []
+    cortes = np.linspace(inicio, n, dobras + 1).astype(int)
+    return list(zip(cortes[:-1].tolist(), cortes[1:].tolist()))
+
+
+def avaliar_walk_forward(df_hist: pd.DataFrame, variaveis: Sequence[str], alvos: Sequence[str],
+                         avaliar: Callable[[pd.DataFrame, Dict[str, pd.DataFrame], Dict[str, pd.DataFrame]], pd.DataFrame],
+                         dobras: int, fracao_inicial: float = FRACAO_TREINO_INICIAL, min_linhas: int = 20,
+                         q_faixas: int = 5, derivadas: Optional[Dict[str, Derivada]] = None,
+                         com_intervalos: bool = False, max_interacoes: int = MAX_REGRAS_INTERACAO) -> pd.DataFrame:
+    # avaliar(janela, regras, interacoes) -> janela pontuada; a saída junta
+    # as janelas fora da amostra com a coluna "dobra"
+    df_hist = df_hist.reset_index(drop=True)
+    janelas = janelas_walk_forward(len(df_hist), dobras, fracao_inicial)
+    if not janelas or not variaveis:
+        return pd.DataFrame()
+    estatisticas = minerar_estatisticas(df_hist.iloc[:janelas[0][0]], variaveis, alvos, q_faixas, derivadas=derivadas)
+    avaliadas = []
+    for dobra, (inicio, fim) in enumerate(janelas, start=1):
+        treino, janela = df_hist.iloc[:inicio], df_hist.iloc[inicio:fim]
+        if dobra > 1:
+            atualizar_estatisticas(estatisticas, df_hist.iloc[janelas[dobra - 2][0]:inicio], treino, derivadas)
+        regras = resumir_estatisticas(estatisticas, alvos, min_linhas, com_intervalos=com_intervalos)
+        interacoes = minerar_interacoes(
+            treino, estatisticas, alvos, min_linhas, max_regras=max_interacoes, derivadas=derivadas,
+            com_intervalos=com_intervalos,
+        ) if max_interacoes > 0 else {a: pd.DataFrame() for a in alvos}
+        avaliadas.append(avaliar(janela, regras, interacoes).assign(dobra=dobra))
+    return pd.concat(avaliadas, ignore_index=True)
+
+
+def acerto_por_nivel(avaliadas: pd.DataFrame, coluna_nivel: str,
+                     alvos_por_nivel: Dict[str, Sequence[str]], nomes_acerto: Sequence[str]) -> pd.DataFrame:
+    # Taxa de acerto fora da amostra por nível: cada nível aponta os alvos
+    # que contam como acerto (nível sem alvo, ex. "evitar", só conta jogos)
+    linhas = []
+    for nivel, grupo in avaliadas.groupby(coluna_nivel, sort=False):
+        alvos = alvos_por_nivel.get(nivel, ())
+        linha = {coluna_nivel: nivel, "jogos": len(grupo), "dobras": grupo["dobra"].nunique()}
+        for nome, alvo in zip(nomes_acerto, alvos):
+            linha[nome] = pd.to_numeric(grupo[alvo], errors="coerce").mean()
+        linhas.append(linha)
+    return pd.DataFrame(linhas, columns=[coluna_nivel, "jogos", "dobras", *nomes_acerto])